@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:56
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_basicinfo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='accounts_skill_name_lower'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import FileExtensionValidator
 from django.utils.translation import gettext_lazy as _
+from django.db.models.functions import Lower
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -27,6 +28,12 @@ class User(AbstractUser):
 class Skill(models.Model):
     name = models.CharField(max_length=100, unique=True)
 
+    class Meta:
+        indexes = [
+            # Case-insensitive lookups from accounts.skills.resolve_skill_ids
+            models.Index(Lower('name'), name='accounts_skill_name_lower'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -1,8 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from rest_framework import serializers
 from .models import UserProfile, Education, Experience, Project, Skill, SocialLinks, BasicInfo
+from .skills import resolve_skill_ids
 
 
 User = get_user_model()
@@ -67,12 +69,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
         if data is None:
             return
         if many:
-            manager = getattr(instance, nested_key)
-            manager.all().delete()
             serializer = serializer_cls(data=data, many=True)
             serializer.is_valid(raise_exception=True)
-            for item in serializer.validated_data:
-                serializer_cls.Meta.model.objects.create(profile=instance, **item)
+            self._sync_many(instance, nested_key, serializer_cls.Meta.model, data, serializer.validated_data)
         else:
             payload = data
             serializer = serializer_cls(data=payload)
@@ -82,16 +81,59 @@ class UserProfileSerializer(serializers.ModelSerializer):
                 setattr(obj, k, v)
             obj.save()
 
+    def _sync_many(self, instance, nested_key, model, data, validated_items):
+        """
+        Make the profile's ``nested_key`` collection match ``validated_items``.
+
+        Items whose ``id`` names an existing row are updated in place (only
+        when something changed), items without one are inserted and rows no
+        longer listed are deleted: one query for each kind of change, however
+        many items there are.
+        """
+        existing = {obj.pk: obj for obj in getattr(instance, nested_key).all()}
+        to_create = []
+        to_update = []
+        changed_fields = set()
+        kept = set()
+        for raw, item in zip(data, validated_items):
+            try:
+                obj = existing.get(int(raw.get('id')))
+            except (TypeError, ValueError):
+                obj = None
+            if obj is None or obj.pk in kept:
+                to_create.append(model(profile=instance, **item))
+                continue
+            kept.add(obj.pk)
+            changed = [attr for attr, value in item.items() if getattr(obj, attr) != value]
+            for attr in changed:
+                setattr(obj, attr, item[attr])
+            if changed:
+                changed_fields.update(changed)
+                to_update.append(obj)
+
+        removed = existing.keys() - kept
+        if removed:
+            model.objects.filter(pk__in=removed).delete()
+        if to_update:
+            model.objects.bulk_update(to_update, sorted(changed_fields))
+        if to_create:
+            model.objects.bulk_create(to_create)
+
+    def _pop_nested(self, validated_data):
+        # Nested collections are written by _upsert_nested, never assigned directly
+        for key in ('skills', 'social_links', 'educations', 'experiences', 'projects'):
+            validated_data.pop(key, None)
+
+    @transaction.atomic
     def create(self, validated_data):
         skills_data = self.initial_data.get('skills')
         # Prevent accidental M2M direct assignment via validated_data
-        validated_data.pop('skills', None)
+        self._pop_nested(validated_data)
         instance = UserProfile.objects.create(**validated_data)
         # Skills
         if skills_data:
             names = [s.get('name') for s in skills_data if s.get('name')]
-            skill_objs = [Skill.objects.get_or_create(name=n.strip())[0] for n in names]
-            instance.skills.set(skill_objs)
+            instance.skills.set(resolve_skill_ids(names))
         # Nested
         self._upsert_nested(instance, 'social_links', SocialLinksSerializer, many=False)
         self._upsert_nested(instance, 'basic_info', BasicInfoSerializer, many=False)
@@ -100,17 +142,17 @@ class UserProfileSerializer(serializers.ModelSerializer):
         self._upsert_nested(instance, 'projects', ProjectSerializer, many=True)
         return instance
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         skills_data = self.initial_data.get('skills')
         # Avoid direct assignment to M2M
-        validated_data.pop('skills', None)
+        self._pop_nested(validated_data)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
         if skills_data is not None:
             names = [s.get('name') for s in skills_data if s.get('name')]
-            skill_objs = [Skill.objects.get_or_create(name=n.strip())[0] for n in names]
-            instance.skills.set(skill_objs)
+            instance.skills.set(resolve_skill_ids(names))
         self._upsert_nested(instance, 'social_links', SocialLinksSerializer, many=False)
         self._upsert_nested(instance, 'basic_info', BasicInfoSerializer, many=False)
         self._upsert_nested(instance, 'educations', EducationSerializer, many=True)
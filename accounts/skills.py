@@ -0,0 +1,284 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Lower
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Skill, UserProfile
+
+
+def normalize_skill(name):
+    """Display form of a skill name: surrounding and repeated whitespace removed"""
+    return ' '.join(str(name or '').split())
+
+
+def skill_key(name):
+    """Case-insensitive lookup key of a skill name"""
+    return normalize_skill(name).lower()
+
+
+class SkillIdCache:
+    """
+    LRU cache of skill lookup key to ``Skill`` id for the hot vocabulary.
+
+    An entry goes stale when its skill is renamed or deleted; the
+    ``post_save`` and ``post_delete`` receivers below drop it.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                skill_id = self._entries.get(key)
+                if skill_id is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = skill_id
+        return found
+
+    def set_many(self, mapping):
+        with self._lock:
+            for key, skill_id in mapping.items():
+                self._entries[key] = skill_id
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard_id(self, skill_id):
+        with self._lock:
+            for key in [key for key, value in self._entries.items() if value == skill_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+skill_ids = SkillIdCache(max_size=getattr(settings, 'SKILL_CACHE_SIZE', 4096))
+
+
+class SkillIndex:
+    """
+    In-memory typeahead index of skill names, ranked by how many profiles
+    list each skill.
+
+    Every word-starting suffix of a normalized name ("machine learning",
+    "learning") is kept in one sorted list, so a prefix lookup is a binary
+    search plus a scan of the matches, without touching the database. The
+    index is built from one query on first use and then kept current by the
+    signal receivers below as skills are saved, deleted, added to or removed
+    from profiles in this process. Changes made elsewhere (other worker
+    processes, bulk updates, cascading profile deletes) are picked up by a
+    full rebuild once the index is older than ``max_age`` seconds.
+
+    Short prefixes match a large share of the vocabulary, so results are
+    memoized until the next change to the index.
+    """
+
+    MAX_MEMOIZED = 1024
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._tokens = []
+        self._skills = {}
+        self._results = {}
+
+    @property
+    def built(self):
+        return self._built_at is not None
+
+    def search(self, prefix, limit=10):
+        """Up to ``limit`` ``(id, name, profile_count)`` tuples, most popular first"""
+        if self._built_at is None or (self.max_age and time.monotonic() - self._built_at > self.max_age):
+            self.rebuild()
+        prefix = skill_key(prefix)
+        with self._lock:
+            results = self._results.get((prefix, limit))
+            if results is not None:
+                return results
+            matches = set()
+            for position in range(bisect_left(self._tokens, (prefix,)), len(self._tokens)):
+                token, skill_id = self._tokens[position]
+                if not token.startswith(prefix):
+                    break
+                matches.add(skill_id)
+            best = heapq.nsmallest(limit, matches, key=lambda skill_id: (-self._skills[skill_id][2], self._skills[skill_id][1]))
+            results = [(skill_id, self._skills[skill_id][0], self._skills[skill_id][2]) for skill_id in best]
+            if len(self._results) >= self.MAX_MEMOIZED:
+                self._results.clear()
+            self._results[(prefix, limit)] = results
+            return results
+
+    def rebuild(self):
+        rows = Skill.objects.annotate(profile_count=Count('profiles')).values_list('id', 'name', 'profile_count')
+        skills = {skill_id: (name, skill_key(name), count) for skill_id, name, count in rows}
+        tokens = sorted((token, skill_id) for skill_id, (_, key, _) in skills.items() for token in self._split(key))
+        with self._lock:
+            self._skills = skills
+            self._tokens = tokens
+            self._results = {}
+            self._built_at = time.monotonic()
+
+    def upsert(self, names):
+        """Add or rename the skills in ``names`` (skill id to name)"""
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._results.clear()
+            for skill_id, name in names.items():
+                old = self._skills.get(skill_id)
+                count = 0
+                if old is not None:
+                    self._remove_tokens(skill_id, old[1])
+                    count = old[2]
+                key = skill_key(name)
+                self._skills[skill_id] = (name, key, count)
+                for token in self._split(key):
+                    insort(self._tokens, (token, skill_id))
+
+    def remove(self, skill_id):
+        with self._lock:
+            old = self._skills.pop(skill_id, None)
+            if old is not None:
+                self._remove_tokens(skill_id, old[1])
+                self._results.clear()
+
+    def adjust(self, counts):
+        """Add ``counts`` (skill id to change in profile count) to the popularity of each skill"""
+        with self._lock:
+            self._results.clear()
+            for skill_id, delta in counts.items():
+                entry = self._skills.get(skill_id)
+                if entry is not None:
+                    self._skills[skill_id] = (entry[0], entry[1], max(0, entry[2] + delta))
+
+    def clear(self):
+        with self._lock:
+            self._built_at = None
+            self._tokens = []
+            self._skills = {}
+            self._results = {}
+
+    def _remove_tokens(self, skill_id, key):
+        for token in self._split(key):
+            position = bisect_left(self._tokens, (token, skill_id))
+            if position < len(self._tokens) and self._tokens[position] == (token, skill_id):
+                del self._tokens[position]
+
+    @staticmethod
+    def _split(key):
+        words = key.split(' ')
+        return {' '.join(words[start:]) for start in range(len(words))}
+
+
+skill_index = SkillIndex(max_age=getattr(settings, 'SKILL_INDEX_MAX_AGE', 300))
+
+
+@receiver(post_save, sender=Skill)
+def index_saved_skill(sender, instance, created, **kwargs):
+    skill_id = instance.pk
+    if not created:
+        # The old name may be cached; drop it now and again once any lookup
+        # made earlier in this transaction has cached it on commit
+        skill_ids.discard_id(skill_id)
+        transaction.on_commit(lambda: skill_ids.discard_id(skill_id))
+    if skill_index.built:
+        transaction.on_commit(lambda: skill_index.upsert({instance.pk: instance.name}))
+
+
+@receiver(post_delete, sender=Skill)
+def forget_deleted_skill(sender, instance, **kwargs):
+    skill_id = instance.pk
+    skill_ids.discard_id(skill_id)
+    if skill_index.built:
+        # instance.pk is cleared once the delete completes
+        transaction.on_commit(lambda: skill_index.remove(skill_id))
+
+
+@receiver(m2m_changed, sender=UserProfile.skills.through)
+def count_profile_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if not skill_index.built:
+        return
+    if action == 'pre_clear':
+        # The cleared rows are only known before they are gone
+        if reverse:
+            instance._cleared_skill_counts = {instance.pk: -instance.profiles.count()}
+        else:
+            instance._cleared_skill_counts = {skill_id: -1 for skill_id in instance.skills.values_list('pk', flat=True)}
+        return
+    if action == 'post_clear':
+        counts = getattr(instance, '_cleared_skill_counts', {})
+    elif action in ('post_add', 'post_remove') and pk_set:
+        delta = 1 if action == 'post_add' else -1
+        counts = {instance.pk: delta * len(pk_set)} if reverse else {skill_id: delta for skill_id in pk_set}
+    else:
+        return
+    transaction.on_commit(lambda: skill_index.adjust(counts))
+
+
+def _fetch(keys):
+    found = {}
+    # Lowest id first, so the oldest spelling wins if case variants already exist
+    rows = (
+        Skill.objects.alias(name_lower=Lower('name'))
+        .filter(name_lower__in=keys)
+        .order_by('-id')
+        .values_list('id', 'name')
+    )
+    for skill_id, name in rows:
+        found[skill_key(name)] = skill_id
+    return found
+
+
+def resolve_skill_ids(names):
+    """
+    Return the ids of the skills called ``names``, creating missing ones.
+
+    Names are matched case- and whitespace-insensitively and deduplicated,
+    keeping their first spelling for new skills. Cached names cost nothing;
+    the rest take one lookup, one ``INSERT`` for the new skills and one
+    lookup of what was inserted, however many names there are. Concurrent
+    creators of the same skill are absorbed by ``ignore_conflicts``.
+    """
+    spellings = {}
+    for name in names:
+        display = normalize_skill(name)
+        if display:
+            spellings.setdefault(display.lower(), display)
+    if not spellings:
+        return []
+
+    resolved = skill_ids.get_many(spellings)
+    missing = spellings.keys() - resolved.keys()
+    fetched = {}
+    if missing:
+        fetched = _fetch(missing)
+        new = missing - fetched.keys()
+        if new:
+            Skill.objects.bulk_create(
+                [Skill(name=spellings[key]) for key in sorted(new)],
+                ignore_conflicts=True,
+            )
+            created = _fetch(new)
+            fetched.update(created)
+            # bulk_create sends no post_save
+            if skill_index.built:
+                names = {skill_id: spellings[key] for key, skill_id in created.items()}
+                transaction.on_commit(lambda: skill_index.upsert(names))
+        resolved.update(fetched)
+        # Ids of skills created in a transaction that rolls back must not be cached
+        transaction.on_commit(lambda: skill_ids.set_many(fetched))
+    return [resolved[key] for key in spellings if key in resolved]
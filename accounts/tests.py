@@ -1,3 +1,262 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .models import BasicInfo, Education, Experience, Project, Skill, SocialLinks
+from .skills import resolve_skill_ids, skill_ids, skill_index
+
+
+User = get_user_model()
+
+
+class ProfileQueryCountTests(TestCase):
+    """
+    The profile read path loads the whole profile graph in a fixed number of
+    queries: one for the profile with its user, social links and basic info,
+    plus one per prefetched collection (skills, educations, experiences,
+    projects).
+    """
+
+    PROFILE_QUERIES = 5
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='jane@example.com', username='jane', password='secret-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_nested(self, count):
+        profile = self.user.profile
+        SocialLinks.objects.get_or_create(profile=profile, defaults={'github': 'https://github.com/jane'})
+        BasicInfo.objects.get_or_create(profile=profile, defaults={'email': 'jane@example.com'})
+        offset = profile.educations.count()
+        for number in range(offset, offset + count):
+            Education.objects.create(profile=profile, degree=f'Degree {number}', institution='University', start_date=date(2015, 1, 1))
+            Experience.objects.create(profile=profile, company_name=f'Company {number}', role='Engineer', start_date=date(2019, 1, 1))
+            Project.objects.create(profile=profile, title=f'Project {number}')
+            profile.skills.add(Skill.objects.create(name=f'Skill {number}'))
+
+    def assert_bounded(self, url):
+        for count in (1, 10):
+            self.add_nested(count)
+            with self.assertNumQueries(self.PROFILE_QUERIES):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_list(self):
+        data = self.assert_bounded('/api/accounts/profile/')
+        self.assertEqual(len(data), 1)
+        self.assertEqual(len(data[0]['projects']), 11)
+
+    def test_retrieve(self):
+        data = self.assert_bounded(f'/api/accounts/profile/{self.user.profile.pk}/')
+        self.assertEqual(len(data['educations']), 11)
+        self.assertEqual(data['social_links']['github'], 'https://github.com/jane')
+
+    def test_me(self):
+        data = self.assert_bounded('/api/accounts/profile/me/')
+        self.assertEqual(len(data['skills']), 11)
+        self.assertEqual(data['basic_info']['email'], 'jane@example.com')
+
+    def test_me_without_optional_relations(self):
+        with self.assertNumQueries(self.PROFILE_QUERIES):
+            response = self.client.get('/api/accounts/profile/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['social_links'])
+        self.assertIsNone(response.json()['basic_info'])
+
+
+class ProfileNestedSyncTests(TestCase):
+    """
+    Saving a profile syncs its nested collections by id instead of deleting
+    and recreating them, in a number of queries independent of their size.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='jane@example.com', username='jane', password='secret-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/accounts/profile/{self.user.profile.pk}/'
+
+    def payload(self, count):
+        return {
+            'educations': [{'degree': f'Degree {n}', 'institution': 'University', 'start_date': '2015-01-01'} for n in range(count)],
+            'experiences': [{'company_name': f'Company {n}', 'role': 'Engineer', 'start_date': '2019-01-01'} for n in range(count)],
+            'projects': [{'title': f'Project {n}'} for n in range(count)],
+        }
+
+    def save(self, payload):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), len(queries)
+
+    def edit(self, data):
+        # Change the first item, drop the last and add a new one in each collection
+        data['educations'][0]['degree'] = 'Changed'
+        data['experiences'][0]['role'] = 'Lead'
+        data['projects'][0]['title'] = 'Changed'
+        for key, new in (('educations', {'degree': 'New', 'institution': 'University', 'start_date': '2020-01-01'}),
+                         ('experiences', {'company_name': 'New', 'role': 'Engineer', 'start_date': '2021-01-01'}),
+                         ('projects', {'title': 'New'})):
+            data[key].pop()
+            data[key].append(new)
+        return {key: data[key] for key in ('educations', 'experiences', 'projects')}
+
+    def test_update_keeps_ids(self):
+        data, _ = self.save(self.payload(5))
+        kept_ids = [item['id'] for item in data['educations'][:4]]
+        removed_id = data['educations'][4]['id']
+
+        data, _ = self.save(self.edit(data))
+        ids = [item['id'] for item in data['educations']]
+        self.assertEqual(ids[:4], kept_ids)
+        self.assertNotIn(removed_id, ids)
+        self.assertEqual(data['educations'][0]['degree'], 'Changed')
+        self.assertEqual(data['educations'][-1]['degree'], 'New')
+        self.assertEqual(Education.objects.filter(profile=self.user.profile).count(), 5)
+
+    def test_query_count_independent_of_size(self):
+        counts = []
+        for size in (3, 30):
+            Education.objects.all().delete()
+            Experience.objects.all().delete()
+            Project.objects.all().delete()
+            data, created = self.save(self.payload(size))
+            _, updated = self.save(self.edit(data))
+            counts.append((created, updated))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_invalid_item_rolls_back(self):
+        data, _ = self.save(self.payload(2))
+        payload = self.edit(data)
+        payload['projects'][0]['link'] = 'not a url'
+        response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Education.objects.filter(degree='Changed').exists())
+
+
+class SkillResolverTests(TestCase):
+    """
+    Skill names resolve to ids in a fixed number of queries, matching
+    existing skills case- and whitespace-insensitively.
+    """
+
+    def setUp(self):
+        skill_ids.clear()
+        self.addCleanup(skill_ids.clear)
+
+    def test_resolves_in_three_queries(self):
+        Skill.objects.bulk_create([Skill(name=f'Skill {number}') for number in range(20)])
+        names = [f'skill  {number}' for number in range(40)]
+        with self.assertNumQueries(3):
+            ids = resolve_skill_ids(names)
+        self.assertEqual(len(ids), 40)
+        self.assertEqual(Skill.objects.count(), 40)
+        self.assertEqual(Skill.objects.get(pk=ids[0]).name, 'Skill 0')
+        self.assertEqual(Skill.objects.get(pk=ids[39]).name, 'skill 39')
+
+    def test_deduplicates_names(self):
+        ids = resolve_skill_ids([' Python ', 'python', 'PYTHON', '', 'Django'])
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(sorted(Skill.objects.values_list('name', flat=True)), ['Django', 'Python'])
+
+    def test_cache_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = resolve_skill_ids(['Python', 'Django'])
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_skill_ids(['django', 'python']), ids[::-1])
+
+        Skill.objects.filter(name='Python').delete()
+        with self.assertNumQueries(3):
+            self.assertNotEqual(resolve_skill_ids(['Python'])[0], ids[0])
+
+    def test_rename_drops_cached_name(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            python_id = resolve_skill_ids(['Python'])[0]
+        user = User.objects.create_user(email='jane@example.com', username='jane', password='secret-pass-123')
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(f'/api/accounts/skills/{python_id}/', {'name': 'Rust'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+
+        self.assertNotEqual(resolve_skill_ids(['Python'])[0], python_id)
+        self.assertEqual(resolve_skill_ids(['rust']), [python_id])
+
+    def test_rename_in_lookup_transaction(self):
+        # A lookup made earlier in the same transaction caches the old name on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            python_id = resolve_skill_ids(['Python'])[0]
+            Skill.objects.filter(pk=python_id).update(name='Rust')
+            Skill.objects.get(pk=python_id).save()
+        self.assertNotEqual(resolve_skill_ids(['Python'])[0], python_id)
+
+    def test_profile_save(self):
+        user = User.objects.create_user(email='jane@example.com', username='jane', password='secret-pass-123')
+        client = APIClient()
+        client.force_authenticate(user)
+        skills = [{'name': f'Skill {number}'} for number in range(40)] + [{'name': 'skill 0'}]
+        response = client.patch(f'/api/accounts/profile/{user.profile.pk}/', {'skills': skills}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(len(response.json()['skills']), 40)
+
+
+class SkillTypeaheadTests(TestCase):
+    """
+    The typeahead endpoint answers prefix searches from the in-memory skill
+    index, ranked by how many profiles list each skill.
+    """
+
+    url = '/api/accounts/skills/typeahead/'
+
+    def setUp(self):
+        skill_index.clear()
+        self.addCleanup(skill_index.clear)
+        self.user = User.objects.create_user(email='jane@example.com', username='jane', password='secret-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.skills = {name: Skill.objects.create(name=name) for name in ('Python', 'PyTorch', 'Pandas', 'Machine Learning')}
+        self.user.profile.skills.add(self.skills['PyTorch'])
+        for number in range(2):
+            other = User.objects.create_user(email=f'user{number}@example.com', username=f'user{number}', password='secret-pass-123')
+            other.profile.skills.add(self.skills['Python'], self.skills['Machine Learning'])
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(item['name'], item['profiles']) for item in response.json()]
+
+    def test_ranked_by_profiles(self):
+        self.assertEqual(self.search(q='py'), [('Python', 2), ('PyTorch', 1)])
+        self.assertEqual(self.search(q='  LEARN'), [('Machine Learning', 2)])
+        self.assertEqual(self.search(q='p', limit=1), [('Python', 2)])
+        self.assertEqual(self.search(q='rust'), [])
+
+    def test_no_queries_once_built(self):
+        self.search(q='py')
+        with self.assertNumQueries(0):
+            self.assertEqual(skill_index.search('pa'), [(self.skills['Pandas'].pk, 'Pandas', 0)])
+
+    def test_follows_signals(self):
+        self.search(q='py')
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='PySpark')
+            self.user.profile.skills.set([self.skills['Python'], self.skills['Pandas']])
+            self.skills['Machine Learning'].delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            resolve_skill_ids(['Pydantic'])
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [(name, count) for _, name, count in skill_index.search('py')],
+                [('Python', 3), ('Pydantic', 0), ('PySpark', 0), ('PyTorch', 0)],
+            )
+            self.assertEqual(skill_index.search('machine'), [])
 
-# Create your tests here.
+    def test_invalid_limit(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'py', 'limit': 'ten'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'py', 'limit': 0}).status_code, 400)
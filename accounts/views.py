@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -10,6 +11,7 @@ from .serializers import (
     BasicInfoSerializer
 )
 from .permissions import IsOwnerProfile
+from .skills import skill_index
 
 
 User = get_user_model()
@@ -33,7 +35,11 @@ class RegisterViewSet(viewsets.GenericViewSet):
 
 
 class ProfileViewSet(viewsets.ModelViewSet):
-    queryset = UserProfile.objects.select_related('user').prefetch_related('skills')
+    # Everything UserProfileSerializer renders, so a page of profiles costs a
+    # fixed number of queries however many nested rows each one has
+    queryset = UserProfile.objects.select_related(
+        'user', 'social_links', 'basic_info'
+    ).prefetch_related('skills', 'educations', 'experiences', 'projects')
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerProfile]
 
@@ -42,7 +48,7 @@ class ProfileViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def me(self, request):
-        profile = request.user.profile
+        profile = get_object_or_404(self.get_queryset())
         return Response(self.get_serializer(profile).data)
 
     @action(detail=False, methods=['post'], url_path='upload-resume')
@@ -100,6 +106,24 @@ class SkillViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
 
+    TYPEAHEAD_LIMIT = 10
+    TYPEAHEAD_MAX_LIMIT = 50
+
+    @action(detail=False, methods=['get'])
+    def typeahead(self, request):
+        # Served from the in-memory skill index, most used skills first
+        try:
+            limit = min(int(request.query_params.get('limit', self.TYPEAHEAD_LIMIT)), self.TYPEAHEAD_MAX_LIMIT)
+        except ValueError:
+            return Response({'detail': 'limit must be an integer'}, status=400)
+        if limit < 1:
+            return Response({'detail': 'limit must be at least 1'}, status=400)
+        matches = skill_index.search(request.query_params.get('q', ''), limit=limit)
+        return Response([
+            {'id': skill_id, 'name': name, 'profiles': profile_count}
+            for skill_id, name, profile_count in matches
+        ])
+
 
 class SocialLinksViewSet(viewsets.ModelViewSet):
     serializer_class = SocialLinksSerializer
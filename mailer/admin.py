@@ -1,12 +1,24 @@
 from django.contrib import admin
 from django.contrib import messages
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.core.mail import send_mail, EmailMultiAlternatives, get_connection
 from django.conf import settings
 from django.http import HttpResponseRedirect
 from django.urls import path
 from django.shortcuts import render, redirect
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import UserProfile, EmailRequest, EmailSent
+from .attachments import attach_resume
+from .backends import send_batch
+from .duplicates import find_duplicates, normalize_email, normalize_text, window_days
+from .models import UserProfile, EmailRequest, EmailSent, OutboundEmail, Campaign
+from .outbound import enqueue_email
+from .ratelimit import acquire
+from .retry import record_failed_attempt
+from collections import defaultdict
+from datetime import timedelta
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @admin.register(UserProfile)
@@ -15,10 +27,11 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ['education_degree', 'graduation_year', 'created_at']
     search_fields = ['name', 'university_name', 'education_field', 'primary_email']
     readonly_fields = ['created_at', 'updated_at']
+    raw_id_fields = ['user']
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('name', 'location', 'phone_number', 'primary_email')
+            'fields': ('user', 'name', 'location', 'phone_number', 'primary_email')
         }),
         ('Contact Information', {
             'fields': ('alternative_email', 'portfolio_url', 'linkedin_url', 'github_url', 'leetcode_url')
@@ -47,8 +60,10 @@ class EmailRequestAdmin(admin.ModelAdmin):
     list_display = ['get_name', 'company', 'role', 'hr_email', 'created_at', 'send_email_link']
     list_filter = ['company', 'created_at']
     search_fields = ['user_profile__name', 'company', 'role', 'hr_email']
+    list_select_related = ['user_profile']
     readonly_fields = ['created_at', 'updated_at', 'send_email_link']
     actions = ['send_emails_action']
+    send_chunk_size = 100
 
     def get_name(self, obj):
         return obj.user_profile.name if obj.user_profile else obj.name
@@ -101,7 +116,7 @@ class EmailRequestAdmin(admin.ModelAdmin):
                     resume_attached = False
                     if email_request.user_profile and email_request.user_profile.resume_file:
                         try:
-                            email.attach_file(email_request.user_profile.resume_file.path)
+                            attach_resume(email, email_request.user_profile.resume_file.path)
                             resume_attached = True
                         except Exception as attach_error:
                             logger.warning(f"Failed to attach resume: {str(attach_error)}")
@@ -111,6 +126,7 @@ class EmailRequestAdmin(admin.ModelAdmin):
                     # Record the sent email
                     EmailSent.objects.create(
                         email_request=email_request,
+                        user_profile=email_request.user_profile,
                         to_email=email_request.hr_email,
                         subject=subject,
                         body=body,
@@ -136,63 +152,168 @@ class EmailRequestAdmin(admin.ModelAdmin):
     def send_emails_action(self, request, queryset):
         sent_count = 0
         failed_count = 0
+        deferred_count = 0
+        skipped_count = 0
+        email_requests = list(queryset.select_related('user_profile'))
+        chunk_count = (len(email_requests) + self.send_chunk_size - 1) // self.send_chunk_size
+        
+        # One connection for the whole action; the pooled backend keeps it authenticated
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            messages.error(request, f'Failed to connect to the mail server: {str(e)}')
+            return
+        
+        try:
+            for chunk_number, offset in enumerate(range(0, len(email_requests), self.send_chunk_size), start=1):
+                chunk = email_requests[offset:offset + self.send_chunk_size]
+                chunk_sent, chunk_failed, chunk_deferred, chunk_skipped = self._send_chunk(request, chunk, connection)
+                sent_count += chunk_sent
+                failed_count += chunk_failed
+                deferred_count += chunk_deferred
+                skipped_count += chunk_skipped
+                if chunk_count > 1:
+                    messages.info(request, f'Chunk {chunk_number}/{chunk_count}: sent {chunk_sent}, failed {chunk_failed}, deferred {chunk_deferred}, skipped {chunk_skipped}')
+        finally:
+            connection.close()
         
-        for email_request in queryset:
+        if sent_count > 0:
+            messages.success(request, f'Successfully sent {sent_count} email(s)')
+        if deferred_count > 0:
+            messages.info(request, f'Sending rate limit reached: {deferred_count} email(s) queued for the mail worker')
+        if skipped_count > 0:
+            messages.warning(request, f'Skipped {skipped_count} email(s) already sent to the same recipient and role within the last {window_days()} days')
+        if failed_count > 0:
+            messages.warning(request, f'Failed to send {failed_count} email(s)')
+    
+    def _duplicate_ids(self, email_requests):
+        """
+        Ids of the requests whose recipient was already emailed (or has an
+        email queued) by the same profile about the same job, or that repeat
+        an earlier request in ``email_requests``. Runs one query per profile.
+        """
+        by_profile = defaultdict(list)
+        for email_request in email_requests:
+            if email_request.user_profile_id is not None:
+                by_profile[email_request.user_profile_id].append(email_request)
+        
+        duplicate_ids = set()
+        for user_profile_id, profile_requests in by_profile.items():
+            recipients = [
+                {'hr_email': email_request.hr_email, 'company': email_request.company, 'role': email_request.role}
+                for email_request in profile_requests
+            ]
+            for email_request, duplicate in zip(profile_requests, find_duplicates(recipients, user_profile_id)):
+                if duplicate:
+                    duplicate_ids.add(email_request.pk)
+        
+        seen = set()
+        for email_request in email_requests:
+            key = (
+                email_request.user_profile_id, normalize_email(email_request.hr_email),
+                normalize_text(email_request.company), normalize_text(email_request.role),
+            )
+            if key in seen:
+                duplicate_ids.add(email_request.pk)
+            seen.add(key)
+        return duplicate_ids
+    
+    def _send_chunk(self, request, email_requests, connection):
+        """
+        Send one chunk of email requests with a single ``send_messages()``
+        call and record the results with a single bulk insert. Emails over the
+        sending rate limit are handed to the outbound queue instead of being
+        sent, recipients already emailed about the same job are skipped, and
+        failed sends are recorded for the retry worker.
+        """
+        pending = []
+        failed_count = 0
+        deferred_count = 0
+        skipped_count = 0
+        duplicate_ids = self._duplicate_ids(email_requests)
+        
+        for email_request in email_requests:
             if not email_request.generated_email:
                 failed_count += 1
                 continue
-                
-            try:
-                subject = f'Application for {email_request.role} at {email_request.company}'
-                
-                # Create email with attachment support
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=email_request.generated_email,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    to=[email_request.hr_email],
-                )
-                
-                # Attach resume if available
-                resume_attached = False
-                if email_request.user_profile and email_request.user_profile.resume_file:
-                    try:
-                        email.attach_file(email_request.user_profile.resume_file.path)
-                        resume_attached = True
-                    except Exception as attach_error:
-                        logger.warning(f"Failed to attach resume: {str(attach_error)}")
-                
-                email.send()
-                
-                # Record the sent email
-                EmailSent.objects.create(
-                    email_request=email_request,
+            
+            if email_request.pk in duplicate_ids:
+                skipped_count += 1
+                continue
+            
+            subject = f'Application for {email_request.role} at {email_request.company}'
+            
+            wait = acquire(settings.DEFAULT_FROM_EMAIL, max_wait=0)
+            if wait:
+                enqueue_email(
                     to_email=email_request.hr_email,
                     subject=subject,
                     body=email_request.generated_email,
-                    status='sent',
-                    resume_attached=resume_attached
+                    user_profile=email_request.user_profile,
+                    email_request=email_request,
+                    company=email_request.company,
+                    role=email_request.role,
+                    attach_resume=True,
+                    deferred_until=timezone.now() + timedelta(seconds=wait),
                 )
-                sent_count += 1
-                
-            except Exception as e:
+                deferred_count += 1
+                continue
+            
+            # Create email with attachment support
+            email = EmailMultiAlternatives(
+                subject=subject,
+                body=email_request.generated_email,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email_request.hr_email],
+            )
+            
+            # Attach resume if available
+            resume_attached = False
+            if email_request.user_profile and email_request.user_profile.resume_file:
+                try:
+                    attach_resume(email, email_request.user_profile.resume_file.path)
+                    resume_attached = True
+                except Exception as attach_error:
+                    logger.warning(f"Failed to attach resume: {str(attach_error)}")
+            
+            pending.append((email_request, email, resume_attached))
+        
+        errors = send_batch(connection, [email for _, email, _ in pending])
+        
+        records = []
+        for (email_request, email, resume_attached), error in zip(pending, errors):
+            record = EmailSent(
+                email_request=email_request,
+                user_profile=email_request.user_profile,
+                company=email_request.company,
+                role=email_request.role,
+                to_email=email_request.hr_email,
+                subject=email.subject,
+                body=email_request.generated_email,
+                status='sent',
+                resume_attached=resume_attached
+            )
+            if error is not None:
+                # The retry worker picks the row up again if the error is transient
+                record_failed_attempt(record, error, save=False)
                 failed_count += 1
-                messages.error(request, f'Failed to send email to {email_request.hr_email}: {str(e)}')
+                messages.error(request, f'Failed to send email to {email_request.hr_email}: {str(error)}')
+            records.append(record)
         
-        if sent_count > 0:
-            messages.success(request, f'Successfully sent {sent_count} email(s)')
-        if failed_count > 0:
-            messages.warning(request, f'Failed to send {failed_count} email(s)')
+        # Record the sent and failed emails
+        EmailSent.objects.bulk_create(records)
+        return errors.count(None), failed_count, deferred_count, skipped_count
     
     send_emails_action.short_description = 'Send emails for selected requests'
 
 
 @admin.register(EmailSent)
 class EmailSentAdmin(admin.ModelAdmin):
-    list_display = ['to_email', 'subject', 'sent_at', 'status', 'resume_attached', 'view_body_link']
+    list_display = ['to_email', 'subject', 'sent_at', 'status', 'resume_attached', 'attempt_count', 'next_attempt_at', 'view_body_link']
     list_filter = ['status', 'sent_at', 'resume_attached']
     search_fields = ['to_email', 'subject']
-    readonly_fields = ['sent_at']
+    readonly_fields = ['sent_at', 'attempt_count', 'next_attempt_at', 'last_error']
     actions = ['resend_emails_action']
 
     def view_body_link(self, obj):
@@ -239,14 +360,17 @@ class EmailSentAdmin(admin.ModelAdmin):
                     
                     # Update status
                     email_sent.status = 'sent'
+                    email_sent.attempt_count += 1
+                    email_sent.next_attempt_at = None
+                    email_sent.last_error = ''
                     email_sent.save()
                     
                     messages.success(request, f'Email resent successfully to {email_sent.to_email}')
                     return redirect('/admin/mailer/emailsent/')
                     
                 except Exception as e:
-                    email_sent.status = 'failed'
-                    email_sent.save()
+                    email_sent.attempt_count += 1
+                    record_failed_attempt(email_sent, e)
                     messages.error(request, f'Failed to resend email: {str(e)}')
             
             return render(request, 'admin/mailer/resend_email.html', {
@@ -261,6 +385,7 @@ class EmailSentAdmin(admin.ModelAdmin):
     def resend_emails_action(self, request, queryset):
         resent_count = 0
         failed_count = 0
+        connection = get_connection()
         
         for email_sent in queryset:
             try:
@@ -270,21 +395,59 @@ class EmailSentAdmin(admin.ModelAdmin):
                     from_email=settings.DEFAULT_FROM_EMAIL,
                     recipient_list=[email_sent.to_email],
                     fail_silently=False,
+                    connection=connection,
                 )
                 
                 email_sent.status = 'sent'
+                email_sent.attempt_count += 1
+                email_sent.next_attempt_at = None
+                email_sent.last_error = ''
                 email_sent.save()
                 resent_count += 1
                 
             except Exception as e:
-                email_sent.status = 'failed'
-                email_sent.save()
+                email_sent.attempt_count += 1
+                record_failed_attempt(email_sent, e)
                 failed_count += 1
                 messages.error(request, f'Failed to resend email to {email_sent.to_email}: {str(e)}')
         
+        connection.close()
+        
         if resent_count > 0:
             messages.success(request, f'Successfully resent {resent_count} email(s)')
         if failed_count > 0:
             messages.warning(request, f'Failed to resend {failed_count} email(s)')
     
     resend_emails_action.short_description = 'Resend selected emails'
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['to_email', 'subject', 'status', 'attach_resume', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['to_email', 'subject']
+    readonly_fields = ['created_at', 'updated_at', 'sent_at', 'email_sent']
+    actions = ['requeue_action']
+
+    def requeue_action(self, request, queryset):
+        unsent = queryset.exclude(status=OutboundEmail.Status.SENT)
+        # A failed send still scheduled for retry belongs to the retry worker; requeueing it would send it twice
+        retrying = unsent.filter(email_sent__next_attempt_at__isnull=False)
+        retrying_count = retrying.count()
+        requeued_count = unsent.exclude(pk__in=retrying.values('pk')).update(
+            status=OutboundEmail.Status.QUEUED, error='', updated_at=timezone.now()
+        )
+        messages.success(request, f'Requeued {requeued_count} email(s)')
+        if retrying_count:
+            messages.info(request, f'Left {retrying_count} email(s) scheduled for automatic retry')
+
+    requeue_action.short_description = 'Requeue selected emails'
+
+
+@admin.register(Campaign)
+class CampaignAdmin(admin.ModelAdmin):
+    list_display = ['subject_template', 'user_profile', 'status', 'enqueued_count', 'skipped_count', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject_template', 'user_profile__name']
+    list_select_related = ['user_profile']
+    readonly_fields = ['status', 'enqueued_count', 'skipped_count', 'error', 'created_at', 'updated_at']
@@ -0,0 +1,339 @@
+"""
+Async versions of the generation and cover letter endpoints.
+
+Served under ASGI (e.g. ``gunicorn jobmailer.asgi:application -k
+uvicorn.workers.UvicornWorker``), these await Gemini and the database instead
+of blocking a worker thread, so one worker can hold many in-flight LLM calls.
+DRF's ``@api_view`` is sync-only, so authentication and body parsing are done
+by ``async_api_view`` below with the same JWT authentication and
+authenticated-only POST rule the DRF views use.
+"""
+from functools import wraps
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .cover_letter import cover_letter_details, letter_date
+from .duplicates import afind_duplicates, allows_duplicates, duplicate_error
+from .generation import (
+    email_prompt_inputs, build_email_prompt, enhanced_prompt_inputs, build_enhanced_prompt,
+    email_fallback, enhanced_fallback_email, agenerate_text
+)
+from .models import UserProfile, EmailRequest
+from .outbound import aenqueue_email, aget_sender_info
+from .pdf_cache import cover_letter_etag, etag_matches, get_cover_letter
+from .profiles import profile_snapshots
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def _parse_body(request):
+    content_type = request.content_type or ''
+    if content_type == 'application/json':
+        data = json.loads(request.body or b'{}')
+        if not isinstance(data, dict):
+            raise ValueError('Expected a JSON object')
+        return data
+    return request.POST
+
+
+def async_api_view(view):
+    """
+    Authenticate the caller with a JWT and parse the request body into
+    ``request.data`` before running an async POST view
+    """
+    @csrf_exempt
+    @require_POST
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            authenticated = await sync_to_async(JWTAuthentication().authenticate)(request)
+        except APIException as e:
+            detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+            return JsonResponse(detail, status=e.status_code)
+        if authenticated is None:
+            return JsonResponse(
+                {'detail': NotAuthenticated.default_detail},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        request.user, request.auth = authenticated
+
+        try:
+            request.data = _parse_body(request)
+        except ValueError as e:
+            return JsonResponse(
+                {'detail': f'JSON parse error - {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@async_api_view
+async def generate_email_async(request):
+    """
+    Async version of generate_email
+    """
+    try:
+        # Validate required fields
+        required_fields = ['hr_email', 'company', 'role', 'name', 'skills']
+        for field in required_fields:
+            if field not in request.data:
+                return JsonResponse(
+                    {'error': f'Missing required field: {field}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        # Extract data from request
+        hr_email = request.data['hr_email']
+        company = request.data['company']
+        role = request.data['role']
+        name = request.data['name']
+        skills = request.data['skills']
+
+        # Create email request record
+        email_request = await EmailRequest.objects.acreate(
+            hr_email=hr_email,
+            company=company,
+            role=role,
+            name=name,
+            skills=skills
+        )
+
+        prompt_inputs = email_prompt_inputs(name, company, role, hr_email, skills)
+        prompt = build_email_prompt(prompt_inputs)
+
+        warning = None
+        try:
+            generated_email, cache_hit = await agenerate_text(prompt, prompt_inputs)
+        except Exception as ai_error:
+            logger.error(f"Gemini AI error: {str(ai_error)}")
+            generated_email = email_fallback(name, company, role, skills)
+            cache_hit = False
+            warning = 'AI generation failed, using template email'
+
+        email_request.generated_email = generated_email
+        await email_request.asave()
+
+        response_data = {
+            'status': 'success',
+            'email_text': generated_email,
+            'request_id': email_request.id,
+            'cache_hit': cache_hit
+        }
+        if warning:
+            response_data['warning'] = warning
+        return JsonResponse(response_data, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in generate_email_async: {str(e)}")
+        return JsonResponse(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@async_api_view
+async def generate_email_enhanced_async(request):
+    """
+    Async version of generate_email_enhanced
+    """
+    try:
+        profile_id = request.data.get('profile_id')
+        if not profile_id:
+            return JsonResponse(
+                {'error': 'profile_id is required. Please create a user profile first using /api/create-profile/'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            user_profile = await profile_snapshots.aget(profile_id)
+        except UserProfile.DoesNotExist:
+            return JsonResponse(
+                {'error': 'User profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Extract job details
+        hr_email = request.data.get('hr_email')
+        company = request.data.get('company')
+        role = request.data.get('role')
+        job_description = request.data.get('job_description', '')
+
+        if not all([hr_email, company, role]):
+            return JsonResponse(
+                {'error': 'Missing required fields: hr_email, company, role'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Create email request
+        email_request = await EmailRequest.objects.acreate(
+            user_profile_id=user_profile.id,
+            hr_email=hr_email,
+            company=company,
+            role=role,
+            job_description=job_description
+        )
+
+        prompt_inputs = enhanced_prompt_inputs(user_profile, company, role, job_description)
+        prompt = build_enhanced_prompt(prompt_inputs)
+
+        warning = None
+        try:
+            generated_email, cache_hit = await agenerate_text(prompt, prompt_inputs)
+        except Exception as ai_error:
+            logger.error(f"Gemini AI error: {str(ai_error)}")
+            generated_email = enhanced_fallback_email(user_profile, company, role)
+            cache_hit = False
+            warning = 'AI generation failed, using enhanced template email'
+
+        email_request.generated_email = generated_email
+        await email_request.asave()
+
+        response_data = {
+            'status': 'success',
+            'email_text': generated_email,
+            'request_id': email_request.id,
+            'profile_id': user_profile.id,
+            'cache_hit': cache_hit
+        }
+        if warning:
+            response_data['warning'] = warning
+        return JsonResponse(response_data, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in generate_email_enhanced_async: {str(e)}")
+        return JsonResponse(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@async_api_view
+async def generate_cover_letter_pdf_async(request):
+    """
+    Async version of generate_cover_letter_pdf
+    """
+    try:
+        # Validate required fields
+        required_fields = ['profile_id', 'company', 'role']
+        for field in required_fields:
+            if field not in request.data:
+                return JsonResponse(
+                    {'error': f'Missing required field: {field}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        details = cover_letter_details(request.data)
+
+        try:
+            user_profile = await profile_snapshots.aget(request.data['profile_id'])
+        except UserProfile.DoesNotExist:
+            return JsonResponse(
+                {'error': 'User profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        date = letter_date()
+        etag = cover_letter_etag(user_profile, details, date)
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        # Rendering (and reading the cache from disk) is blocking; keep it off the event loop
+        filename, pdf_bytes, _ = await sync_to_async(get_cover_letter, thread_sensitive=False)(
+            user_profile, details, date
+        )
+
+        response = HttpResponse(pdf_bytes, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['ETag'] = etag
+        return response
+
+    except Exception as e:
+        logger.error(f"Error generating cover letter PDF: {str(e)}")
+        return JsonResponse(
+            {'error': 'Failed to generate cover letter PDF'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@async_api_view
+async def send_email_with_resume_and_cover_letter_async(request):
+    """
+    Async version of send_email_with_resume_and_cover_letter
+    """
+    try:
+        # Validate required fields
+        required_fields = ['hr_email', 'subject', 'body', 'profile_id', 'company', 'role']
+        for field in required_fields:
+            if field not in request.data:
+                return JsonResponse(
+                    {'error': f'Missing required field: {field}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        details = cover_letter_details(request.data)
+
+        try:
+            user_profile = await profile_snapshots.aget(request.data['profile_id'])
+        except UserProfile.DoesNotExist:
+            return JsonResponse(
+                {'error': 'User profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Refuse to email the same recipient about the same job twice
+        if not allows_duplicates(request.data):
+            duplicate = (await afind_duplicates([request.data], user_profile.id))[0]
+            if duplicate:
+                return JsonResponse(duplicate_error(duplicate), status=status.HTTP_409_CONFLICT)
+
+        # Prefer the caller's own mailbox; fall back to the default account
+        sender_info = await aget_sender_info(request.user)
+
+        if not sender_info and (not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD):
+            return JsonResponse(
+                {'error': 'Email configuration not set. Please configure EMAIL_HOST_USER and EMAIL_HOST_PASSWORD.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        attachments_added = ['Resume', 'Cover Letter'] if user_profile.has_resume else ['Cover Letter']
+
+        # Queue the email for the mail worker; the cover letter is rendered at send time
+        outbound = await aenqueue_email(
+            to_email=request.data['hr_email'],
+            subject=request.data['subject'],
+            body=request.data['body'],
+            user_profile=user_profile,
+            attach_resume=True,
+            sender_info=sender_info,
+            created_by=request.user,
+            cover_letter=details,
+        )
+
+        return JsonResponse({
+            'status': 'queued',
+            'message': 'Email queued for delivery',
+            'job_id': outbound.id,
+            'resume_attached': 'Resume' in attachments_added,
+            'cover_letter_attached': True,
+            'attachments': attachments_added
+        }, status=status.HTTP_202_ACCEPTED)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in send_email_with_resume_and_cover_letter_async: {str(e)}")
+        return JsonResponse(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from email import encoders
+from email.mime.base import MIMEBase
+import mimetypes
+import os
+import threading
+
+from django.conf import settings
+
+
+def _filename_param(filename):
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        return ('utf-8', '', filename)
+    return filename
+
+
+def build_attachment_part(path):
+    """Read a file and return it as a base64-encoded MIME attachment part"""
+    mimetype, _ = mimetypes.guess_type(path)
+    basetype, subtype = (mimetype or 'application/octet-stream').split('/', 1)
+    with open(path, 'rb') as f:
+        content = f.read()
+    part = MIMEBase(basetype, subtype)
+    part.set_payload(content)
+    encoders.encode_base64(part)
+    part.add_header('Content-Disposition', 'attachment', filename=_filename_param(os.path.basename(path)))
+    return part
+
+
+class AttachmentCache:
+    """
+    LRU cache of MIME-encoded file attachments, bounded by the total size of
+    the encoded payloads.
+
+    Entries are keyed by path and validated against the file's mtime and size,
+    so a re-uploaded resume is re-read on its next send. A cached part is only
+    ever read when messages are serialized, so one instance can be attached
+    to many messages.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total = 0
+
+    def get(self, path):
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(path)
+                return entry[1]
+
+        part = build_attachment_part(path)
+        size = len(part.get_payload())
+        if size > self.max_bytes:
+            return part
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._total -= old[2]
+            self._entries[path] = (version, part, size)
+            self._total += size
+            while self._total > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._total -= evicted_size
+        return part
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+
+
+attachment_cache = AttachmentCache(
+    max_bytes=getattr(settings, 'EMAIL_ATTACHMENT_CACHE_MAX_BYTES', 50 * 1024 * 1024),
+)
+
+
+def attach_resume(email, path):
+    """
+    Attach the file at ``path`` to ``email``, reusing the encoded part when
+    the same unchanged file was attached before.
+    """
+    mimetype, _ = mimetypes.guess_type(path)
+    if mimetype and mimetype.startswith('text/'):
+        # Django re-encodes text attachments with the message charset
+        email.attach_file(path)
+        return
+    email.attach(attachment_cache.get(path))
@@ -0,0 +1,276 @@
+import atexit
+import hashlib
+import logging
+import smtplib
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.smtp import EmailBackend
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection:
+    """An authenticated SMTP connection plus the bookkeeping the pool needs"""
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+
+    def is_expired(self, max_idle):
+        return time.monotonic() - self.last_used > max_idle
+
+    def is_reusable(self, max_messages):
+        return self.smtp.sock is not None and self.messages_sent < max_messages
+
+    def quit(self):
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of idle SMTP connections keyed by server and credentials
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = defaultdict(deque)
+
+    def acquire(self, key, max_idle):
+        expired = []
+        pooled = None
+        with self._lock:
+            idle = self._idle[key]
+            while idle:
+                candidate = idle.pop()
+                if candidate.is_expired(max_idle):
+                    expired.append(candidate)
+                    continue
+                pooled = candidate
+                break
+        for candidate in expired:
+            candidate.quit()
+        return pooled
+
+    def release(self, key, pooled, max_size):
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < max_size:
+                idle.append(pooled)
+                return
+        pooled.quit()
+
+    def discard(self, key):
+        with self._lock:
+            connections = list(self._idle.pop(key, ()))
+        for pooled in connections:
+            pooled.quit()
+
+    def clear(self):
+        with self._lock:
+            connections = [pooled for idle in self._idle.values() for pooled in idle]
+            self._idle.clear()
+        for pooled in connections:
+            pooled.quit()
+
+
+connection_pool = ConnectionPool()
+atexit.register(connection_pool.clear)
+
+
+class PooledSMTPBackend(EmailBackend):
+    """
+    SMTP backend that hands connections back to a shared pool instead of
+    closing them, so repeated sends skip the TCP + STARTTLS + AUTH handshake.
+
+    Connections are dropped after ``EMAIL_POOL_MAX_IDLE`` seconds of idleness
+    or ``EMAIL_POOL_MAX_MESSAGES`` messages, and a send that hits a 421 reply
+    or a broken connection is retried once on a fresh connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_idle = getattr(settings, 'EMAIL_POOL_MAX_IDLE', 60)
+        self.max_messages = getattr(settings, 'EMAIL_POOL_MAX_MESSAGES', 100)
+        self.max_size = getattr(settings, 'EMAIL_POOL_MAX_SIZE', 4)
+        self._pooled = None
+
+    @property
+    def pool_key(self):
+        password_hash = hashlib.sha256((self.password or '').encode()).hexdigest()
+        return (self.host, self.port, self.username, password_hash, self.use_tls, self.use_ssl)
+
+    def open(self):
+        if self.connection:
+            return False
+        pooled = connection_pool.acquire(self.pool_key, self.max_idle)
+        if pooled is not None:
+            self.connection = pooled.smtp
+            self._pooled = pooled
+            return True
+        opened = super().open()
+        if self.connection is not None:
+            self._pooled = PooledConnection(self.connection)
+        return opened
+
+    def close(self):
+        if self.connection is None:
+            return
+        pooled = self._pooled
+        self._pooled = None
+        if pooled is not None and pooled.is_reusable(self.max_messages):
+            self.connection = None
+            connection_pool.release(self.pool_key, pooled, self.max_size)
+            return
+        super().close()
+
+    def _reconnect(self):
+        if self.connection is not None:
+            PooledConnection(self.connection).quit()
+        self.connection = None
+        self._pooled = None
+        super().open()
+        if self.connection is not None:
+            self._pooled = PooledConnection(self.connection)
+
+    def _send(self, email_message):
+        fail_silently = self.fail_silently
+        self.fail_silently = False
+        try:
+            try:
+                sent = super()._send(email_message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                logger.warning(f"SMTP connection lost, reconnecting: {str(e)}")
+                self._reconnect()
+                sent = super()._send(email_message)
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code != 421:
+                    raise
+                logger.warning(f"SMTP server closing connection (421), reconnecting: {str(e)}")
+                self._reconnect()
+                sent = super()._send(email_message)
+        except (smtplib.SMTPException, OSError):
+            if not fail_silently:
+                raise
+            return False
+        finally:
+            self.fail_silently = fail_silently
+
+        if sent and self._pooled is not None:
+            self._pooled.messages_sent += 1
+        return sent
+
+
+def send_batch(connection, email_messages):
+    """
+    Send ``email_messages`` with a single ``send_messages()`` call and report
+    what happened to each one.
+
+    Backends send in order and stop at the first failure, so the messages are
+    fed through a generator: the one being sent when an exception escapes is
+    the one that failed, and the rest of the batch goes out in another call.
+    Returns a list aligned with ``email_messages`` holding ``None`` for each
+    sent message and the exception for each failed one.
+    """
+    errors = [None] * len(email_messages)
+    position = 0
+
+    def pending():
+        nonlocal position
+        while position < len(email_messages):
+            yield email_messages[position]
+            position += 1
+
+    while position < len(email_messages):
+        start = position
+        try:
+            connection.send_messages(pending())
+        except Exception as e:
+            errors[position] = e
+            position += 1
+            continue
+        if position == start:
+            # The backend gave up without sending anything (it could not connect)
+            error = smtplib.SMTPServerDisconnected('Connection unavailable; messages were not sent')
+            errors[position:] = [error] * (len(email_messages) - position)
+            break
+    return errors
+
+
+class SenderBackendCache:
+    """
+    LRU cache of email backends built from each user's ``BasicInfo`` app
+    credentials.
+
+    Entries are evicted after ``max_idle`` seconds without use, when the cache
+    grows past ``max_size``, or as soon as ``BasicInfo.updated_at`` shows the
+    credentials were edited.
+    """
+
+    def __init__(self, max_size=256, max_idle=300):
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, basic_info):
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            # Entries are kept in least-recently-used order
+            while self._entries:
+                key, (_, _, last_used) = next(iter(self._entries.items()))
+                if now - last_used <= self.max_idle:
+                    break
+                evicted.append(self._entries.pop(key))
+
+            entry = self._entries.pop(basic_info.pk, None)
+            if entry is not None and entry[1] != basic_info.updated_at:
+                evicted.append(entry)
+                entry = None
+            backend = entry[0] if entry is not None else get_connection(
+                username=basic_info.email_app_user,
+                password=basic_info.email_app_password,
+            )
+            self._entries[basic_info.pk] = (backend, basic_info.updated_at, now)
+
+            while len(self._entries) > self.max_size:
+                evicted.append(self._entries.popitem(last=False)[1])
+
+        for old_backend, _, _ in evicted:
+            self._close(old_backend)
+        return backend
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._entries.values())
+            self._entries.clear()
+        for old_backend, _, _ in evicted:
+            self._close(old_backend)
+
+    def _close(self, backend):
+        try:
+            backend.close()
+        except Exception as e:
+            logger.warning(f"Failed to close sender backend: {str(e)}")
+        # Credentials may have changed; never hand these connections out again
+        if isinstance(backend, PooledSMTPBackend):
+            connection_pool.discard(backend.pool_key)
+
+
+sender_backends = SenderBackendCache(
+    max_size=getattr(settings, 'EMAIL_SENDER_CACHE_SIZE', 256),
+    max_idle=getattr(settings, 'EMAIL_SENDER_CACHE_MAX_IDLE', 300),
+)
@@ -0,0 +1,213 @@
+import csv
+import io
+import logging
+from string import Formatter
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .duplicates import find_duplicates, normalize_email, normalize_text, window_days
+from .models import Campaign, OutboundEmail
+from .outbound import build_outbound
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDERS = ('company', 'role', 'recipient_name')
+DEFAULT_RECIPIENT_NAME = 'Hiring Manager'
+
+# Rows rendered before each bulk insert + progress update
+CHUNK_SIZE = 500
+
+# Skip reasons kept on the campaign
+MAX_ERRORS = 20
+
+SUBJECT_MAX_LENGTH = OutboundEmail._meta.get_field('subject').max_length
+EMAIL_MAX_LENGTH = OutboundEmail._meta.get_field('to_email').max_length
+
+
+def template_fields(template):
+    """
+    Return the placeholders used by a template, raising ValueError for
+    malformed templates or unknown placeholders
+    """
+    fields = set()
+    for _, field_name, format_spec, conversion in Formatter().parse(template):
+        if field_name is None:
+            continue
+        if field_name not in PLACEHOLDERS or format_spec or conversion:
+            raise ValueError(
+                f"Unknown placeholder {{{field_name}}}; use {', '.join('{' + name + '}' for name in PLACEHOLDERS)} "
+                f"and write literal braces as {{{{ and }}}}"
+            )
+        fields.add(field_name)
+    return fields
+
+
+def iter_csv_recipients(uploaded_file):
+    """
+    Yield recipient dicts from an uploaded CSV one row at a time. Headers are
+    matched case-insensitively; ``email`` is accepted for ``hr_email``.
+    """
+    text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    try:
+        for row in csv.DictReader(text):
+            yield {(key or '').strip().lower(): (value or '').strip() for key, value in row.items() if key is not None}
+    finally:
+        # Leave the underlying upload open for Django to clean up
+        text.detach()
+
+
+def _recipient_fields(recipient, required):
+    if not isinstance(recipient, dict):
+        return None, 'not an object'
+    hr_email = str(recipient.get('hr_email') or recipient.get('email') or '').strip()
+    if not hr_email:
+        return None, 'missing hr_email'
+    try:
+        validate_email(hr_email)
+    except ValidationError:
+        return None, f'invalid email address {hr_email}'
+    if len(hr_email) > EMAIL_MAX_LENGTH:
+        return None, f'email address longer than {EMAIL_MAX_LENGTH} characters'
+
+    fields = {name: str(recipient.get(name) or '').strip() for name in PLACEHOLDERS}
+    fields['recipient_name'] = fields['recipient_name'] or DEFAULT_RECIPIENT_NAME
+    missing = [name for name in sorted(required) if not fields[name]]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    return (hr_email, fields), None
+
+
+def _drop_duplicates(campaign, pending):
+    """
+    Split a chunk of ``(number, recipient, outbound)`` into the emails to
+    queue and the recipients already emailed about the same job, checking
+    the whole chunk with one query
+    """
+    duplicates = find_duplicates(
+        [recipient for _, recipient, _ in pending],
+        campaign.user_profile,
+        exclude_campaign=campaign,
+    )
+    batch = []
+    skipped = []
+    for (number, recipient, outbound), duplicate in zip(pending, duplicates):
+        if duplicate:
+            skipped.append((number, f"already emailed {recipient['hr_email']} within the last {window_days()} days"))
+        else:
+            batch.append(outbound)
+    return batch, skipped
+
+
+def _flush(campaign, batch, skipped):
+    if not batch and not skipped:
+        return
+    # Rows and counters land together so progress never runs ahead of the queue
+    with transaction.atomic():
+        OutboundEmail.objects.bulk_create(batch)
+        Campaign.objects.filter(pk=campaign.pk).update(
+            enqueued_count=F('enqueued_count') + len(batch),
+            skipped_count=F('skipped_count') + skipped,
+            updated_at=timezone.now(),
+        )
+
+
+def run_campaign(campaign, recipients, chunk_size=CHUNK_SIZE, skip_duplicates=True):
+    """
+    Render and queue a campaign in one streaming pass over ``recipients``.
+
+    Emails are inserted in chunks and the campaign's counters are bumped
+    after each one, so progress can be read while the pass runs and the mail
+    worker starts sending the first chunk before the last one is rendered.
+    With ``skip_duplicates``, recipients listed twice or already emailed
+    about the same job are skipped. Returns the skip reasons recorded on the
+    campaign.
+    """
+    required = (template_fields(campaign.subject_template) | template_fields(campaign.body_template)) - {'recipient_name'}
+    errors = []
+    pending = []
+    skipped = 0
+    seen = set()
+    status = Campaign.Status.FAILED
+
+    def skip(number, error):
+        nonlocal skipped
+        skipped += 1
+        if len(errors) < MAX_ERRORS:
+            errors.append(f'Recipient {number}: {error}')
+
+    def flush():
+        nonlocal pending, skipped
+        batch = [outbound for _, _, outbound in pending]
+        if skip_duplicates and pending:
+            batch, duplicates = _drop_duplicates(campaign, pending)
+            for number, error in duplicates:
+                skip(number, error)
+        _flush(campaign, batch, skipped)
+        pending = []
+        skipped = 0
+
+    try:
+        for number, recipient in enumerate(recipients, start=1):
+            parsed, error = _recipient_fields(recipient, required)
+            if parsed is not None:
+                hr_email, fields = parsed
+                subject = campaign.subject_template.format(**fields)
+                if len(subject) > SUBJECT_MAX_LENGTH:
+                    error = f'subject longer than {SUBJECT_MAX_LENGTH} characters'
+                elif skip_duplicates:
+                    key = (normalize_email(hr_email), normalize_text(fields['company']), normalize_text(fields['role']))
+                    if key in seen:
+                        error = f'{hr_email} is listed more than once'
+                    seen.add(key)
+            if error:
+                skip(number, error)
+                continue
+
+            pending.append((number, dict(fields, hr_email=hr_email), build_outbound(
+                to_email=hr_email,
+                subject=subject,
+                body=campaign.body_template.format(**fields),
+                user_profile=campaign.user_profile,
+                attach_resume=campaign.attach_resume,
+                sender_info=campaign.sender_info,
+                campaign=campaign,
+                created_by=campaign.created_by,
+                company=fields['company'],
+                role=fields['role'],
+            )))
+            if len(pending) >= chunk_size:
+                flush()
+
+        flush()
+        status = Campaign.Status.ENQUEUED
+    except (UnicodeDecodeError, csv.Error) as e:
+        logger.error(f"Campaign {campaign.pk} recipient list could not be read: {str(e)}")
+        errors.append(f'Recipient list could not be read: {str(e)}')
+    finally:
+        campaign.status = status
+        campaign.error = '\n'.join(errors)
+        Campaign.objects.filter(pk=campaign.pk).update(
+            status=status, error=campaign.error, updated_at=timezone.now()
+        )
+        campaign.refresh_from_db(fields=['enqueued_count', 'skipped_count', 'updated_at'])
+    return errors
+
+
+def campaign_progress(campaign):
+    """
+    Count the campaign's emails by delivery status in a single query
+    """
+    counts = dict(
+        campaign.outbound_emails.order_by().values_list('status').annotate(count=Count('id'))
+    )
+    progress = {status: counts.get(status, 0) for status in OutboundEmail.Status.values}
+    progress['completed'] = (
+        campaign.status == Campaign.Status.ENQUEUED
+        and not progress[OutboundEmail.Status.QUEUED]
+        and not progress[OutboundEmail.Status.SENDING]
+    )
+    return progress
@@ -0,0 +1,237 @@
+import datetime
+from functools import lru_cache
+from io import BytesIO
+import re
+from typing import NamedTuple
+
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+# Page setup shared by every cover letter
+PAGE_SETUP = {
+    'pagesize': A4,
+    'rightMargin': 72,
+    'leftMargin': 72,
+    'topMargin': 72,
+    'bottomMargin': 18,
+}
+
+# Characters of the profile's professional experience quoted in the letter;
+# profile snapshots keep just enough of the field for this
+LETTER_EXPERIENCE_LENGTH = 120
+
+
+class CoverLetterStyles:
+    """Paragraph styles used by the cover letter, built once per process"""
+
+    __slots__ = ('title', 'heading', 'normal')
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+
+        self.title = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            spaceAfter=30,
+            alignment=1  # Center alignment
+        )
+
+        self.heading = ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            spaceAfter=12,
+            textColor=colors.darkblue
+        )
+
+        self.normal = ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=8,
+            leading=12
+        )
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """
+    Return the shared cover letter styles. Styles are only read while
+    rendering, so one instance is safe to share between threads.
+    """
+    return CoverLetterStyles()
+
+
+class CoverLetterProfile(NamedTuple):
+    """
+    The profile fields a cover letter uses. Unlike a model instance this is
+    cheap to pickle, so it can be sent to renderer processes.
+    """
+    name: str
+    location: str
+    primary_email: str
+    phone_number: str
+    linkedin_url: str
+    github_url: str
+    portfolio_url: str
+    education_field: str
+    programming_languages: str
+    professional_experience: str
+
+
+def profile_spec(profile):
+    return CoverLetterProfile(*(getattr(profile, field) or '' for field in CoverLetterProfile._fields))
+
+
+class CoverLetterJob(NamedTuple):
+    """Everything needed to render one cover letter, in picklable form"""
+    profile: CoverLetterProfile
+    job: dict
+    date: datetime.date
+
+
+def cover_letter_details(data):
+    """
+    Pick the optional cover letter fields out of request data
+    """
+    return {
+        'company': data['company'],
+        'role': data['role'],
+        'recipient_name': data.get('recipient_name', 'Hiring Manager'),
+        'company_address': data.get('company_address', ''),
+        'company_city_state_zip': data.get('company_city_state_zip', ''),
+        'previous_company': data.get('previous_company', ''),
+        'key_skills': data.get('key_skills', ''),
+        'specific_achievements': data.get('specific_achievements', ''),
+        'company_interest': data.get('company_interest', ''),
+        'personal_qualities': data.get('personal_qualities', ''),
+    }
+
+
+def cover_letter_filename(profile, job):
+    name = f"cover_letter_{profile.name}_{job['company']}_{job['role']}"
+    return re.sub(r'[^\w-]+', '_', name).strip('_') + '.pdf'
+
+
+def _build_story(profile, job, styles, date):
+    company = job['company']
+    role = job['role']
+    recipient_name = job.get('recipient_name') or 'Hiring Manager'
+    company_address = job.get('company_address', '')
+    company_city_state_zip = job.get('company_city_state_zip', '')
+    previous_company = job.get('previous_company', '')
+    key_skills = job.get('key_skills', '')
+    specific_achievements = job.get('specific_achievements', '')
+    company_interest = job.get('company_interest', '')
+    personal_qualities = job.get('personal_qualities', '')
+
+    story = []
+
+    # Header with compact format - no extra spacing
+    story.append(Paragraph(f"{profile.name}", styles.title))
+
+    # Create compact contact info without extra spacing
+    contact_info = f"{profile.location}<br/>{profile.primary_email}<br/>{profile.phone_number}"
+    if profile.linkedin_url:
+        contact_info += f"<br/>LinkedIn: {profile.linkedin_url}"
+    if profile.github_url:
+        contact_info += f"<br/>GitHub: {profile.github_url}"
+    if profile.portfolio_url:
+        contact_info += f"<br/>Portfolio: {profile.portfolio_url}"
+
+    story.append(Paragraph(contact_info, styles.normal))
+    story.append(Spacer(1, 15))
+
+    # Date
+    story.append(Paragraph(f"{date.strftime('%B %d, %Y')}", styles.normal))
+    story.append(Spacer(1, 10))
+
+    # Company info with full address if provided
+    if company_address or company_city_state_zip:
+        company_info = f"{recipient_name}<br/>{company}"
+        if company_address:
+            company_info += f"<br/>{company_address}"
+        if company_city_state_zip:
+            company_info += f"<br/>{company_city_state_zip}"
+        story.append(Paragraph(company_info, styles.normal))
+    else:
+        story.append(Paragraph(f"{recipient_name}<br/>{company}", styles.normal))
+
+    story.append(Spacer(1, 10))
+
+    # Subject
+    story.append(Paragraph(f"Subject: Application for the Position of {role}", styles.heading))
+    story.append(Spacer(1, 8))
+
+    # Cover letter body using the detailed format - compact version
+    greeting = f"Dear {recipient_name},"
+    story.append(Paragraph(greeting, styles.normal))
+    story.append(Spacer(1, 6))
+
+    # Introduction paragraph - more concise
+    intro = f"I am writing to express my interest in the {role} position at {company}. With my background in {profile.education_field or 'software development'}, I am confident in my ability to contribute effectively to your team."
+    story.append(Paragraph(intro, styles.normal))
+    story.append(Spacer(1, 6))
+
+    # Experience and skills paragraph - more concise
+    if previous_company or key_skills or specific_achievements:
+        # Use provided details or fallback to profile data
+        prev_company = previous_company or "my previous role"
+        skills = key_skills or profile.programming_languages or "software development"
+        achievements = specific_achievements[:150] + "..." if len(specific_achievements) > 150 else specific_achievements
+
+        exp_text = f"In my previous role at {prev_company}, I developed strong skills in {skills}. {achievements} I am enthusiastic about bringing my expertise to support {company}'s goals."
+    else:
+        # Fallback to profile data - more concise
+        exp_text = f"In my professional experience, I developed strong skills in {profile.programming_languages}. {profile.professional_experience[:LETTER_EXPERIENCE_LENGTH]}{'...' if len(profile.professional_experience) > LETTER_EXPERIENCE_LENGTH else ''} I am enthusiastic about contributing to {company}'s success."
+
+    story.append(Paragraph(exp_text, styles.normal))
+    story.append(Spacer(1, 6))
+
+    # Company interest paragraph - more concise
+    if company_interest:
+        interest_text = f"What excites me most about this opportunity is {company_interest}. I am eager to bring my {personal_qualities or 'technical skills and passion'} to your organization."
+    else:
+        interest_text = f"What excites me most about this opportunity is the chance to contribute to {company}'s innovative projects. I am eager to bring my {personal_qualities or 'technical skills and passion'} to your organization."
+
+    story.append(Paragraph(interest_text, styles.normal))
+    story.append(Spacer(1, 6))
+
+    # Closing paragraph - more concise
+    closing = "Please find my resume attached for your review. I would welcome the opportunity to discuss how my background fits your needs. Thank you for considering my application."
+    story.append(Paragraph(closing, styles.normal))
+    story.append(Spacer(1, 12))
+
+    # Signature
+    signature = f"Sincerely,<br/><br/>{profile.name}"
+    story.append(Paragraph(signature, styles.normal))
+
+    return story
+
+
+def letter_date():
+    """The date printed on cover letters rendered now"""
+    return timezone.now().date()
+
+
+def render_cover_letter(profile, job, date=None):
+    """
+    Render a cover letter PDF for ``profile`` and a ``job`` dict as returned
+    by ``cover_letter_details``. Used for both the download endpoint and
+    email attachments.
+
+    Returns a ``(filename, pdf_bytes)`` tuple.
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, **PAGE_SETUP)
+    doc.build(_build_story(profile, job, get_styles(), date or letter_date()))
+    return cover_letter_filename(profile, job), buffer.getvalue()
+
+
+def render_job(spec):
+    """Render a ``CoverLetterJob``; the entry point run by renderer processes"""
+    return render_cover_letter(spec.profile, spec.job, date=spec.date)
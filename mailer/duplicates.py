@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import EmailSent, OutboundEmail
+
+
+def normalize_email(value):
+    return str(value or '').strip().lower()
+
+
+def normalize_text(value):
+    """Case- and whitespace-insensitive form of a company or role name"""
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def allows_duplicates(data):
+    """True when the caller asked to send even if the recipient was already emailed"""
+    return str(data.get('allow_duplicate', False)).lower() in ('true', '1', 'yes')
+
+
+def window_days():
+    return getattr(settings, 'DUPLICATE_SEND_WINDOW_DAYS', 30)
+
+
+def _owner_filters(user_profile, user):
+    """
+    ``(sent, queued)`` filters for the earlier emails a send is compared
+    with: those of ``user_profile``, or for a send without a profile, the
+    profile-less emails ``user`` queued. None when there is no owner to
+    scope the check to.
+    """
+    if user_profile is not None:
+        return Q(user_profile=user_profile), Q(user_profile=user_profile)
+    if getattr(user, 'is_authenticated', False):
+        return (
+            Q(user_profile__isnull=True, outbound_email__created_by=user),
+            Q(user_profile__isnull=True, created_by=user),
+        )
+    return None
+
+
+def _previous_sends_query(emails, owner, days, exclude_campaign=None):
+    """
+    Emails sent by ``owner`` within the window plus its emails still waiting
+    in the queue, to any of the normalized ``emails``, as one UNION query.
+    Both halves filter on Lower(to_email) so they are served by the
+    recipient indexes.
+    """
+    sent_owner, queued_owner = owner
+    since = timezone.now() - timedelta(days=days)
+    sent = (
+        EmailSent.objects
+        .annotate(kind=F('status'), recipient=Lower('to_email'), at=F('sent_at'))
+        # Failed sends are dropped in Python so the recipient index is the only one that applies
+        .filter(sent_owner, recipient__in=emails, sent_at__gte=since)
+    )
+    queued = (
+        OutboundEmail.objects
+        .annotate(kind=F('status'), recipient=Lower('to_email'), at=F('created_at'))
+        .filter(
+            queued_owner, recipient__in=emails,
+            status__in=[OutboundEmail.Status.QUEUED, OutboundEmail.Status.SENDING],
+        )
+    )
+    if exclude_campaign is not None:
+        queued = queued.exclude(campaign=exclude_campaign)
+
+    fields = ('kind', 'id', 'recipient', 'company', 'role', 'at')
+    return sent.order_by().values_list(*fields).union(queued.order_by().values_list(*fields), all=True)
+
+
+def _job(item):
+    """Normalized ``(company, role)`` of a recipient or earlier email, or None unless both are known"""
+    company, role = normalize_text(item.get('company')), normalize_text(item.get('role'))
+    return (company, role) if company and role else None
+
+
+def _match(recipients, rows):
+    # Keyed by (recipient, job), plus (recipient, None) for the latest email to the address about any job
+    previous_sends = {}
+    for kind, pk, recipient, company, role, at in sorted(rows, key=lambda row: row[5], reverse=True):
+        if kind == 'failed':
+            continue
+        previous = {
+            'status': kind,
+            'sent_email_id' if kind == 'sent' else 'job_id': pk,
+            'to_email': recipient,
+            'company': company,
+            'role': role,
+            'sent_at' if kind == 'sent' else 'queued_at': at,
+        }
+        previous_sends.setdefault((recipient, None), previous)
+        job = _job(previous)
+        if job is not None:
+            previous_sends.setdefault((recipient, job), previous)
+
+    return [
+        previous_sends.get((normalize_email(recipient.get('hr_email')), _job(recipient)))
+        for recipient in recipients
+    ]
+
+
+def _checked_emails(recipients, days):
+    """Normalized addresses worth looking up, or None when nothing is checked"""
+    if days <= 0:
+        return None
+    return {normalize_email(recipient.get('hr_email')) for recipient in recipients} - {''} or None
+
+
+def find_duplicates(recipients, user_profile, days=None, exclude_campaign=None, user=None):
+    """
+    For each recipient dict (``hr_email`` and optionally ``company`` and
+    ``role``), return the most recent email already sent or queued for
+    ``user_profile`` to the same address about the same job, or None.
+    Recipients without both a company and a role match any earlier email to
+    the address. Answers the whole list with a single query.
+
+    Only the profile's own emails are compared, so no other profile's jobs
+    are ever reported; without a profile, the profile-less emails queued by
+    ``user`` are. A window of 0 days disables the check.
+    """
+    days = window_days() if days is None else days
+    owner = _owner_filters(user_profile, user)
+    emails = _checked_emails(recipients, days)
+    if owner is None or emails is None:
+        return [None] * len(recipients)
+    rows = list(_previous_sends_query(emails, owner, days, exclude_campaign))
+    return _match(recipients, rows)
+
+
+async def afind_duplicates(recipients, user_profile, days=None, exclude_campaign=None, user=None):
+    """
+    Async counterpart of ``find_duplicates`` for the ASGI views
+    """
+    days = window_days() if days is None else days
+    owner = _owner_filters(user_profile, user)
+    emails = _checked_emails(recipients, days)
+    if owner is None or emails is None:
+        return [None] * len(recipients)
+    rows = [row async for row in _previous_sends_query(emails, owner, days, exclude_campaign)]
+    return _match(recipients, rows)
+
+
+def duplicate_error(previous):
+    """Response body for a send refused as a duplicate"""
+    action = 'emailed' if previous['status'] == 'sent' else 'queued an email to'
+    return {
+        'error': (
+            f"Already {action} {previous['to_email']} within the last {window_days()} days. "
+            f'Send with allow_duplicate=true to send anyway.'
+        ),
+        'duplicate_of': previous,
+    }
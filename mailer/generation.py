@@ -0,0 +1,248 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+import google.generativeai as genai
+
+# Configure Gemini AI
+genai.configure(api_key=settings.GEMINI_API_KEY)
+
+GEMINI_MODEL = 'gemini-1.5-flash'
+
+# Characters of the long profile text fields the prompt and fallback email
+# show; profile snapshots keep just enough of each field for these
+PROMPT_EXPERIENCE_LENGTH = 200
+PROMPT_PROJECTS_LENGTH = 150
+FALLBACK_EXPERIENCE_LENGTH = 100
+
+
+def email_prompt_inputs(name, company, role, hr_email, skills):
+    """
+    Inputs for the legacy (name + skills) email prompt
+    """
+    return {
+        'name': name,
+        'company': company,
+        'role': role,
+        'hr_email': hr_email,
+        'skills': skills,
+    }
+
+
+def build_email_prompt(inputs):
+    return f"""
+        Write a professional job application email for the following details:
+
+        Applicant Name: {inputs['name']}
+        Company: {inputs['company']}
+        Position: {inputs['role']}
+        HR Email: {inputs['hr_email']}
+        Skills: {inputs['skills']}
+
+        Please write a compelling, professional email that:
+        1. Introduces the candidate professionally
+        2. Highlights relevant skills and experience
+        3. Expresses genuine interest in the company and role
+        4. Includes a clear call to action
+        5. Is concise but comprehensive (around 200-300 words)
+        6. Uses a professional but engaging tone
+
+        Format the email with proper subject line and body. Make it personalized and specific to the role and company.
+        """
+
+
+def enhanced_prompt_inputs(user_profile, company, role, job_description):
+    """
+    Inputs for the profile-based email prompt: only the profile fields the
+    prompt actually uses, already truncated the way the prompt shows them
+    """
+    return {
+        'name': user_profile.name,
+        'education_degree': user_profile.education_degree,
+        'education_field': user_profile.education_field,
+        'university_name': user_profile.university_name,
+        'graduation_year': user_profile.graduation_year,
+        'programming_languages': user_profile.programming_languages,
+        'professional_experience': user_profile.professional_experience[:PROMPT_EXPERIENCE_LENGTH],
+        'projects': user_profile.projects[:PROMPT_PROJECTS_LENGTH],
+        'portfolio_url': user_profile.portfolio_url or 'N/A',
+        'linkedin_url': user_profile.linkedin_url or 'N/A',
+        'github_url': user_profile.github_url or 'N/A',
+        'company': company,
+        'role': role,
+        'job_description': job_description,
+    }
+
+
+def build_enhanced_prompt(inputs):
+    return f"""
+        Write a SHORT and SWEET professional job application email (maximum 150 words) for the following candidate:
+
+        CANDIDATE:
+        Name: {inputs['name']}
+        Education: {inputs['education_degree']} in {inputs['education_field']} from {inputs['university_name']} ({inputs['graduation_year']})
+        Key Skills: {inputs['programming_languages']}
+        Experience: {inputs['professional_experience']}...
+        Projects: {inputs['projects']}...
+        Portfolio: {inputs['portfolio_url']}
+        LinkedIn: {inputs['linkedin_url']}
+        GitHub: {inputs['github_url']}
+
+        JOB DETAILS:
+        Company: {inputs['company']}
+        Position: {inputs['role']}
+        Job Description: {inputs['job_description']}
+
+        Write a BRIEF email that:
+        1. Introduces candidate in 1-2 sentences
+        2. Highlights 2-3 most relevant skills/achievements
+        3. Shows interest in the role
+        4. Includes professional signature with contact info
+        5. Keep it under 150 words - be concise and impactful
+        6. Include subject line
+
+        Make it professional but brief - hiring managers are busy!
+        """
+
+
+def email_fallback(name, company, role, skills):
+    """
+    Template email used by the legacy endpoint when Gemini is unavailable
+    """
+    return f"""Subject: Application for {role} Position at {company}
+
+Dear Hiring Manager,
+
+I am writing to express my strong interest in the {role} position at {company}. With my expertise in {skills}, I am confident that I would be a valuable addition to your team.
+
+I am particularly excited about the opportunity to contribute to innovative projects and work alongside talented professionals at {company}. I would welcome the opportunity to discuss how my skills and passion for technology can contribute to your team's success.
+
+Thank you for considering my application. I look forward to hearing from you soon.
+
+Best regards,
+{name}"""
+
+
+def enhanced_fallback_email(user_profile, company, role):
+    """
+    Short and sweet template email used when Gemini is unavailable
+    """
+    return f"""Subject: Application for {role} Position at {company}
+
+Dear Hiring Manager,
+
+I am {user_profile.name}, a {user_profile.education_degree} graduate in {user_profile.education_field} from {user_profile.university_name}. I am excited to apply for the {role} position at {company}.
+
+My key qualifications include:
+• Strong skills in {user_profile.programming_languages}
+• {user_profile.professional_experience[:FALLBACK_EXPERIENCE_LENGTH]}{'...' if len(user_profile.professional_experience) > FALLBACK_EXPERIENCE_LENGTH else ''}
+
+I am passionate about contributing to {company}'s innovative projects and would love to discuss how my skills can benefit your team.
+
+Best regards,
+{user_profile.name}
+{user_profile.phone_number}
+{user_profile.primary_email}"""
+
+
+def _normalize(value):
+    return ' '.join(str(value if value is not None else '').split()).casefold()
+
+
+def generation_cache_key(model_name, inputs):
+    """
+    Cache key for a generation: a hash of the model name and the prompt
+    inputs with whitespace collapsed and case folded, so retries and
+    double-submits of the same request share one entry.
+    """
+    normalized = {key: _normalize(value) for key, value in inputs.items()}
+    payload = json.dumps({'model': model_name, 'inputs': normalized}, sort_keys=True)
+    return 'generation:' + hashlib.sha256(payload.encode()).hexdigest()
+
+
+def generate_text(prompt, inputs, model_name=GEMINI_MODEL):
+    """
+    Generate text with Gemini, serving repeats from the ``generations`` cache.
+
+    Returns ``(text, cache_hit)``. Errors from Gemini propagate so callers
+    can fall back to their template emails; failures are never cached.
+    """
+    cache = caches['generations']
+    key = generation_cache_key(model_name, inputs)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    model = genai.GenerativeModel(model_name)
+    response = model.generate_content(prompt)
+    text = response.text
+    cache.set(key, text)
+    return text, False
+
+
+async def agenerate_text(prompt, inputs, model_name=GEMINI_MODEL):
+    """
+    Async counterpart of ``generate_text`` for the ASGI views: awaits
+    Gemini's async API so no thread is held while the model is working.
+    """
+    cache = caches['generations']
+    key = generation_cache_key(model_name, inputs)
+    cached = await cache.aget(key)
+    if cached is not None:
+        return cached, True
+
+    model = genai.GenerativeModel(model_name)
+    response = await model.generate_content_async(prompt)
+    text = response.text
+    await cache.aset(key, text)
+    return text, False
+
+
+def generate_many(jobs, max_workers=None):
+    """
+    Run ``generate_text`` for many ``(prompt, inputs)`` pairs concurrently on
+    a bounded thread pool (Gemini calls are network-bound).
+
+    Returns one ``(text, cache_hit, error)`` tuple per job, in order; ``text``
+    is None and ``error`` is the exception when a generation failed.
+    """
+    if max_workers is None:
+        max_workers = getattr(settings, 'GENERATION_BATCH_WORKERS', 8)
+
+    def run(job):
+        prompt, inputs = job
+        try:
+            text, cache_hit = generate_text(prompt, inputs)
+            return text, cache_hit, None
+        except Exception as e:
+            return None, False, e
+
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        return list(executor.map(run, jobs))
+
+
+def stream_text(prompt, inputs, model_name=GEMINI_MODEL):
+    """
+    Stream a Gemini generation, yielding ``(text_chunk, cache_hit)`` pairs.
+
+    A cached generation is yielded as a single chunk. The full text is cached
+    only once the stream has completed.
+    """
+    cache = caches['generations']
+    key = generation_cache_key(model_name, inputs)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached, True
+        return
+
+    model = genai.GenerativeModel(model_name)
+    parts = []
+    for chunk in model.generate_content(prompt, stream=True):
+        text = chunk.text
+        parts.append(text)
+        yield text, False
+    cache.set(key, ''.join(parts))
@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from mailer.cover_letter import get_styles, render_cover_letter
+from mailer.models import UserProfile
+from mailer.pdf_renderer import PDFRenderer
+
+
+class Command(BaseCommand):
+    help = ('Measure cover letter render latency with styles rebuilt per render vs. built once, '
+            'and concurrent render throughput in-thread vs. in a process pool')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200,
+                            help='Renders per measurement')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Concurrent requests for the throughput measurement')
+        parser.add_argument('--processes', type=int, default=2,
+                            help='Renderer processes for the throughput measurement')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # Unsaved profile: the benchmark never touches the database
+        profile = UserProfile(
+            name='Jane Doe',
+            location='San Francisco, CA',
+            phone_number='+1-555-0100',
+            primary_email='jane@example.com',
+            linkedin_url='https://linkedin.com/in/janedoe',
+            github_url='https://github.com/janedoe',
+            education_field='Computer Science',
+            programming_languages='Python, JavaScript, SQL',
+            professional_experience='Built and operated Django services handling millions of requests a day. ' * 3,
+        )
+        job = {
+            'company': 'Tech Corp',
+            'role': 'Software Engineer',
+            'recipient_name': 'Hiring Manager',
+            'key_skills': 'Python and Django',
+            'company_interest': 'your focus on developer tooling',
+        }
+
+        def measure(rebuild_styles):
+            timings = []
+            for _ in range(iterations):
+                if rebuild_styles:
+                    get_styles.cache_clear()
+                start = time.perf_counter()
+                render_cover_letter(profile, job)
+                timings.append((time.perf_counter() - start) * 1000)
+            return timings
+
+        # Warm up imports and fonts before measuring
+        render_cover_letter(profile, job)
+
+        for label, rebuild_styles in (('styles rebuilt per render', True), ('styles built once', False)):
+            timings = measure(rebuild_styles)
+            self.stdout.write(
+                f'{label}: mean {statistics.mean(timings):.2f} ms, '
+                f'median {statistics.median(timings):.2f} ms, '
+                f'p95 {statistics.quantiles(timings, n=20)[-1]:.2f} ms '
+                f'({iterations} renders)'
+            )
+
+        for label, max_workers in (('in request thread', 0), (f'{options["processes"]} renderer processes', options['processes'])):
+            renderer = PDFRenderer(max_workers=max_workers, timeout=60)
+            try:
+                # Start the pool before timing
+                renderer.render(profile, job)
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                    list(executor.map(lambda _: renderer.render(profile, job), range(iterations)))
+                elapsed = time.perf_counter() - start
+            finally:
+                renderer.shutdown()
+            self.stdout.write(
+                f'{label}: {iterations / elapsed:.1f} renders/s '
+                f'({options["concurrency"]} concurrent requests, {iterations} renders)'
+            )
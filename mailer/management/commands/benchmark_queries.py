@@ -0,0 +1,192 @@
+from datetime import timedelta
+import importlib
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, migrations, transaction
+from django.db.models.functions import Lower
+from django.test import RequestFactory
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from mailer import views
+from mailer.models import EmailRequest, EmailSent, UserProfile
+
+# The indexes being measured: the keyset indexes of 0008 and the hot-query indexes of 0009
+INDEX_MIGRATIONS = (
+    'mailer.migrations.0008_emailsent_user_profile',
+    'mailer.migrations.0009_hot_query_indexes',
+)
+
+COMPANY_COUNT = 5000
+RECIPIENT_COUNT = 50000
+
+
+class Command(BaseCommand):
+    help = ('Seed a throwaway database with EmailRequest/EmailSent rows and report admin changelist '
+            'and API query times without and with the keyset and hot-query indexes')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000,
+                            help='Rows seeded into each of EmailRequest and EmailSent')
+        parser.add_argument('--profiles', type=int, default=1000,
+                            help='User profiles the rows are spread over')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per query; the median is reported')
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        tmp_dir = None
+        if connection.vendor == 'sqlite' and not settings_dict['TEST'].get('NAME'):
+            # The default in-memory test database is not representative; seed a file instead
+            tmp_dir = tempfile.mkdtemp()
+            settings_dict['TEST']['NAME'] = os.path.join(tmp_dir, 'benchmark.sqlite3')
+
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            self.seed(options['rows'], options['profiles'])
+            cases = self.cases()
+            before = self.measure(cases, options['repeat'], with_indexes=False)
+            after = self.measure(cases, options['repeat'], with_indexes=True)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            if tmp_dir:
+                os.rmdir(tmp_dir)
+
+        width = max(len(label) for label, _ in cases)
+        self.stdout.write(f'{"query".ljust(width)}  {"before":>10}  {"after":>10}  speedup')
+        for label, _ in cases:
+            self.stdout.write(
+                f'{label.ljust(width)}  {before[label]:>8.2f}ms  {after[label]:>8.2f}ms  '
+                f'{before[label] / after[label]:.1f}x'
+            )
+
+    def seed(self, rows, profile_count):
+        rng = random.Random(0)
+        now = timezone.now()
+        companies = [f'Company {number}' for number in range(COMPANY_COUNT)]
+        recipients = [f'HR{number}@company{number % COMPANY_COUNT}.example.com' for number in range(RECIPIENT_COUNT)]
+        roles = ['Software Engineer', 'Backend Developer', 'Data Engineer', 'SRE', 'Frontend Developer']
+
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                name=f'Applicant {number}', location='Remote', phone_number='+1-555-0100',
+                primary_email=f'applicant{number}@example.com', education_degree='BTech',
+                education_field='Computer Science', university_name='University', graduation_year=2020,
+                programming_languages='Python', professional_experience='', projects='',
+            )
+            for number in range(profile_count)
+        ])
+        profile_ids = list(UserProfile.objects.values_list('id', flat=True))
+
+        chunk_size = 10000
+        start = time.perf_counter()
+        for offset in range(0, rows, chunk_size):
+            size = min(chunk_size, rows - offset)
+            with transaction.atomic():
+                requests = EmailRequest.objects.bulk_create([
+                    EmailRequest(
+                        user_profile_id=rng.choice(profile_ids),
+                        hr_email=rng.choice(recipients),
+                        company=rng.choice(companies),
+                        role=rng.choice(roles),
+                        generated_email='Dear Hiring Manager, ...',
+                        created_at=now - timedelta(seconds=rng.randrange(365 * 24 * 3600)),
+                    )
+                    for _ in range(size)
+                ])
+                EmailSent.objects.bulk_create([
+                    EmailSent(
+                        email_request_id=email_request.pk,
+                        user_profile_id=email_request.user_profile_id,
+                        to_email=email_request.hr_email,
+                        subject=f'Application for {email_request.role} at {email_request.company}',
+                        body='Dear Hiring Manager, ...',
+                        sent_at=email_request.created_at + timedelta(seconds=rng.randrange(3600)),
+                        status='failed' if rng.random() < 0.05 else 'sent',
+                        resume_attached=rng.random() < 0.8,
+                    )
+                    for email_request in requests
+                ])
+            self.stdout.write(f'Seeded {offset + size}/{rows} rows ({time.perf_counter() - start:.0f}s)')
+
+    def cases(self):
+        user = get_user_model()(username='benchmark', is_active=True, is_staff=True, is_superuser=True)
+        email_sent_admin = admin.site._registry[EmailSent]
+        email_request_admin = admin.site._registry[EmailRequest]
+        recipient, profile_id = EmailSent.objects.order_by('?').values_list('to_email', 'user_profile_id').first()
+
+        def changelist(model_admin, url, **params):
+            def run():
+                request = RequestFactory().get(url, params)
+                request.user = user
+                cl = model_admin.get_changelist_instance(request)
+                list(cl.result_list)
+                # The filter sidebar runs its own queries (e.g. distinct values)
+                for spec in cl.filter_specs:
+                    list(spec.choices(cl))
+            return run
+
+        def api(**params):
+            def run():
+                request = APIRequestFactory().get('/api/sent-emails/', params)
+                force_authenticate(request, user=user)
+                response = views.list_sent_emails(request)
+                if response.status_code != 200:
+                    raise CommandError(f'API request failed: {response.data}')
+            return run
+
+        sent_url = '/admin/mailer/emailsent/'
+        request_url = '/admin/mailer/emailrequest/'
+        return [
+            ('admin sent emails', changelist(email_sent_admin, sent_url)),
+            ('admin sent emails, status=failed', changelist(email_sent_admin, sent_url, status__exact='failed')),
+            ('admin sent emails, no resume', changelist(email_sent_admin, sent_url, resume_attached__exact='0')),
+            ('admin email requests', changelist(email_request_admin, request_url)),
+            ('admin email requests, company', changelist(email_request_admin, request_url, company__exact='Company 42')),
+            ('api sent emails', api()),
+            ('api sent emails, status=failed', api(status='failed')),
+            ('api sent emails, profile', api(profile_id=profile_id)),
+            ('api sent emails, to_email', api(to_email=recipient.upper())),
+            ('requests to recipient', lambda: list(
+                EmailRequest.objects.alias(hr_email_lower=Lower('hr_email'))
+                .filter(hr_email_lower=recipient.lower()).order_by('-created_at')[:20]
+            )),
+        ]
+
+    def measure(self, cases, repeat, with_indexes):
+        operations = [
+            operation
+            for name in INDEX_MIGRATIONS
+            for operation in importlib.import_module(name).Migration.operations
+            if isinstance(operation, migrations.AddIndex)
+        ]
+        with connection.schema_editor() as schema_editor:
+            for operation in operations:
+                model = apps.get_model('mailer', operation.model_name)
+                if with_indexes:
+                    schema_editor.add_index(model, operation.index)
+                else:
+                    schema_editor.remove_index(model, operation.index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        results = {}
+        for label, run in cases:
+            # Warm up caches before timing
+            run()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[label] = statistics.median(timings)
+        return results
@@ -0,0 +1,174 @@
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from mailer.models import EmailSent, OutboundEmail, UserProfile
+from mailer.pagination import keyset_page
+
+BODY = 'Dear Hiring Manager,\n\n' + 'I am writing to apply for the role. ' * 50
+
+MODES = (
+    ('rollback journal', {'SQLITE_JOURNAL_MODE': 'delete', 'SQLITE_TUNING': False}),
+    ('SQLITE_TUNING', {'SQLITE_TUNING': True}),
+)
+
+
+class Command(BaseCommand):
+    help = ('Run concurrent send writes and history reads against a throwaway SQLite database, '
+            'in rollback-journal mode and with SQLITE_TUNING, and report latency and lock errors')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Concurrent clients, each with its own connection')
+        parser.add_argument('--operations', type=int, default=200,
+                            help='Operations per client')
+        parser.add_argument('--write-ratio', type=float, default=0.3,
+                            help='Share of operations that record a send')
+        parser.add_argument('--seed-rows', type=int, default=20000,
+                            help='Sent emails in the database before the run')
+        parser.add_argument('--timeout', type=float, default=5.0,
+                            help='Seconds a client waits for a lock before "database is locked" (both modes)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('benchmark_sqlite needs the SQLite backend')
+
+        for label, overrides in MODES:
+            with override_settings(SQLITE_BUSY_TIMEOUT=int(options['timeout'] * 1000), **overrides):
+                stats = self.run_mode(options)
+            self.stdout.write(
+                f'{label} (journal_mode={stats["journal_mode"]}): {stats["throughput"]:.0f} ops/s, '
+                f'write p50 {stats["write_p50"]:.1f} ms / p95 {stats["write_p95"]:.1f} ms, '
+                f'read p50 {stats["read_p50"]:.1f} ms / p95 {stats["read_p95"]:.1f} ms, '
+                f'lock errors: {stats["write_errors"]} writes, {stats["read_errors"]} reads'
+            )
+
+    def run_mode(self, options):
+        settings_dict = connection.settings_dict
+        tmp_dir = tempfile.mkdtemp()
+        old_test_settings = dict(settings_dict['TEST'])
+        old_timeout = settings_dict['OPTIONS'].get('timeout')
+        # A file database, fresh for each mode, so the journal mode really is the one under test
+        settings_dict['TEST']['NAME'] = os.path.join(tmp_dir, 'benchmark.sqlite3')
+        settings_dict['OPTIONS']['timeout'] = options['timeout']
+
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            profile_ids = self.seed(options['seed_rows'])
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+            connection.close()
+            return dict(self.load(profile_ids, options), journal_mode=journal_mode)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            for name in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, name))
+            os.rmdir(tmp_dir)
+            settings_dict['TEST'] = old_test_settings
+            if old_timeout is None:
+                settings_dict['OPTIONS'].pop('timeout', None)
+            else:
+                settings_dict['OPTIONS']['timeout'] = old_timeout
+
+    def seed(self, rows):
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                name=f'Applicant {number}', location='Remote', phone_number='+1-555-0100',
+                primary_email=f'applicant{number}@example.com', education_degree='BTech',
+                education_field='Computer Science', university_name='University', graduation_year=2020,
+                programming_languages='Python', professional_experience='', projects='',
+            )
+            for number in range(20)
+        ])
+        profile_ids = list(UserProfile.objects.values_list('id', flat=True))
+        rng = random.Random(0)
+        EmailSent.objects.bulk_create([
+            EmailSent(
+                user_profile_id=rng.choice(profile_ids),
+                to_email=f'hr{number}@example.com',
+                subject='Application',
+                body=BODY,
+            )
+            for number in range(rows)
+        ], batch_size=1000)
+        return profile_ids
+
+    def load(self, profile_ids, options):
+        write_timings = []
+        read_timings = []
+        write_errors = []
+        read_errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+
+        def client(number):
+            rng = random.Random(number)
+            writes, reads = [], []
+            failures = {True: 0, False: 0}
+            barrier.wait()
+            try:
+                for _ in range(options['operations']):
+                    is_write = rng.random() < options['write_ratio']
+                    profile_id = rng.choice(profile_ids)
+                    start = time.perf_counter()
+                    try:
+                        if is_write:
+                            # What the mail worker records for each delivered email
+                            with transaction.atomic():
+                                email_sent = EmailSent.objects.create(
+                                    user_profile_id=profile_id, to_email='hr@example.com',
+                                    subject='Application', body=BODY,
+                                )
+                                OutboundEmail.objects.create(
+                                    user_profile_id=profile_id, from_email='me@example.com',
+                                    to_email='hr@example.com', subject='Application', body=BODY,
+                                    status=OutboundEmail.Status.SENT, email_sent=email_sent,
+                                    sent_at=timezone.now(),
+                                )
+                        else:
+                            # A page of the sent-email history
+                            keyset_page(EmailSent.objects.filter(user_profile_id=profile_id), page_size=50)
+                    except OperationalError:
+                        failures[is_write] += 1
+                        continue
+                    (writes if is_write else reads).append((time.perf_counter() - start) * 1000)
+            finally:
+                connections.close_all()
+            with lock:
+                write_timings.extend(writes)
+                read_timings.extend(reads)
+                write_errors.append(failures[True])
+                read_errors.append(failures[False])
+
+        threads = [threading.Thread(target=client, args=(number,)) for number in range(options['threads'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        def percentile(timings, n):
+            if len(timings) < 2:
+                return timings[0] if timings else 0.0
+            return statistics.quantiles(timings, n=100)[n - 1]
+
+        return {
+            'throughput': (len(write_timings) + len(read_timings)) / elapsed,
+            'write_p50': percentile(write_timings, 50),
+            'write_p95': percentile(write_timings, 95),
+            'read_p50': percentile(read_timings, 50),
+            'read_p95': percentile(read_timings, 95),
+            'write_errors': sum(write_errors),
+            'read_errors': sum(read_errors),
+        }
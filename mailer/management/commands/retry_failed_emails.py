@@ -0,0 +1,48 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from mailer.retry import process_retries
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Retry failed emails whose backoff has elapsed (transient SMTP errors only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Maximum number of failed emails retried per batch')
+        parser.add_argument('--interval', type=float, default=30.0,
+                            help='Seconds to sleep when no retries are due')
+        parser.add_argument('--once', action='store_true',
+                            help='Retry everything currently due and exit instead of polling forever')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+        once = options['once']
+
+        self.stdout.write(f'Retry worker started (batch size {batch_size})')
+        try:
+            while True:
+                try:
+                    sent_count, failed_count = process_retries(batch_size)
+                except Exception as e:
+                    logger.error(f"Retry worker batch failed: {str(e)}")
+                    if once:
+                        raise
+                    time.sleep(interval)
+                    continue
+
+                if sent_count or failed_count:
+                    self.stdout.write(f'Resent {sent_count} email(s), {failed_count} failed again')
+                    continue
+
+                if once:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write('Retry worker stopped')
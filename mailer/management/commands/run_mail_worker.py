@@ -0,0 +1,55 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from mailer.outbound import process_queue, requeue_stale
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound emails (run one or more of these alongside the web workers)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Maximum number of emails claimed per batch')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help='Requeue emails left in "sending" for longer than this many seconds')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the queue and exit instead of polling forever')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+        stale_after = options['stale_after']
+        once = options['once']
+
+        self.stdout.write(f'Mail worker started (batch size {batch_size})')
+        try:
+            while True:
+                requeued = requeue_stale(stale_after)
+                if requeued:
+                    logger.warning(f"Requeued {requeued} stale outbound email(s)")
+
+                try:
+                    sent_count, failed_count = process_queue(batch_size)
+                except Exception as e:
+                    logger.error(f"Mail worker batch failed: {str(e)}")
+                    if once:
+                        raise
+                    time.sleep(interval)
+                    continue
+
+                if sent_count or failed_count:
+                    self.stdout.write(f'Sent {sent_count} email(s), {failed_count} failed')
+                    continue
+
+                if once:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write('Mail worker stopped')
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0002_userprofile_emailrequest_job_description_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_email', models.EmailField(max_length=255)),
+                ('to_email', models.EmailField(max_length=255)),
+                ('subject', models.CharField(max_length=500)),
+                ('body', models.TextField()),
+                ('attach_resume', models.BooleanField(default=False)),
+                ('cover_letter', models.JSONField(blank=True, help_text='Cover letter details, rendered at send time', null=True)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=16)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('email_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbound_emails', to='mailer.emailrequest')),
+                ('email_sent', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbound_email', to='mailer.emailsent')),
+                ('user_profile', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbound_emails', to='mailer.userprofile')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='mailer_outb_status_896323_idx')],
+            },
+        ),
+    ]
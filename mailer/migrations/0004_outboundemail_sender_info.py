@@ -0,0 +1,20 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_basicinfo'),
+        ('mailer', '0003_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundemail',
+            name='sender_info',
+            field=models.ForeignKey(blank=True, help_text="Send with this user's app credentials instead of the default account", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbound_emails', to='accounts.basicinfo'),
+        ),
+    ]
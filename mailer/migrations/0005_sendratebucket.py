@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0004_outboundemail_sender_info'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SendRateBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mailbox', models.CharField(max_length=255, unique=True)),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.DateTimeField()),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='deferred_until',
+            field=models.DateTimeField(blank=True, help_text='Not picked up by the worker before this time', null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0005_sendratebucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailsent',
+            name='attempt_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='emailsent',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='emailsent',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, help_text='When the retry worker should try again; empty when no retry is scheduled', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='emailsent',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='mailer_emai_status_5623c6_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_basicinfo'),
+        ('mailer', '0006_emailsent_retry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject_template', models.CharField(help_text='May use {company}, {role} and {recipient_name}', max_length=500)),
+                ('body_template', models.TextField(help_text='May use {company}, {role} and {recipient_name}')),
+                ('attach_resume', models.BooleanField(default=True)),
+                ('status', models.CharField(choices=[('enqueuing', 'Enqueuing'), ('enqueued', 'Enqueued'), ('failed', 'Failed')], default='enqueuing', max_length=16)),
+                ('enqueued_count', models.PositiveIntegerField(default=0)),
+                ('skipped_count', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sender_info', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='campaigns', to='accounts.basicinfo')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='campaigns', to='mailer.userprofile')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='campaign',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbound_emails', to='mailer.campaign'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_user_profile(apps, schema_editor):
+    EmailSent = apps.get_model('mailer', 'EmailSent')
+    EmailRequest = apps.get_model('mailer', 'EmailRequest')
+    OutboundEmail = apps.get_model('mailer', 'OutboundEmail')
+    EmailSent.objects.filter(user_profile__isnull=True, email_request__isnull=False).update(
+        user_profile=Subquery(
+            EmailRequest.objects.filter(pk=OuterRef('email_request')).values('user_profile')[:1]
+        )
+    )
+    EmailSent.objects.filter(user_profile__isnull=True, outbound_email__user_profile__isnull=False).update(
+        user_profile=Subquery(
+            OutboundEmail.objects.filter(email_sent=OuterRef('pk')).values('user_profile')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0007_campaign'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailsent',
+            name='user_profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sent_emails', to='mailer.userprofile'),
+        ),
+        migrations.RunPython(backfill_user_profile, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='emailsent',
+            index=models.Index(fields=['user_profile', '-sent_at', '-id'], name='mailer_sent_profile_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='emailsent',
+            index=models.Index(fields=['-sent_at', '-id'], name='mailer_sent_keyset'),
+        ),
+    ]
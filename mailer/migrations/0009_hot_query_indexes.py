@@ -0,0 +1,38 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:33
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0008_emailsent_user_profile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailrequest',
+            index=models.Index(fields=['-created_at', '-id'], name='mailer_req_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='emailrequest',
+            index=models.Index(fields=['company', '-created_at', '-id'], name='mailer_req_company_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='emailrequest',
+            index=models.Index(django.db.models.functions.text.Lower('hr_email'), models.OrderBy(models.F('created_at'), descending=True), name='mailer_req_hr_email_lower'),
+        ),
+        migrations.AddIndex(
+            model_name='emailsent',
+            index=models.Index(fields=['status', '-sent_at', '-id'], name='mailer_sent_status_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='emailsent',
+            index=models.Index(fields=['resume_attached', '-sent_at', '-id'], name='mailer_sent_resume_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='emailsent',
+            index=models.Index(django.db.models.functions.text.Lower('to_email'), models.OrderBy(models.F('sent_at'), descending=True), name='mailer_sent_to_email_lower'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:47
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_basicinfo'),
+        ('mailer', '0009_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outboundemail',
+            index=models.Index(django.db.models.functions.text.Lower('to_email'), models.F('status'), name='mailer_outbound_to_email_lower'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.7 on 2026-10-18 01:15
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce
+
+
+def backfill_company_role(apps, schema_editor):
+    EmailRequest = apps.get_model('mailer', 'EmailRequest')
+    EmailSent = apps.get_model('mailer', 'EmailSent')
+    OutboundEmail = apps.get_model('mailer', 'OutboundEmail')
+    OutboundEmail.objects.filter(email_request__isnull=False).update(
+        company=Subquery(EmailRequest.objects.filter(pk=OuterRef('email_request')).values('company')[:1]),
+        role=Subquery(EmailRequest.objects.filter(pk=OuterRef('email_request')).values('role')[:1]),
+    )
+    OutboundEmail.objects.filter(email_request__isnull=True, cover_letter__has_key='company').update(
+        company=Coalesce(KT('cover_letter__company'), Value('')),
+        role=Coalesce(KT('cover_letter__role'), Value('')),
+    )
+    EmailSent.objects.filter(email_request__isnull=False).update(
+        company=Subquery(EmailRequest.objects.filter(pk=OuterRef('email_request')).values('company')[:1]),
+        role=Subquery(EmailRequest.objects.filter(pk=OuterRef('email_request')).values('role')[:1]),
+    )
+    EmailSent.objects.filter(email_request__isnull=True, outbound_email__isnull=False).update(
+        company=Subquery(OutboundEmail.objects.filter(email_sent=OuterRef('pk')).values('company')[:1]),
+        role=Subquery(OutboundEmail.objects.filter(email_sent=OuterRef('pk')).values('role')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0010_outboundemail_to_email_lower'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailsent',
+            name='company',
+            field=models.CharField(blank=True, help_text='Job the email is about, for duplicate detection', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='emailsent',
+            name='role',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='company',
+            field=models.CharField(blank=True, help_text='Job the email is about, for duplicate detection', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='role',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.RunPython(backfill_company_role, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-18 01:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0011_job_company_role'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='user',
+            field=models.ForeignKey(blank=True, help_text="Account that created the profile; only it (and staff) can read the profile's emails", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mailer_profiles', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
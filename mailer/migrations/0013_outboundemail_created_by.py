@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-18 01:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0012_userprofile_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundemail',
+            name='created_by',
+            field=models.ForeignKey(blank=True, help_text='Account that queued the email; it (and staff) can read its status', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbound_emails', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,10 +1,15 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.core.validators import URLValidator
 
 
 class UserProfile(models.Model):
     """Model to store comprehensive user profile information"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, related_name='mailer_profiles', blank=True, null=True, help_text="Account that created the profile; only it (and staff) can read the profile's emails")
+
     # Basic Information
     name = models.CharField(max_length=255)
     location = models.CharField(max_length=255)
@@ -71,6 +76,13 @@ class EmailRequest(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Admin changelist: newest first, optionally filtered by company
+            models.Index(fields=['-created_at', '-id'], name='mailer_req_recent'),
+            models.Index(fields=['company', '-created_at', '-id'], name='mailer_req_company_recent'),
+            # Duplicate detection by recipient, case-insensitively
+            models.Index(Lower('hr_email'), F('created_at').desc(), name='mailer_req_hr_email_lower'),
+        ]
 
     def __str__(self):
         name = self.user_profile.name if self.user_profile else self.name
@@ -80,15 +92,111 @@ class EmailRequest(models.Model):
 class EmailSent(models.Model):
     """Model to track sent emails"""
     email_request = models.ForeignKey(EmailRequest, on_delete=models.CASCADE, related_name='sent_emails', blank=True, null=True)
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, related_name='sent_emails', blank=True, null=True)
+    company = models.CharField(max_length=255, blank=True, help_text="Job the email is about, for duplicate detection")
+    role = models.CharField(max_length=255, blank=True)
     to_email = models.EmailField(max_length=255)
     subject = models.CharField(max_length=500)
     body = models.TextField()
     sent_at = models.DateTimeField(default=timezone.now)
     status = models.CharField(max_length=50, default='sent')
     resume_attached = models.BooleanField(default=False)
+    attempt_count = models.PositiveIntegerField(default=1)
+    next_attempt_at = models.DateTimeField(blank=True, null=True, help_text="When the retry worker should try again; empty when no retry is scheduled")
+    last_error = models.TextField(blank=True)
 
     class Meta:
         ordering = ['-sent_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            # Keyset pagination of the sent-email history, per profile and overall
+            models.Index(fields=['user_profile', '-sent_at', '-id'], name='mailer_sent_profile_keyset'),
+            models.Index(fields=['-sent_at', '-id'], name='mailer_sent_keyset'),
+            # Admin changelist filters, newest first
+            models.Index(fields=['status', '-sent_at', '-id'], name='mailer_sent_status_recent'),
+            models.Index(fields=['resume_attached', '-sent_at', '-id'], name='mailer_sent_resume_recent'),
+            # Duplicate detection by recipient, case-insensitively
+            models.Index(Lower('to_email'), F('sent_at').desc(), name='mailer_sent_to_email_lower'),
+        ]
 
     def __str__(self):
         return f"Email sent to {self.to_email} - {self.subject}"
+
+
+class Campaign(models.Model):
+    """Model to store a mail-merge campaign: one template sent to many recipients"""
+    class Status(models.TextChoices):
+        ENQUEUING = 'enqueuing', 'Enqueuing'
+        ENQUEUED = 'enqueued', 'Enqueued'
+        FAILED = 'failed', 'Failed'
+
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='campaigns')
+    sender_info = models.ForeignKey('accounts.BasicInfo', on_delete=models.SET_NULL, related_name='campaigns', blank=True, null=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, related_name='campaigns', blank=True, null=True)
+    subject_template = models.CharField(max_length=500, help_text="May use {company}, {role} and {recipient_name}")
+    body_template = models.TextField(help_text="May use {company}, {role} and {recipient_name}")
+    attach_resume = models.BooleanField(default=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.ENQUEUING)
+    enqueued_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Campaign {self.pk}: {self.subject_template}"
+
+
+class OutboundEmail(models.Model):
+    """Model to queue outgoing emails for delivery by the mail worker"""
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        SENDING = 'sending', 'Sending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, related_name='outbound_emails', blank=True, null=True)
+    email_request = models.ForeignKey(EmailRequest, on_delete=models.SET_NULL, related_name='outbound_emails', blank=True, null=True)
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='outbound_emails', blank=True, null=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, related_name='outbound_emails', blank=True, null=True, help_text="Account that queued the email; it (and staff) can read its status")
+    sender_info = models.ForeignKey('accounts.BasicInfo', on_delete=models.SET_NULL, related_name='outbound_emails', blank=True, null=True, help_text="Send with this user's app credentials instead of the default account")
+    company = models.CharField(max_length=255, blank=True, help_text="Job the email is about, for duplicate detection")
+    role = models.CharField(max_length=255, blank=True)
+    from_email = models.EmailField(max_length=255)
+    to_email = models.EmailField(max_length=255)
+    subject = models.CharField(max_length=500)
+    body = models.TextField()
+    attach_resume = models.BooleanField(default=False)
+    cover_letter = models.JSONField(blank=True, null=True, help_text="Cover letter details, rendered at send time")
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    error = models.TextField(blank=True)
+    email_sent = models.OneToOneField(EmailSent, on_delete=models.SET_NULL, related_name='outbound_email', blank=True, null=True)
+    deferred_until = models.DateTimeField(blank=True, null=True, help_text="Not picked up by the worker before this time")
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            # Duplicate detection by recipient, case-insensitively
+            models.Index(Lower('to_email'), 'status', name='mailer_outbound_to_email_lower'),
+        ]
+
+    def __str__(self):
+        return f"Outbound email to {self.to_email} ({self.status})"
+
+
+class SendRateBucket(models.Model):
+    """Token bucket state per sending mailbox, shared by every worker process"""
+    mailbox = models.CharField(max_length=255, unique=True)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Rate bucket for {self.mailbox} ({self.tokens:.2f} tokens)"
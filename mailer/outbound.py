@@ -0,0 +1,321 @@
+from datetime import timedelta
+import logging
+import smtplib
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import BasicInfo
+from .attachments import attach_resume
+from .backends import sender_backends
+from .models import OutboundEmail, EmailSent
+from .pdf_cache import get_cover_letter
+from .ratelimit import acquire, penalize
+from .retry import record_failed_attempt
+
+logger = logging.getLogger(__name__)
+
+# SMTP replies meaning "slow down / try later" rather than a real failure
+THROTTLE_SMTP_CODES = {421, 450, 451, 452}
+
+JOB_FIELD_MAX_LENGTH = OutboundEmail._meta.get_field('company').max_length
+
+
+def get_sender_info(user):
+    """
+    Return the caller's BasicInfo when it holds usable app credentials, else None
+    """
+    if user is None or not user.is_authenticated:
+        return None
+    basic_info = BasicInfo.objects.filter(profile__user=user).first()
+    if basic_info and basic_info.email_app_user and basic_info.email_app_password:
+        return basic_info
+    return None
+
+
+async def aget_sender_info(user):
+    """
+    Async counterpart of ``get_sender_info`` for the ASGI views
+    """
+    if user is None or not user.is_authenticated:
+        return None
+    basic_info = await BasicInfo.objects.filter(profile__user=user).afirst()
+    if basic_info and basic_info.email_app_user and basic_info.email_app_password:
+        return basic_info
+    return None
+
+
+def build_outbound(to_email, subject, body, user_profile=None, email_request=None,
+                   attach_resume=False, cover_letter=None, from_email=None, sender_info=None,
+                   deferred_until=None, campaign=None, company='', role='', created_by=None):
+    """
+    Build an unsaved OutboundEmail, filling in the sending address.
+    ``user_profile`` may be a model instance or a ``ProfileSnapshot``.
+    ``company`` and ``role`` default to those of ``email_request`` or
+    ``cover_letter``.
+    """
+    if not from_email:
+        from_email = sender_info.email_app_user if sender_info else settings.DEFAULT_FROM_EMAIL
+    if email_request is not None:
+        company, role = company or email_request.company, role or email_request.role
+    elif cover_letter:
+        company, role = company or cover_letter.get('company'), role or cover_letter.get('role')
+    return OutboundEmail(
+        user_profile_id=user_profile.pk if user_profile is not None else None,
+        email_request=email_request,
+        campaign=campaign,
+        created_by=created_by,
+        sender_info=sender_info,
+        company=str(company or '').strip()[:JOB_FIELD_MAX_LENGTH],
+        role=str(role or '').strip()[:JOB_FIELD_MAX_LENGTH],
+        from_email=from_email,
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        attach_resume=attach_resume,
+        cover_letter=cover_letter,
+        deferred_until=deferred_until,
+    )
+
+
+def enqueue_email(*args, **kwargs):
+    """
+    Queue an email for delivery by the mail worker and return the queued row.
+
+    Takes the same arguments as ``build_outbound``.
+    """
+    outbound = build_outbound(*args, **kwargs)
+    outbound.save()
+    return outbound
+
+
+async def aenqueue_email(*args, **kwargs):
+    """
+    Async counterpart of ``enqueue_email`` for the ASGI views
+    """
+    outbound = build_outbound(*args, **kwargs)
+    await outbound.asave()
+    return outbound
+
+
+def claim_batch(batch_size):
+    """
+    Move up to ``batch_size`` queued emails to ``sending`` and return them.
+
+    Each row is claimed with a conditional UPDATE so concurrent workers never
+    deliver the same email twice.
+    """
+    now = timezone.now()
+    candidate_ids = list(
+        OutboundEmail.objects
+        .filter(status=OutboundEmail.Status.QUEUED)
+        .filter(Q(deferred_until__isnull=True) | Q(deferred_until__lte=now))
+        .order_by('created_at')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    claimed_ids = []
+    for outbound_id in candidate_ids:
+        claimed = OutboundEmail.objects.filter(
+            id=outbound_id, status=OutboundEmail.Status.QUEUED
+        ).update(status=OutboundEmail.Status.SENDING, updated_at=timezone.now())
+        if claimed:
+            claimed_ids.append(outbound_id)
+    return list(
+        OutboundEmail.objects
+        .filter(id__in=claimed_ids)
+        .select_related('user_profile', 'sender_info')
+        .order_by('created_at')
+    )
+
+
+def requeue_stale(max_age_seconds):
+    """
+    Return emails stuck in ``sending`` (e.g. after a worker crash) to the queue
+    """
+    cutoff = timezone.now() - timedelta(seconds=max_age_seconds)
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.Status.SENDING, updated_at__lt=cutoff
+    ).update(status=OutboundEmail.Status.QUEUED, updated_at=timezone.now())
+
+
+def defer(outbound, seconds, reason=''):
+    """
+    Put a claimed email back on the queue, not to be picked up for ``seconds``
+    """
+    outbound.status = OutboundEmail.Status.QUEUED
+    outbound.deferred_until = timezone.now() + timedelta(seconds=seconds)
+    outbound.error = reason
+    outbound.save()
+
+
+def build_message(outbound, connection=None):
+    """
+    Build the EmailMultiAlternatives for a queued email.
+
+    Returns ``(message, resume_attached)``.
+    """
+    email = EmailMultiAlternatives(
+        subject=outbound.subject,
+        body=outbound.body,
+        from_email=outbound.from_email,
+        to=[outbound.to_email],
+        connection=connection,
+    )
+
+    user_profile = outbound.user_profile
+
+    # Attach resume if available
+    resume_attached = False
+    if outbound.attach_resume and user_profile and user_profile.resume_file:
+        try:
+            attach_resume(email, user_profile.resume_file.path)
+            resume_attached = True
+        except Exception as attach_error:
+            logger.warning(f"Failed to attach resume: {str(attach_error)}")
+
+    # Generate and attach cover letter PDF
+    if outbound.cover_letter and user_profile:
+        try:
+            filename, pdf, _ = get_cover_letter(user_profile, outbound.cover_letter)
+            email.attach(filename, pdf, 'application/pdf')
+        except Exception as cover_letter_error:
+            logger.warning(f"Failed to generate cover letter: {str(cover_letter_error)}")
+
+    return email, resume_attached
+
+
+def _record_failure(outbound, email_error):
+    logger.error(f"Email sending error: {str(email_error)}")
+    outbound.status = OutboundEmail.Status.FAILED
+    outbound.error = str(email_error)
+    # The retry worker picks the row up again if the error is transient
+    outbound.email_sent = record_failed_attempt(EmailSent(
+        email_request=outbound.email_request,
+        user_profile=outbound.user_profile,
+        company=outbound.company,
+        role=outbound.role,
+        to_email=outbound.to_email,
+        subject=outbound.subject,
+        body=outbound.body,
+        resume_attached=False
+    ), email_error)
+    outbound.save()
+    return False
+
+
+def _is_throttled(error):
+    """
+    True when ``error`` is the provider asking to slow down. A refused
+    recipient carries its own reply code, so a send whose recipients were
+    all refused with a throttling code counts too.
+    """
+    if isinstance(error, smtplib.SMTPResponseException):
+        codes = [error.smtp_code]
+    elif isinstance(error, smtplib.SMTPRecipientsRefused) and error.recipients:
+        codes = [code for code, _ in error.recipients.values()]
+    else:
+        return False
+    return all(code in THROTTLE_SMTP_CODES for code in codes)
+
+
+def deliver(outbound, connection=None):
+    """
+    Send a single claimed email and record the outcome.
+
+    Sends are paced by the per-mailbox token bucket; an email that would
+    have to wait too long, or that the provider throttles, is deferred
+    rather than failed. Returns True when sent, False when failed and None
+    when deferred.
+    """
+    wait = acquire(outbound.from_email)
+    if wait:
+        defer(outbound, wait)
+        return None
+
+    resume_attached = False
+    try:
+        email, resume_attached = build_message(outbound, connection=connection)
+        email.send()
+    except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as email_error:
+        if not _is_throttled(email_error):
+            return _record_failure(outbound, email_error)
+        cooldown = getattr(settings, 'MAIL_RATE_LIMIT_COOLDOWN', 60)
+        penalize(outbound.from_email, cooldown)
+        defer(outbound, cooldown, reason=str(email_error))
+        return None
+    except Exception as email_error:
+        return _record_failure(outbound, email_error)
+
+    outbound.status = OutboundEmail.Status.SENT
+    outbound.error = ''
+    outbound.deferred_until = None
+    outbound.sent_at = timezone.now()
+    outbound.email_sent = EmailSent.objects.create(
+        email_request=outbound.email_request,
+        user_profile=outbound.user_profile,
+        company=outbound.company,
+        role=outbound.role,
+        to_email=outbound.to_email,
+        subject=outbound.subject,
+        body=outbound.body,
+        status='sent',
+        resume_attached=resume_attached
+    )
+    outbound.save()
+    return True
+
+
+def process_queue(batch_size=50):
+    """
+    Claim and deliver one batch of queued emails.
+
+    Emails without a per-user sender share a single default SMTP connection,
+    opened only once the batch reaches the first of them. If it cannot be
+    opened, those emails are handed back to the queue, the per-sender emails
+    are still delivered, and the connection error is raised afterwards.
+
+    Returns ``(sent_count, failed_count)``.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    sent_count = 0
+    failed_count = 0
+    connection = None
+    connection_error = None
+    requeue_ids = []
+    try:
+        for outbound in batch:
+            if outbound.sender_info is not None:
+                # Route through the user's own mailbox via the cached per-sender backend
+                sender_connection = sender_backends.get(outbound.sender_info)
+            else:
+                if connection is None and connection_error is None:
+                    connection = get_connection()
+                    try:
+                        connection.open()
+                    except Exception as e:
+                        connection, connection_error = None, e
+                if connection_error is not None:
+                    # SMTP is unreachable; this email is retried with a later batch
+                    requeue_ids.append(outbound.id)
+                    continue
+                sender_connection = connection
+            delivered = deliver(outbound, connection=sender_connection)
+            if delivered:
+                sent_count += 1
+            elif delivered is False:
+                failed_count += 1
+    finally:
+        if connection is not None:
+            connection.close()
+        if requeue_ids:
+            OutboundEmail.objects.filter(id__in=requeue_ids).update(
+                status=OutboundEmail.Status.QUEUED, updated_at=timezone.now()
+            )
+    if connection_error is not None:
+        raise connection_error
+    return sent_count, failed_count
@@ -0,0 +1,46 @@
+import base64
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sent_at, pk):
+    return base64.urlsafe_b64encode(f'{sent_at.isoformat()}|{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        sent_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        sent_at = parse_datetime(sent_at)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Invalid cursor')
+    if sent_at is None:
+        raise InvalidCursor('Invalid cursor')
+    return sent_at, pk
+
+
+def keyset_page(queryset, cursor=None, page_size=50):
+    """
+    Return one page of ``queryset`` newest first, keyed on ``(sent_at, id)``.
+
+    Instead of an OFFSET, each page continues strictly after the last row of
+    the previous one, so every page is a single index range scan no matter
+    how deep it is. Returns ``(rows, next_cursor)``; ``next_cursor`` is None
+    on the last page.
+    """
+    queryset = queryset.order_by('-sent_at', '-id')
+    if cursor:
+        sent_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(sent_at__lt=sent_at) | Q(sent_at=sent_at, id__lt=pk))
+
+    rows = list(queryset[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(last.sent_at, last.pk)
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.utils.http import parse_etags, quote_etag
+
+from .cover_letter import cover_letter_filename, letter_date
+from .pdf_renderer import renderer
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cover letter layout changes so old renders are not served
+RENDER_VERSION = 1
+
+
+class PDFCache:
+    """
+    On-disk cache of rendered PDFs, one ``<key>.pdf`` file per entry.
+
+    A file's mtime is its last use: hits touch it, and when the directory
+    grows past ``max_bytes`` the least recently used files are removed.
+    Files are written to a temp file and renamed into place, so readers never
+    see a partial PDF and several processes can share the directory.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pdf')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def set(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used files until the cache fits in ``max_bytes``"""
+        with self._lock:
+            entries = []
+            total = 0
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                return
+            for name in names:
+                if not name.endswith('.pdf'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, name in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+cover_letter_cache = PDFCache(
+    directory=getattr(settings, 'COVER_LETTER_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'cover_letter_cache')),
+    max_bytes=getattr(settings, 'COVER_LETTER_CACHE_MAX_BYTES', 100 * 1024 * 1024),
+)
+
+
+def cover_letter_key(profile, job, date=None):
+    """
+    Cache key (also used as the ETag) for a cover letter: a hash of the
+    profile version, the job fields and the date printed on the letter,
+    which is the only part of a render that changes on its own.
+    """
+    payload = json.dumps({
+        'version': RENDER_VERSION,
+        'profile': profile.pk,
+        'updated_at': profile.updated_at.isoformat() if profile.updated_at else None,
+        'job': job,
+        'date': (date or letter_date()).isoformat(),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cover_letter_etag(profile, job, date=None):
+    return quote_etag(cover_letter_key(profile, job, date))
+
+
+def etag_matches(request, etag):
+    """True when the request's If-None-Match already names ``etag``"""
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    return '*' in etags or etag in etags
+
+
+def get_cover_letter(profile, job, date=None):
+    """
+    Return ``(filename, pdf_bytes, cache_hit)``, rendering the letter only
+    when an identical one is not already cached on disk.
+    """
+    date = date or letter_date()
+    key = cover_letter_key(profile, job, date)
+    filename = cover_letter_filename(profile, job)
+
+    pdf_bytes = cover_letter_cache.get(key)
+    if pdf_bytes is not None:
+        return filename, pdf_bytes, True
+
+    filename, pdf_bytes = renderer.render(profile, job, date=date)
+    try:
+        cover_letter_cache.set(key, pdf_bytes)
+    except OSError as e:
+        logger.warning(f"Failed to cache cover letter PDF: {str(e)}")
+    return filename, pdf_bytes, False
@@ -0,0 +1,72 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .cover_letter import CoverLetterJob, get_styles, letter_date, profile_spec, render_job
+
+logger = logging.getLogger(__name__)
+
+
+class PDFRenderer:
+    """
+    Renders cover letters in a pool of worker processes.
+
+    Reportlab layout is pure-Python CPU work that holds the GIL, so rendering
+    in the request thread serializes concurrent requests on one core. Jobs are
+    sent to the pool as a picklable ``CoverLetterJob``; with ``max_workers``
+    set to 0 they are rendered in the calling thread instead.
+    """
+
+    def __init__(self, max_workers, timeout):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers only import the renderer, never the parent's threads or connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=get_styles,
+                )
+            return self._executor
+
+    def render(self, profile, job, date=None):
+        """
+        Render a cover letter. Returns a ``(filename, pdf_bytes)`` tuple.
+        """
+        spec = CoverLetterJob(profile_spec(profile), dict(job), date or letter_date())
+        if not self.max_workers:
+            return render_job(spec)
+
+        executor = self._get_executor()
+        try:
+            return executor.submit(render_job, spec).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next request and render this one here
+            logger.warning("Cover letter renderer pool broke, restarting it")
+            self.shutdown(executor)
+            return render_job(spec)
+
+    def shutdown(self, executor=None):
+        with self._lock:
+            if executor is not None and executor is not self._executor:
+                return
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+renderer = PDFRenderer(
+    max_workers=getattr(settings, 'COVER_LETTER_RENDER_PROCESSES', 2),
+    timeout=getattr(settings, 'COVER_LETTER_RENDER_TIMEOUT', 30),
+)
+atexit.register(renderer.shutdown)
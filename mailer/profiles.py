@@ -0,0 +1,161 @@
+from collections import OrderedDict
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.functions import Substr
+
+from .cover_letter import LETTER_EXPERIENCE_LENGTH
+from .generation import FALLBACK_EXPERIENCE_LENGTH, PROMPT_EXPERIENCE_LENGTH, PROMPT_PROJECTS_LENGTH
+from .models import UserProfile
+
+# One more than the longest excerpt of a large text field any builder uses,
+# which keeps their "longer than N" checks for the ellipsis correct
+TEXT_EXCERPT_LENGTH = max(
+    PROMPT_EXPERIENCE_LENGTH, PROMPT_PROJECTS_LENGTH, FALLBACK_EXPERIENCE_LENGTH, LETTER_EXPERIENCE_LENGTH,
+) + 1
+
+
+class ProfileSnapshot:
+    """
+    The profile fields the email prompt, fallback email and cover letter
+    builders read, frozen at one ``updated_at`` version.
+
+    ``professional_experience`` and ``projects`` hold only their first
+    ``TEXT_EXCERPT_LENGTH`` characters, which is all any builder uses; a
+    builder showing more of either field must add its length to that
+    constant.
+    """
+
+    __slots__ = (
+        'id', 'updated_at', 'name', 'location', 'phone_number', 'primary_email',
+        'portfolio_url', 'linkedin_url', 'github_url', 'education_degree', 'education_field',
+        'university_name', 'graduation_year', 'programming_languages',
+        'professional_experience', 'projects', 'has_resume',
+    )
+
+    def __init__(self, **values):
+        for field in self.__slots__:
+            object.__setattr__(self, field, values[field])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __repr__(self):
+        return f'<ProfileSnapshot {self.id} @ {self.updated_at.isoformat() if self.updated_at else None}>'
+
+
+_COLUMNS = [field for field in ProfileSnapshot.__slots__ if field not in ('professional_experience', 'projects', 'has_resume')]
+
+
+def _snapshot_rows(profile_id):
+    return UserProfile.objects.filter(id=profile_id).annotate(
+        experience_excerpt=Substr('professional_experience', 1, TEXT_EXCERPT_LENGTH),
+        projects_excerpt=Substr('projects', 1, TEXT_EXCERPT_LENGTH),
+    ).values(*_COLUMNS, 'experience_excerpt', 'projects_excerpt', 'resume_file')
+
+
+def _snapshot(row):
+    return ProfileSnapshot(
+        professional_experience=row.pop('experience_excerpt') or '',
+        projects=row.pop('projects_excerpt') or '',
+        has_resume=bool(row.pop('resume_file')),
+        **row,
+    )
+
+
+class ProfileSnapshotCache:
+    """
+    LRU cache of ``ProfileSnapshot`` by profile id, versioned by
+    ``updated_at``.
+
+    A snapshot is served without touching the database for ``max_age``
+    seconds after it was loaded or last checked; after that one query of
+    ``updated_at`` confirms it is current before it is served again, so
+    edits made by other processes are seen within ``max_age``. Saves and
+    deletes in this process evict the entry straight away.
+    """
+
+    def __init__(self, max_size=1024, max_age=30):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, profile_id):
+        """
+        Snapshot of the profile ``profile_id``; raises
+        ``UserProfile.DoesNotExist`` like ``UserProfile.objects.get``
+        """
+        profile_id = int(profile_id)
+        snapshot, fresh = self._cached(profile_id)
+        if fresh:
+            return snapshot
+        if snapshot is not None:
+            updated_at = UserProfile.objects.filter(id=profile_id).values_list('updated_at', flat=True).first()
+            if self._confirm(snapshot, updated_at):
+                return snapshot
+        return self._load(profile_id, _snapshot_rows(profile_id).first())
+
+    async def aget(self, profile_id):
+        """
+        Async counterpart of ``get`` for the ASGI views
+        """
+        profile_id = int(profile_id)
+        snapshot, fresh = self._cached(profile_id)
+        if fresh:
+            return snapshot
+        if snapshot is not None:
+            updated_at = await UserProfile.objects.filter(id=profile_id).values_list('updated_at', flat=True).afirst()
+            if self._confirm(snapshot, updated_at):
+                return snapshot
+        return self._load(profile_id, await _snapshot_rows(profile_id).afirst())
+
+    def discard(self, profile_id):
+        with self._lock:
+            self._entries.pop(profile_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _cached(self, profile_id):
+        """The cached snapshot, if any, and whether it can be served unchecked"""
+        with self._lock:
+            entry = self._entries.get(profile_id)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(profile_id)
+            snapshot, checked_at = entry
+            return snapshot, time.monotonic() - checked_at <= self.max_age
+
+    def _confirm(self, snapshot, updated_at):
+        if updated_at is None or updated_at != snapshot.updated_at:
+            return False
+        self._store(snapshot)
+        return True
+
+    def _load(self, profile_id, row):
+        if row is None:
+            self.discard(profile_id)
+            raise UserProfile.DoesNotExist('UserProfile matching query does not exist.')
+        snapshot = _snapshot(row)
+        self._store(snapshot)
+        return snapshot
+
+    def _store(self, snapshot):
+        with self._lock:
+            self._entries[snapshot.id] = (snapshot, time.monotonic())
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+profile_snapshots = ProfileSnapshotCache(
+    max_size=getattr(settings, 'PROFILE_SNAPSHOT_CACHE_SIZE', 1024),
+    max_age=getattr(settings, 'PROFILE_SNAPSHOT_MAX_AGE', 30),
+)
@@ -0,0 +1,104 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import SendRateBucket
+
+logger = logging.getLogger(__name__)
+
+# Optimistic-update attempts before giving up on a contended bucket
+MAX_RESERVE_ATTEMPTS = 5
+
+
+def get_limits(mailbox):
+    """
+    Return ``(rate, burst)`` for a mailbox, or None when sends are unlimited.
+
+    ``rate`` is tokens per second; ``burst`` is the bucket capacity.
+    Mailboxes are matched case-insensitively against the overrides.
+    """
+    overrides = {key.lower(): value for key, value in getattr(settings, 'MAIL_RATE_LIMIT_OVERRIDES', {}).items()}
+    rate, burst = overrides.get(mailbox.lower(), (
+        getattr(settings, 'MAIL_RATE_LIMIT_RATE', 0),
+        getattr(settings, 'MAIL_RATE_LIMIT_BURST', 1),
+    ))
+    if not rate:
+        return None
+    return float(rate), max(float(burst), 1.0)
+
+
+def reserve(mailbox):
+    """
+    Take one send token for ``mailbox``.
+
+    Returns 0.0 when a token was taken, otherwise the number of seconds until
+    one becomes available. Buckets live in the database so every worker
+    process draws from the same budget; updates are guarded by a version
+    column instead of row locks, which SQLite does not support.
+    """
+    mailbox = mailbox.lower()
+    limits = get_limits(mailbox)
+    if limits is None:
+        return 0.0
+    rate, burst = limits
+
+    for _ in range(MAX_RESERVE_ATTEMPTS):
+        now = timezone.now()
+        bucket, _ = SendRateBucket.objects.get_or_create(
+            mailbox=mailbox, defaults={'tokens': burst, 'updated_at': now}
+        )
+        elapsed = max((now - bucket.updated_at).total_seconds(), 0.0)
+        tokens = min(burst, bucket.tokens + elapsed * rate)
+        if tokens < 1:
+            return (1 - tokens) / rate
+
+        updated = SendRateBucket.objects.filter(pk=bucket.pk, version=bucket.version).update(
+            tokens=tokens - 1, updated_at=now, version=F('version') + 1
+        )
+        if updated:
+            return 0.0
+
+    # Heavily contended; back off for roughly one token interval
+    return 1 / rate
+
+
+def acquire(mailbox, max_wait=None):
+    """
+    Take one send token for ``mailbox``, sleeping up to ``max_wait`` seconds.
+
+    Returns 0.0 once a token was taken, otherwise the remaining wait in
+    seconds so the caller can defer the send instead of failing it.
+    """
+    if max_wait is None:
+        max_wait = getattr(settings, 'MAIL_RATE_LIMIT_MAX_WAIT', 5)
+    deadline = time.monotonic() + max_wait
+    while True:
+        wait = reserve(mailbox)
+        if not wait:
+            return 0.0
+        if time.monotonic() + wait > deadline:
+            return wait
+        time.sleep(wait)
+
+
+def penalize(mailbox, seconds):
+    """
+    Empty the bucket for ``mailbox`` so no sends are allowed for ``seconds``.
+
+    Used when the provider pushes back (e.g. SMTP 421) despite the bucket
+    having tokens.
+    """
+    mailbox = mailbox.lower()
+    limits = get_limits(mailbox)
+    if limits is None:
+        return
+    rate, _ = limits
+    SendRateBucket.objects.update_or_create(
+        mailbox=mailbox,
+        defaults={'tokens': -rate * seconds, 'updated_at': timezone.now(), 'version': F('version') + 1},
+        create_defaults={'tokens': -rate * seconds, 'updated_at': timezone.now()},
+    )
+    logger.warning(f"Throttling {mailbox} for {seconds}s after provider pushback")
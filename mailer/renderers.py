@@ -0,0 +1,25 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets ``Accept: text/event-stream`` clients through content negotiation.
+
+    Streaming views return a ``StreamingHttpResponse`` that is never
+    rendered; this only renders the plain ``Response`` those views return
+    for errors, as a single ``error`` event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return sse_event('error', data).encode(self.charset)
@@ -0,0 +1,203 @@
+from datetime import timedelta
+import logging
+import random
+import smtplib
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .attachments import attach_resume
+from .backends import sender_backends
+from .models import EmailSent, OutboundEmail
+from .ratelimit import acquire
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed row is hidden from other retry workers while it is sent
+CLAIM_LEASE_SECONDS = 300
+
+
+def is_transient(error):
+    """
+    Classify a send error: True when retrying later may succeed.
+
+    4xx SMTP replies and connection problems are transient; 5xx replies
+    (bad recipient, rejected content, bad credentials) are permanent.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+
+def backoff_delay(attempt_count):
+    """
+    Seconds to wait before the next attempt: exponential in the number of
+    attempts made so far, capped, with jitter so failed batches do not all
+    come back at the same moment.
+    """
+    base = getattr(settings, 'MAIL_RETRY_BASE_DELAY', 60)
+    cap = getattr(settings, 'MAIL_RETRY_MAX_DELAY', 3600)
+    delay = min(cap, base * 2 ** max(attempt_count - 1, 0))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def record_failed_attempt(email_sent, error, save=True):
+    """
+    Mark an EmailSent row as failed and schedule a retry when the error is
+    transient and attempts remain.
+    """
+    max_attempts = getattr(settings, 'MAIL_RETRY_MAX_ATTEMPTS', 5)
+    email_sent.status = 'failed'
+    email_sent.last_error = str(error)
+    if is_transient(error) and email_sent.attempt_count < max_attempts:
+        email_sent.next_attempt_at = timezone.now() + timedelta(seconds=backoff_delay(email_sent.attempt_count))
+    else:
+        email_sent.next_attempt_at = None
+    if save:
+        email_sent.save()
+    return email_sent
+
+
+def claim_due(batch_size):
+    """
+    Claim up to ``batch_size`` failed emails whose retry is due.
+
+    Rows are picked with ``select_for_update(skip_locked=True)`` and leased by
+    pushing ``next_attempt_at`` forward, so concurrent retry workers skip each
+    other's rows. The lease is a conditional UPDATE as well, which keeps the
+    claim safe on databases without row locks.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=CLAIM_LEASE_SECONDS)
+    claimed_ids = []
+    with transaction.atomic():
+        due = (
+            EmailSent.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='failed', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', 'next_attempt_at')[:batch_size]
+        )
+        for email_sent_id, next_attempt_at in due:
+            claimed = EmailSent.objects.filter(
+                id=email_sent_id, status='failed', next_attempt_at=next_attempt_at
+            ).update(next_attempt_at=lease_until)
+            if claimed:
+                claimed_ids.append(email_sent_id)
+    return list(
+        EmailSent.objects
+        .filter(id__in=claimed_ids)
+        .select_related('email_request__user_profile', 'outbound_email__user_profile', 'outbound_email__sender_info')
+        .order_by('sent_at')
+    )
+
+
+def _build_retry_message(email_sent, default_connection):
+    """
+    Rebuild the message for a failed row. Returns ``(message, resume_attached)``.
+    """
+    # Imported here because outbound records its failures through this module
+    from .outbound import build_message
+
+    outbound = getattr(email_sent, 'outbound_email', None)
+    if outbound is not None:
+        # Queued emails keep everything needed to rebuild attachments and sender
+        if outbound.sender_info is not None:
+            connection = sender_backends.get(outbound.sender_info)
+        else:
+            connection = default_connection
+        return build_message(outbound, connection=connection)
+
+    email = EmailMultiAlternatives(
+        subject=email_sent.subject,
+        body=email_sent.body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email_sent.to_email],
+        connection=default_connection,
+    )
+    resume_attached = False
+    user_profile = email_sent.email_request.user_profile if email_sent.email_request else None
+    if user_profile and user_profile.resume_file:
+        try:
+            attach_resume(email, user_profile.resume_file.path)
+            resume_attached = True
+        except Exception as attach_error:
+            logger.warning(f"Failed to attach resume: {str(attach_error)}")
+    return email, resume_attached
+
+
+def retry_email(email_sent, connection=None):
+    """
+    Retry one claimed EmailSent row.
+
+    Returns True when sent, False when the attempt failed and None when it
+    was pushed back by the sending rate limit.
+    """
+    try:
+        email, resume_attached = _build_retry_message(email_sent, connection)
+    except Exception as build_error:
+        email_sent.attempt_count += 1
+        record_failed_attempt(email_sent, build_error)
+        return False
+
+    wait = acquire(email.from_email)
+    if wait:
+        # Over the sending rate; try again when a token is available
+        email_sent.next_attempt_at = timezone.now() + timedelta(seconds=wait)
+        email_sent.save(update_fields=['next_attempt_at'])
+        return None
+
+    email_sent.attempt_count += 1
+    try:
+        email.send()
+    except Exception as email_error:
+        logger.error(f"Retry {email_sent.attempt_count} to {email_sent.to_email} failed: {str(email_error)}")
+        record_failed_attempt(email_sent, email_error)
+        return False
+
+    email_sent.status = 'sent'
+    email_sent.sent_at = timezone.now()
+    email_sent.resume_attached = resume_attached
+    email_sent.next_attempt_at = None
+    email_sent.last_error = ''
+    email_sent.save()
+
+    outbound = getattr(email_sent, 'outbound_email', None)
+    if outbound is not None:
+        outbound.status = OutboundEmail.Status.SENT
+        outbound.error = ''
+        outbound.sent_at = email_sent.sent_at
+        outbound.save(update_fields=['status', 'error', 'sent_at', 'updated_at'])
+    return True
+
+
+def process_retries(batch_size=50):
+    """
+    Retry one batch of due failed emails. Returns ``(sent_count, failed_count)``.
+    """
+    batch = claim_due(batch_size)
+    if not batch:
+        return 0, 0
+
+    sent_count = 0
+    failed_count = 0
+    connection = get_connection()
+    try:
+        for email_sent in batch:
+            retried = retry_email(email_sent, connection=connection)
+            if retried:
+                sent_count += 1
+            elif retried is False:
+                failed_count += 1
+    finally:
+        connection.close()
+    return sent_count, failed_count
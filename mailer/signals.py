@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import UserProfile
+from .profiles import profile_snapshots
+
+
+def sqlite_pragmas():
+    """
+    The PRAGMAs applied to every new SQLite connection, in order.
+
+    ``SQLITE_TUNING`` adds the single-node tuning: WAL with
+    ``synchronous=NORMAL`` (durable across crashes, fsync only at
+    checkpoints), a busy timeout so writers queue for the lock instead of
+    failing, and memory-mapped reads.
+    """
+    pragmas = {}
+    if getattr(settings, 'SQLITE_JOURNAL_MODE', ''):
+        pragmas['journal_mode'] = settings.SQLITE_JOURNAL_MODE
+    if getattr(settings, 'SQLITE_TUNING', False):
+        pragmas.update({
+            'journal_mode': 'wal',
+            'synchronous': settings.SQLITE_SYNCHRONOUS,
+            'busy_timeout': settings.SQLITE_BUSY_TIMEOUT,
+            'mmap_size': settings.SQLITE_MMAP_SIZE,
+        })
+    return pragmas
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    Apply ``sqlite_pragmas()`` as soon as a SQLite connection opens.
+
+    In WAL mode readers no longer block behind the EmailSent/OutboundEmail
+    writes done on every send, and writers no longer wait for readers.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = sqlite_pragmas()
+    if pragmas:
+        with connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def forget_profile_snapshot(sender, instance, **kwargs):
+    """Drop the cached ``ProfileSnapshot`` of a profile that was edited or deleted"""
+    profile_id = instance.pk
+    profile_snapshots.discard(profile_id)
+    # Another thread may have reloaded the old row before this transaction commits
+    transaction.on_commit(lambda: profile_snapshots.discard(profile_id))
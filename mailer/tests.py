@@ -1,3 +1,1322 @@
-from django.test import TestCase
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+import json
+import os
+import smtplib
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.db import connection
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import BasicInfo
+from . import campaigns
+from .admin import EmailRequestAdmin
+from .attachments import AttachmentCache, attach_resume, attachment_cache
+from .campaigns import campaign_progress, run_campaign, template_fields
+from .backends import PooledSMTPBackend, SenderBackendCache, connection_pool
+from .cover_letter import _build_story, get_styles, letter_date, render_cover_letter
+from .models import Campaign, EmailRequest, EmailSent, OutboundEmail, SendRateBucket, UserProfile
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+from .generation import enhanced_fallback_email, enhanced_prompt_inputs
+from .pdf_cache import PDFCache, cover_letter_cache, get_cover_letter
+from .profiles import ProfileSnapshotCache, TEXT_EXCERPT_LENGTH, profile_snapshots
+from .pdf_renderer import PDFRenderer, renderer
+from .duplicates import find_duplicates
+from .outbound import build_outbound, claim_batch, deliver, enqueue_email, process_queue, requeue_stale
+from .ratelimit import get_limits, penalize, reserve
+from .signals import sqlite_pragmas
+from .retry import backoff_delay, claim_due, is_transient, process_retries, record_failed_attempt
+
+
+User = get_user_model()
+
+
+def make_profile(**fields):
+    values = {
+        'name': 'Jane Doe', 'location': 'Remote', 'phone_number': '+1-555-0100',
+        'primary_email': 'jane@example.com', 'education_degree': 'BTech',
+        'education_field': 'Computer Science', 'university_name': 'University',
+        'graduation_year': 2020, 'programming_languages': 'Python, Go',
+        'professional_experience': 'Built APIs.', 'projects': 'A mailer.',
+    }
+    values.update(fields)
+    return UserProfile.objects.create(**values)
+
+
+def make_user(email='jane@example.com', username='jane'):
+    return User.objects.create_user(email=email, username=username, password='secret-pass-123')
+
+
+def make_sender(user):
+    return BasicInfo.objects.create(
+        profile=user.profile, email_app_user=user.email, email_app_password='app-password',
+    )
+
+
+@override_settings(MAIL_RATE_LIMIT_RATE=0)
+class OutboundQueueTests(TestCase):
+    """
+    Queued emails are claimed once, delivered by the worker and handed back
+    to the queue when they cannot be sent yet.
+    """
+
+    def setUp(self):
+        self.profile = make_profile()
+
+    def queue(self, count=1, **fields):
+        return [
+            enqueue_email(to_email=f'hr{number}@example.com', subject='Application', body='Hello',
+                          user_profile=self.profile, **fields)
+            for number in range(count)
+        ]
+
+    def test_claim_is_exclusive(self):
+        self.queue(3)
+        self.assertEqual(len(claim_batch(2)), 2)
+        self.assertEqual(len(claim_batch(10)), 1)
+        self.assertEqual(claim_batch(10), [])
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.Status.SENDING).count(), 3)
+
+    def test_deferred_emails_wait(self):
+        self.queue(deferred_until=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(claim_batch(10), [])
+
+    def test_requeue_stale(self):
+        outbound, = self.queue()
+        claim_batch(10)
+        self.assertEqual(requeue_stale(600), 0)
+        OutboundEmail.objects.filter(pk=outbound.pk).update(updated_at=timezone.now() - timedelta(minutes=20))
+        self.assertEqual(requeue_stale(600), 1)
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.Status.QUEUED)
+
+    def test_process_queue_delivers(self):
+        outbound, = self.queue()
+        self.assertEqual(process_queue(), (1, 0))
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.Status.SENT)
+        self.assertEqual(outbound.email_sent.status, 'sent')
+        self.assertEqual(mail.outbox[0].to, ['hr0@example.com'])
+
+    def test_default_connection_failure_spares_sender_rows(self):
+        user = make_user()
+        sender_row, = self.queue(sender_info=make_sender(user))
+        default_row, = self.queue()
+        broken = mock.Mock()
+        broken.open.side_effect = OSError('connection refused')
+        with mock.patch('mailer.outbound.get_connection', return_value=broken):
+            with self.assertRaises(OSError):
+                process_queue()
+        sender_row.refresh_from_db()
+        default_row.refresh_from_db()
+        self.assertEqual(sender_row.status, OutboundEmail.Status.SENT)
+        self.assertEqual(default_row.status, OutboundEmail.Status.QUEUED)
+
+    def test_default_connection_not_opened_for_sender_rows(self):
+        user = make_user()
+        self.queue(2, sender_info=make_sender(user))
+        with mock.patch('mailer.outbound.get_connection') as get_connection:
+            self.assertEqual(process_queue(), (2, 0))
+        get_connection.assert_not_called()
+        self.assertEqual(EmailSent.objects.filter(status='sent').count(), 2)
+
+
+class PooledSMTPBackendTests(TestCase):
+    """
+    The pooled backend reuses SMTP connections across sends and retries a
+    send once on a fresh connection when the server drops it.
+    """
+
+    def setUp(self):
+        connection_pool.clear()
+        self.addCleanup(connection_pool.clear)
+        self.servers = []
+        patcher = mock.patch('django.core.mail.backends.smtp.smtplib.SMTP', side_effect=self.connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connect(self, *args, **kwargs):
+        server = mock.Mock()
+        server.sendmail.return_value = {}
+        self.servers.append(server)
+        return server
+
+    def send(self):
+        backend = PooledSMTPBackend(host='smtp.example.com', port=587, username='jane', password='secret')
+        message = EmailMessage('Application', 'Hello', 'jane@example.com', ['hr@example.com'])
+        return backend.send_messages([message])
+
+    def test_connection_reused(self):
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(len(self.servers), 1)
+        self.assertEqual(self.servers[0].sendmail.call_count, 2)
+
+    def test_reconnect_on_421(self):
+        self.send()
+        self.servers[0].sendmail.side_effect = smtplib.SMTPResponseException(421, b'Closing connection')
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(len(self.servers), 2)
+        self.servers[1].sendmail.assert_called_once()
+
+    def test_reconnect_on_disconnect(self):
+        self.send()
+        self.servers[0].sendmail.side_effect = smtplib.SMTPServerDisconnected()
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(len(self.servers), 2)
+
+    def test_other_errors_raised(self):
+        self.send()
+        self.servers[0].sendmail.side_effect = smtplib.SMTPResponseException(554, b'Rejected')
+        with self.assertRaises(smtplib.SMTPResponseException):
+            self.send()
+        self.assertEqual(len(self.servers), 1)
+
+
+@override_settings(MAIL_RATE_LIMIT_RATE=0)
+class SenderMailboxTests(TestCase):
+    """
+    Emails are sent through the caller's own mailbox when their BasicInfo
+    holds app credentials, with one cached backend per sender.
+    """
+
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def send(self):
+        response = self.client.post('/api/send-email/', {
+            'hr_email': 'hr@example.com', 'subject': 'Application', 'body': 'Hello', 'allow_duplicate': True,
+        }, format='json')
+        self.assertEqual(response.status_code, 202, response.content)
+        return OutboundEmail.objects.get(pk=response.json()['job_id'])
+
+    def test_caller_mailbox(self):
+        sender = make_sender(self.user)
+        outbound = self.send()
+        self.assertEqual(outbound.sender_info, sender)
+        self.assertEqual(outbound.from_email, 'jane@example.com')
+        process_queue()
+        self.assertEqual(mail.outbox[0].from_email, 'jane@example.com')
+
+    def test_default_account_without_credentials(self):
+        BasicInfo.objects.create(profile=self.user.profile, email_app_user='jane@example.com')
+        outbound = self.send()
+        self.assertIsNone(outbound.sender_info)
+        self.assertEqual(outbound.from_email, settings.DEFAULT_FROM_EMAIL)
+
+    @mock.patch('mailer.backends.get_connection', side_effect=lambda **credentials: mock.Mock(**credentials))
+    def test_backend_cache(self, get_connection):
+        sender = make_sender(self.user)
+        cache = SenderBackendCache(max_size=1, max_idle=300)
+        backend = cache.get(sender)
+        self.assertIs(cache.get(sender), backend)
+        self.assertEqual(backend.username, 'jane@example.com')
+
+        # Edited credentials get a new backend
+        sender.email_app_password = 'new-password'
+        sender.save()
+        changed = cache.get(sender)
+        self.assertIsNot(changed, backend)
+        self.assertEqual(changed.password, 'new-password')
+
+        # Least recently used senders are evicted past max_size
+        other = make_sender(make_user('john@example.com', 'john'))
+        cache.get(other)
+        self.assertIsNot(cache.get(sender), changed)
+        changed.close.assert_called_once()
+
+
+@override_settings(MAIL_RATE_LIMIT_RATE=1, MAIL_RATE_LIMIT_BURST=2, MAIL_RATE_LIMIT_MAX_WAIT=0, MAIL_RATE_LIMIT_COOLDOWN=60)
+class RateLimitTests(TestCase):
+    """
+    Sends are paced per mailbox by a token bucket in the database; emails
+    over the rate or throttled by the provider are deferred, not failed.
+    """
+
+    def test_reserve_until_empty(self):
+        self.assertEqual(reserve('Jane@Example.com'), 0.0)
+        self.assertEqual(reserve('jane@example.com'), 0.0)
+        wait = reserve('jane@example.com')
+        self.assertGreater(wait, 0.9)
+        self.assertLessEqual(wait, 1.0)
+        self.assertEqual(SendRateBucket.objects.get().mailbox, 'jane@example.com')
+
+    def test_bucket_refills(self):
+        reserve('jane@example.com')
+        reserve('jane@example.com')
+        SendRateBucket.objects.update(updated_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(reserve('jane@example.com'), 0.0)
+
+    def test_penalize(self):
+        penalize('jane@example.com', 30)
+        self.assertGreater(reserve('jane@example.com'), 30)
+
+    def test_overrides_match_any_case(self):
+        with override_settings(MAIL_RATE_LIMIT_OVERRIDES={'Jane@Example.com': (5, 20)}):
+            self.assertEqual(get_limits('jane@example.com'), (5.0, 20.0))
+            self.assertEqual(get_limits('JANE@EXAMPLE.COM'), (5.0, 20.0))
+            self.assertEqual(get_limits('john@example.com'), (1.0, 2.0))
+        with override_settings(MAIL_RATE_LIMIT_OVERRIDES={'Jane@Example.com': (0, 1)}):
+            self.assertIsNone(get_limits('jane@example.com'))
+
+    def queued(self):
+        enqueue_email(to_email='hr@example.com', subject='Application', body='Hello', from_email='jane@example.com')
+        return claim_batch(1)[0]
+
+    def test_over_rate_is_deferred(self):
+        penalize('jane@example.com', 30)
+        outbound = self.queued()
+        self.assertIsNone(deliver(outbound))
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.Status.QUEUED)
+        self.assertGreater(outbound.deferred_until, timezone.now() + timedelta(seconds=25))
+        self.assertEqual(mail.outbox, [])
+
+    def assert_throttled(self, error):
+        outbound = self.queued()
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=error):
+            self.assertIsNone(deliver(outbound))
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.Status.QUEUED)
+        self.assertIsNone(outbound.email_sent)
+        # The mailbox is paused for the cooldown
+        self.assertGreater(reserve('jane@example.com'), 50)
+
+    def test_provider_throttle_is_deferred(self):
+        self.assert_throttled(smtplib.SMTPResponseException(421, b'Try again later'))
+
+    def test_throttled_recipient_is_deferred(self):
+        self.assert_throttled(smtplib.SMTPRecipientsRefused({'hr@example.com': (450, b'Rate limited')}))
+
+    def test_refused_recipient_fails(self):
+        outbound = self.queued()
+        error = smtplib.SMTPRecipientsRefused({'hr@example.com': (550, b'No such user')})
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=error):
+            self.assertIs(deliver(outbound), False)
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.Status.FAILED)
+        self.assertEqual(outbound.email_sent.status, 'failed')
+
+
+@override_settings(MAIL_RATE_LIMIT_RATE=0, MAIL_RETRY_MAX_ATTEMPTS=3, MAIL_RETRY_BASE_DELAY=60, MAIL_RETRY_MAX_DELAY=600)
+class RetryTests(TestCase):
+    """
+    Transient send failures are retried with capped exponential backoff;
+    permanent ones are not.
+    """
+
+    def failed(self, error, **fields):
+        values = {'to_email': 'hr@example.com', 'subject': 'Application', 'body': 'Hello'}
+        values.update(fields)
+        return record_failed_attempt(EmailSent(**values), error)
+
+    def test_classification(self):
+        self.assertTrue(is_transient(smtplib.SMTPResponseException(451, b'Try later')))
+        self.assertTrue(is_transient(smtplib.SMTPServerDisconnected()))
+        self.assertTrue(is_transient(ConnectionRefusedError()))
+        self.assertTrue(is_transient(smtplib.SMTPRecipientsRefused({'a@example.com': (450, b'Busy')})))
+        self.assertFalse(is_transient(smtplib.SMTPRecipientsRefused({'a@example.com': (450, b''), 'b@example.com': (550, b'')})))
+        self.assertFalse(is_transient(smtplib.SMTPResponseException(550, b'No such user')))
+        self.assertFalse(is_transient(smtplib.SMTPAuthenticationError(535, b'Bad credentials')))
+        self.assertFalse(is_transient(ValueError('bad header')))
+
+    def test_admin_requeue_skips_scheduled_retries(self):
+        retrying, permanent, queued = (
+            enqueue_email(f'hr{number}@example.com', 'Application', 'Hello') for number in range(3)
+        )
+        for outbound, error in ((retrying, smtplib.SMTPServerDisconnected('gone')), (permanent, smtplib.SMTPResponseException(550, b'No'))):
+            outbound.status = OutboundEmail.Status.FAILED
+            outbound.email_sent = self.failed(error, to_email=outbound.to_email)
+            outbound.save()
+        admin_user = User.objects.create_superuser(email='admin@example.com', username='admin', password='secret-pass-123')
+        self.client.force_login(admin_user)
+
+        response = self.client.post('/admin/mailer/outboundemail/', {
+            'action': 'requeue_action', '_selected_action': [retrying.pk, permanent.pk, queued.pk],
+        }, follow=True)
+        self.assertContains(response, 'Left 1 email(s) scheduled for automatic retry')
+        statuses = dict(OutboundEmail.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[retrying.pk], OutboundEmail.Status.FAILED)
+        self.assertEqual(statuses[permanent.pk], OutboundEmail.Status.QUEUED)
+        self.assertEqual(statuses[queued.pk], OutboundEmail.Status.QUEUED)
+
+    def test_backoff(self):
+        for attempt, delay in ((1, 60), (2, 120), (3, 240), (5, 600), (20, 600)):
+            for _ in range(20):
+                self.assertTrue(delay / 2 <= backoff_delay(attempt) <= delay)
+
+    def test_scheduling(self):
+        transient = self.failed(smtplib.SMTPServerDisconnected('gone'))
+        self.assertEqual(transient.status, 'failed')
+        self.assertGreater(transient.next_attempt_at, timezone.now() + timedelta(seconds=29))
+        self.assertIsNone(self.failed(smtplib.SMTPResponseException(550, b'No such user')).next_attempt_at)
+        self.assertIsNone(self.failed(smtplib.SMTPServerDisconnected(), attempt_count=3).next_attempt_at)
+
+    def test_claim_leases_rows(self):
+        email_sent = self.failed(smtplib.SMTPServerDisconnected())
+        self.assertEqual(claim_due(10), [])
+        EmailSent.objects.filter(pk=email_sent.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(claim_due(10), [email_sent])
+        # Leased rows are hidden from other retry workers
+        self.assertEqual(claim_due(10), [])
+        email_sent.refresh_from_db()
+        self.assertGreater(email_sent.next_attempt_at, timezone.now() + timedelta(seconds=200))
+
+    def test_process_retries(self):
+        outbound = enqueue_email(to_email='hr@example.com', subject='Application', body='Hello')
+        claim_batch(1)
+        outbound.refresh_from_db()
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=smtplib.SMTPServerDisconnected()):
+            self.assertIs(deliver(outbound), False)
+        EmailSent.objects.update(next_attempt_at=timezone.now())
+
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=smtplib.SMTPResponseException(451, b'Later')):
+            self.assertEqual(process_retries(), (0, 1))
+        email_sent = EmailSent.objects.get()
+        self.assertEqual(email_sent.attempt_count, 2)
+        self.assertIsNotNone(email_sent.next_attempt_at)
+
+        EmailSent.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_retries(), (1, 0))
+        email_sent.refresh_from_db()
+        outbound.refresh_from_db()
+        self.assertEqual((email_sent.status, email_sent.attempt_count, email_sent.next_attempt_at), ('sent', 3, None))
+        self.assertEqual(outbound.status, OutboundEmail.Status.SENT)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+
+class AdminSendTests(TestCase):
+    """
+    The admin send action sends each chunk of requests with one
+    send_messages() call and records it with one bulk insert.
+    """
+
+    def setUp(self):
+        self.email_requests = [
+            EmailRequest.objects.create(
+                hr_email=f'hr{number}@example.com', company='Acme', role='Engineer', generated_email='Hello'
+            )
+            for number in range(5)
+        ]
+        admin_user = User.objects.create_superuser(email='admin@example.com', username='admin', password='secret-pass-123')
+        self.client.force_login(admin_user)
+
+    def send(self):
+        return self.client.post('/admin/mailer/emailrequest/', {
+            'action': 'send_emails_action',
+            '_selected_action': [email_request.pk for email_request in self.email_requests],
+        }, follow=True)
+
+    @override_settings(MAIL_RATE_LIMIT_RATE=0)
+    def test_one_send_and_one_insert_per_chunk(self):
+        with mock.patch.object(EmailRequestAdmin, 'send_chunk_size', 2), \
+                mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', autospec=True,
+                           side_effect=LocmemBackend.send_messages) as send_messages, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.send()
+        self.assertContains(response, 'Chunk 3/3: sent 1, failed 0, deferred 0, skipped 0')
+        self.assertEqual(send_messages.call_count, 3)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "mailer_emailsent"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            set(EmailSent.objects.values_list('status', 'company', 'role')), {('sent', 'Acme', 'Engineer')}
+        )
+
+    @override_settings(MAIL_RATE_LIMIT_RATE=0)
+    def test_failed_send_is_recorded_for_retry(self):
+        message = EmailMessage.message
+
+        def refuse_hr1(email):
+            if email.to == ['hr1@example.com']:
+                raise smtplib.SMTPServerDisconnected('gone')
+            return message(email)
+
+        with mock.patch.object(EmailMessage, 'message', autospec=True, side_effect=refuse_hr1):
+            response = self.send()
+        self.assertContains(response, 'Failed to send email to hr1@example.com: gone')
+        self.assertEqual(len(mail.outbox), 4)
+        failed = EmailSent.objects.get(status='failed')
+        self.assertEqual(failed.to_email, 'hr1@example.com')
+        self.assertEqual(failed.email_request, self.email_requests[1])
+        self.assertIsNotNone(failed.next_attempt_at)
+        self.assertEqual(EmailSent.objects.filter(status='sent').count(), 4)
+
+    @override_settings(MAIL_RATE_LIMIT_RATE=1, MAIL_RATE_LIMIT_BURST=2)
+    def test_over_rate_is_deferred(self):
+        response = self.send()
+        self.assertContains(response, 'Sending rate limit reached: 3 email(s) queued for the mail worker')
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(EmailSent.objects.count(), 2)
+        deferred = OutboundEmail.objects.all()
+        self.assertEqual(len(deferred), 3)
+        for outbound in deferred:
+            self.assertEqual((outbound.company, outbound.role), ('Acme', 'Engineer'))
+            self.assertGreater(outbound.deferred_until, timezone.now())
+
+
+def gemini(*texts, error=None, chunks=None):
+    """
+    Patch the Gemini model so each generate_content call returns the next of
+    ``texts``, or streams ``chunks``
+    """
+    model = mock.Mock()
+    if chunks is not None:
+        model.generate_content.return_value = [mock.Mock(text=text) for text in chunks]
+    else:
+        model.generate_content.side_effect = error or [mock.Mock(text=text) for text in texts]
+    return mock.patch('mailer.generation.genai.GenerativeModel', return_value=model)
+
+
+class GenerationCacheTests(TestCase):
+    """
+    Generations are cached by normalized prompt inputs and responses say
+    whether they were served from the cache.
+    """
+
+    def setUp(self):
+        caches['generations'].clear()
+        self.addCleanup(caches['generations'].clear)
+        self.client = APIClient()
+        self.client.force_authenticate(make_user())
+
+    def generate(self, **fields):
+        data = {'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer', 'name': 'Jane', 'skills': 'Python'}
+        data.update(fields)
+        response = self.client.post('/api/generate-email/', data, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_repeat_served_from_cache(self):
+        with gemini('Dear Acme') as model:
+            first = self.generate()
+            second = self.generate(company='  ACME ', skills='python')
+        self.assertEqual(model.return_value.generate_content.call_count, 1)
+        self.assertEqual((first['email_text'], first['cache_hit']), ('Dear Acme', False))
+        self.assertEqual((second['email_text'], second['cache_hit']), ('Dear Acme', True))
+        self.assertEqual(EmailRequest.objects.filter(generated_email='Dear Acme').count(), 2)
+
+    def test_different_inputs_miss(self):
+        with gemini('Dear Acme', 'Dear Globex') as model:
+            self.generate()
+            other = self.generate(company='Globex')
+        self.assertEqual(model.return_value.generate_content.call_count, 2)
+        self.assertFalse(other['cache_hit'])
+
+    def test_failures_not_cached(self):
+        with gemini(error=RuntimeError('quota')):
+            fallback = self.generate()
+        self.assertFalse(fallback['cache_hit'])
+        self.assertIn('warning', fallback)
+        with gemini('Dear Acme'):
+            self.assertEqual(self.generate()['cache_hit'], False)
+
+
+def read_events(response):
+    """Parse a streamed server-sent events response into (event, data) pairs"""
+    body = b''.join(response.streaming_content).decode()
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+class GenerationStreamTests(TestCase):
+    """
+    The streaming endpoint serves server-sent events to clients that ask
+    for them.
+    """
+
+    url = '/api/generate-email-enhanced/stream/'
+
+    def setUp(self):
+        caches['generations'].clear()
+        self.addCleanup(caches['generations'].clear)
+        self.client = APIClient()
+        self.client.force_authenticate(make_user())
+        self.profile = make_profile()
+        self.data = {'profile_id': self.profile.pk, 'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer'}
+
+    def test_events(self):
+        with gemini(chunks=['Dear ', 'Acme']):
+            response = self.client.post(self.url, self.data, format='json', HTTP_ACCEPT='text/event-stream')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            events = read_events(response)
+        self.assertEqual(events[:2], [('chunk', {'text': 'Dear '}), ('chunk', {'text': 'Acme'})])
+        self.assertEqual(events[2][0], 'done')
+        self.assertFalse(events[2][1]['cache_hit'])
+        self.assertEqual(EmailRequest.objects.get(pk=events[2][1]['request_id']).generated_email, 'Dear Acme')
+
+        # A repeat is one chunk from the cache
+        response = self.client.post(self.url, self.data, format='json', HTTP_ACCEPT='text/event-stream')
+        events = read_events(response)
+        self.assertEqual(events[0], ('chunk', {'text': 'Dear Acme'}))
+        self.assertTrue(events[-1][1]['cache_hit'])
+
+    def test_fallback_on_failure(self):
+        with gemini(error=RuntimeError('quota')):
+            events = read_events(self.client.post(self.url, self.data, format='json', HTTP_ACCEPT='text/event-stream'))
+        self.assertEqual(events[0][0], 'replace')
+        self.assertIn('Jane Doe', events[0][1]['text'])
+        self.assertIn('warning', events[1][1])
+
+    def test_errors(self):
+        response = self.client.post(self.url, {'profile_id': 999999}, format='json', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.content, b'event: error\ndata: {"error": "User profile not found"}\n\n')
+        response = self.client.post(self.url, {'profile_id': 999999}, format='json')
+        self.assertEqual(response.json(), {'error': 'User profile not found'})
+
+
+class GenerationBatchTests(TestCase):
+    """
+    The batch endpoint generates one email per job, reporting invalid jobs
+    and failed generations individually.
+    """
+
+    url = '/api/generate-email-enhanced/batch/'
+
+    def setUp(self):
+        caches['generations'].clear()
+        self.addCleanup(caches['generations'].clear)
+        self.client = APIClient()
+        self.client.force_authenticate(make_user())
+        self.profile = make_profile()
+
+    def respond(self, prompt, **kwargs):
+        if 'Globex' in prompt:
+            raise RuntimeError('quota')
+        company = 'Acme' if 'Acme' in prompt else 'Initech'
+        return mock.Mock(text=f'Dear {company}')
+
+    def test_batch(self):
+        jobs = [
+            {'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer'},
+            {'hr_email': 'hr@globex.com', 'company': 'Globex', 'role': 'Engineer'},
+            {'company': 'Missing email', 'role': 'Engineer'},
+            {'hr_email': 'hr@initech.com', 'company': 'Initech', 'role': 'Engineer'},
+        ]
+        with gemini() as model:
+            model.return_value.generate_content.side_effect = self.respond
+            response = self.client.post(self.url, {'profile_id': self.profile.pk, 'jobs': jobs}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+        self.assertEqual((data['generated'], data['failed']), (3, 1))
+        acme, globex, missing, initech = data['results']
+        self.assertEqual(acme['email_text'], 'Dear Acme')
+        self.assertEqual(initech['email_text'], 'Dear Initech')
+        self.assertIn('warning', globex)
+        self.assertIn('Jane Doe', globex['email_text'])
+        self.assertEqual(missing['status'], 'error')
+        self.assertEqual(
+            EmailRequest.objects.get(pk=initech['request_id']).generated_email, 'Dear Initech'
+        )
+
+    def test_limits(self):
+        with override_settings(GENERATION_BATCH_MAX_ITEMS=2):
+            jobs = [{'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer'}] * 3
+            response = self.client.post(self.url, {'profile_id': self.profile.pk, 'jobs': jobs}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {'profile_id': self.profile.pk, 'jobs': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncViewTests(TestCase):
+    """
+    The ASGI endpoints authenticate with a JWT and mirror their sync
+    counterparts.
+    """
+
+    def setUp(self):
+        caches['generations'].clear()
+        self.addCleanup(caches['generations'].clear)
+        self.profile = make_profile()
+        self.token = RefreshToken.for_user(make_user()).access_token
+        self.client = AsyncClient()
+
+    def agemini(self, text):
+        model = mock.Mock()
+        model.generate_content_async = mock.AsyncMock(return_value=mock.Mock(text=text))
+        return mock.patch('mailer.generation.genai.GenerativeModel', return_value=model)
+
+    async def post(self, url, data, authenticated=True):
+        headers = {'Authorization': f'Bearer {self.token}'} if authenticated else None
+        return await self.client.post(url, data, content_type='application/json', headers=headers)
+
+    async def test_requires_jwt(self):
+        response = await self.post('/api/async/generate-email/', {}, authenticated=False)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_generate_email(self):
+        data = {'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer', 'name': 'Jane', 'skills': 'Python'}
+        with self.agemini('Dear Acme'):
+            first = (await self.post('/api/async/generate-email/', data)).json()
+            second = (await self.post('/api/async/generate-email/', data)).json()
+        self.assertEqual((first['email_text'], first['cache_hit']), ('Dear Acme', False))
+        self.assertTrue(second['cache_hit'])
+
+    async def test_generate_email_enhanced(self):
+        data = {'profile_id': self.profile.pk, 'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer'}
+        with self.agemini('Dear Acme'):
+            response = await self.post('/api/async/generate-email-enhanced/', data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['profile_id'], self.profile.pk)
+        email_request = await EmailRequest.objects.aget(pk=response.json()['request_id'])
+        self.assertEqual(email_request.user_profile_id, self.profile.pk)
+
+        response = await self.post('/api/async/generate-email-enhanced/', dict(data, profile_id=999999))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_send_with_cover_letter(self):
+        data = {
+            'profile_id': self.profile.pk, 'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer',
+            'subject': 'Application', 'body': 'Hello',
+        }
+        response = await self.post('/api/async/send-email-with-resume-and-cover-letter/', data)
+        self.assertEqual(response.status_code, 202, response.content)
+        outbound = await OutboundEmail.objects.aget(pk=response.json()['job_id'])
+        self.assertEqual(outbound.cover_letter['company'], 'Acme')
+        self.assertEqual(outbound.user_profile_id, self.profile.pk)
+
+
+class CoverLetterRenderTests(TestCase):
+    """
+    Cover letters are laid out with styles built once per process.
+    """
+
+    JOB = {'company': 'Acme', 'role': 'Engineer'}
+
+    def test_styles_are_shared(self):
+        self.assertIs(get_styles(), get_styles())
+
+    def test_render_cover_letter(self):
+        profile = make_profile(professional_experience='Built things. ' * 40)
+        filename, pdf_bytes = render_cover_letter(profile, self.JOB)
+        self.assertEqual(filename, 'cover_letter_Jane_Doe_Acme_Engineer.pdf')
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+
+
+class CoverLetterCacheTests(TestCase):
+    """
+    Rendered cover letters are cached on disk by content and revalidated
+    with their ETag.
+    """
+
+    JOB = {'company': 'Acme', 'role': 'Engineer'}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for patcher in (
+            mock.patch.object(cover_letter_cache, 'directory', directory.name),
+            mock.patch.object(renderer, 'max_workers', 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.profile = make_profile()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user())
+
+    def post(self, **headers):
+        data = dict(self.JOB, profile_id=self.profile.pk)
+        return self.client.post('/api/generate-cover-letter-pdf/', data, format='json', headers=headers)
+
+    def test_renders_once(self):
+        with mock.patch.object(renderer, 'render', wraps=renderer.render) as render:
+            first = get_cover_letter(self.profile, self.JOB)
+            second = get_cover_letter(self.profile, self.JOB)
+        self.assertEqual(render.call_count, 1)
+        self.assertFalse(first[2])
+        self.assertTrue(second[2])
+        self.assertEqual(first[1], second[1])
+
+    def test_profile_edit_misses(self):
+        get_cover_letter(self.profile, self.JOB)
+        self.profile.name = 'Jane Smith'
+        self.profile.save()
+        self.profile.refresh_from_db()
+        filename, _, cache_hit = get_cover_letter(self.profile, self.JOB)
+        self.assertFalse(cache_hit)
+        self.assertEqual(filename, 'cover_letter_Jane_Smith_Acme_Engineer.pdf')
+
+    def test_etag_revalidation(self):
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        etag = response['ETag']
+
+        with mock.patch.object(renderer, 'render') as render:
+            response = self.post(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        render.assert_not_called()
+
+        self.assertEqual(self.post(if_none_match='"stale"').status_code, 200)
+
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PDFCache(directory, max_bytes=10)
+            cache.set('old', b'12345')
+            os.utime(os.path.join(directory, 'old.pdf'), (0, 0))
+            cache.set('new', b'67890')
+            cache.set('newest', b'abc')
+            self.assertIsNone(cache.get('old'))
+            self.assertEqual(cache.get('new'), b'67890')
+            self.assertEqual(cache.get('newest'), b'abc')
+            cache.set('huge', b'x' * 11)
+            self.assertIsNone(cache.get('huge'))
+
+
+class PDFRendererTests(TestCase):
+    """
+    Cover letters are rendered in worker processes, or inline with no pool.
+    """
+
+    JOB = {'company': 'Acme', 'role': 'Engineer'}
+
+    def setUp(self):
+        self.profile = make_profile()
+
+    def test_renders_in_pool(self):
+        pool = PDFRenderer(max_workers=1, timeout=60)
+        self.addCleanup(pool.shutdown)
+        filename, pdf_bytes = pool.render(self.profile, self.JOB, date=date(2024, 1, 2))
+        self.assertEqual(filename, 'cover_letter_Jane_Doe_Acme_Engineer.pdf')
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+        self.assertIsNotNone(pool._executor)
+
+    def test_renders_inline_without_workers(self):
+        inline = PDFRenderer(max_workers=0, timeout=60)
+        filename, pdf_bytes = inline.render(self.profile, self.JOB)
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+        self.assertIsNone(inline._executor)
+
+    def test_broken_pool_falls_back_and_restarts(self):
+        pool = PDFRenderer(max_workers=1, timeout=60)
+        executor = mock.Mock()
+        executor.submit.return_value.result.side_effect = BrokenProcessPool()
+        pool._executor = executor
+        filename, pdf_bytes = pool.render(self.profile, self.JOB)
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+        executor.shutdown.assert_called_once()
+        self.assertIsNone(pool._executor)
+
+
+class AttachmentCacheTests(TestCase):
+    """
+    Encoded resume attachments are reused until the file changes.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        attachment_cache.clear()
+        self.addCleanup(attachment_cache.clear)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_reuses_part_until_file_changes(self):
+        cache = AttachmentCache(max_bytes=1024)
+        path = self.write('resume.pdf', b'%PDF one')
+        part = cache.get(path)
+        self.assertIs(cache.get(path), part)
+        self.assertEqual(part.get_filename(), 'resume.pdf')
+
+        self.write('resume.pdf', b'%PDF version two')
+        changed = cache.get(path)
+        self.assertIsNot(changed, part)
+        self.assertEqual(changed.get_payload(decode=True), b'%PDF version two')
+
+    def test_bounded_by_encoded_size(self):
+        cache = AttachmentCache(max_bytes=20)
+        first = cache.get(self.write('a.pdf', b'x' * 9))
+        cache.get(self.write('b.pdf', b'y' * 9))
+        self.assertIsNot(cache.get(os.path.join(self.directory, 'a.pdf')), first)
+        self.assertLessEqual(cache._total, 20)
+
+        cache.get(self.write('big.pdf', b'z' * 30))
+        self.assertNotIn(os.path.join(self.directory, 'big.pdf'), cache._entries)
+
+    def test_attach_resume(self):
+        path = self.write('resume.pdf', b'%PDF resume')
+        messages = [EmailMessage('Application', 'Hello', 'jane@example.com', ['hr@acme.com']) for _ in range(2)]
+        for message in messages:
+            attach_resume(message, path)
+        self.assertIs(messages[0].attachments[0], messages[1].attachments[0])
+        self.assertIn(b'JVBERiByZXN1bWU=', messages[1].message().as_bytes())
+
+        text_path = self.write('resume.txt', b'plain resume')
+        attach_resume(messages[0], text_path)
+        self.assertEqual(messages[0].attachments[1], ('resume.txt', 'plain resume', 'text/plain'))
+
+
+@override_settings(EMAIL_HOST_USER='jobs@example.com', EMAIL_HOST_PASSWORD='secret')
+class CampaignTests(TestCase):
+    """
+    A campaign renders one template per recipient into the outbound queue in
+    chunks, skipping bad and repeated rows.
+    """
+
+    def setUp(self):
+        self.user = make_user()
+        self.profile = make_profile(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create(self, recipients, **data):
+        data = dict({
+            'profile_id': self.profile.pk,
+            'subject_template': '{role} at {company}',
+            'body_template': 'Dear {recipient_name}, I would like to join {company}.',
+            'recipients': recipients,
+        }, **data)
+        return self.client.post('/api/campaigns/', data, format='json')
+
+    def test_template_fields(self):
+        self.assertEqual(template_fields('{role} at {company}, {{literal}}'), {'role', 'company'})
+        for template in ('{salary}', '{company!r}', '{company:>10}', '{company'):
+            with self.assertRaises(ValueError):
+                template_fields(template)
+
+    def test_queues_personalized_emails(self):
+        response = self.create([
+            {'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer', 'recipient_name': 'Ann'},
+            {'email': 'jobs@globex.com', 'company': 'Globex', 'role': 'Analyst'},
+        ])
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((response.data['enqueued'], response.data['skipped']), (2, 0))
+
+        emails = {email.to_email: email for email in OutboundEmail.objects.all()}
+        self.assertEqual(emails['hr@acme.com'].subject, 'Engineer at Acme')
+        self.assertEqual(emails['hr@acme.com'].body, 'Dear Ann, I would like to join Acme.')
+        self.assertTrue(emails['jobs@globex.com'].body.startswith('Dear Hiring Manager,'))
+        self.assertEqual({email.campaign_id for email in emails.values()}, {response.data['campaign_id']})
+
+    def test_skips_invalid_and_repeated_recipients(self):
+        response = self.create([
+            {'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer'},
+            {'hr_email': 'HR@acme.com', 'company': ' acme ', 'role': 'engineer'},
+            {'hr_email': 'not-an-email', 'company': 'Acme', 'role': 'Engineer'},
+            {'hr_email': 'hr@globex.com', 'role': 'Engineer'},
+            'hr@initech.com',
+            {'hr_email': f"{'a' * 64}@{'.'.join(['b' * 63] * 3)}.com", 'company': 'Acme', 'role': 'Engineer'},
+        ])
+        self.assertEqual((response.data['enqueued'], response.data['skipped']), (1, 5))
+        self.assertEqual(response.data['errors'], [
+            'Recipient 2: HR@acme.com is listed more than once',
+            'Recipient 3: invalid email address not-an-email',
+            'Recipient 4: missing company',
+            'Recipient 5: not an object',
+            'Recipient 6: email address longer than 255 characters',
+        ])
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile('recipients.csv', b'Email,Company,Role\nhr@acme.com,Acme,Engineer\n', content_type='text/csv')
+        response = self.client.post('/api/campaigns/', {
+            'profile_id': self.profile.pk,
+            'subject_template': '{role} at {company}',
+            'body_template': 'Hello {recipient_name}',
+            'recipients_file': upload,
+        }, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(OutboundEmail.objects.get().to_email, 'hr@acme.com')
+
+    def test_invalid_template(self):
+        response = self.create([{'hr_email': 'hr@acme.com'}], subject_template='{salary}')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Campaign.objects.exists())
+
+    def test_chunks_update_progress(self):
+        campaign = Campaign.objects.create(user_profile=self.profile, subject_template='{company}', body_template='Hi')
+        recipients = [{'hr_email': f'hr{number}@acme.com', 'company': f'Acme {number}'} for number in range(5)]
+        with mock.patch('mailer.campaigns._flush', wraps=campaigns._flush) as flush:
+            run_campaign(campaign, recipients, chunk_size=2)
+        self.assertEqual(flush.call_count, 3)
+        self.assertEqual((campaign.status, campaign.enqueued_count), (Campaign.Status.ENQUEUED, 5))
+
+        progress = campaign_progress(campaign)
+        self.assertEqual(progress[OutboundEmail.Status.QUEUED], 5)
+        self.assertFalse(progress['completed'])
+        OutboundEmail.objects.update(status=OutboundEmail.Status.SENT)
+        self.assertTrue(campaign_progress(campaign)['completed'])
+
+        response = self.client.get(f'/api/campaigns/{campaign.pk}/')
+        self.assertEqual(response.data['progress'][OutboundEmail.Status.SENT], 5)
+
+    def test_visible_to_creator_profile_owner_and_staff(self):
+        response = self.create([{'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer'}])
+        campaign = Campaign.objects.get(pk=response.data['campaign_id'])
+        self.assertEqual(campaign.created_by, self.user)
+        self.assertEqual(OutboundEmail.objects.get().created_by, self.user)
+        url = f'/api/campaigns/{campaign.pk}/'
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        # The profile's owner sees it even when someone else created it
+        Campaign.objects.filter(pk=campaign.pk).update(created_by=None)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        other = make_user(email='john@example.com', username='john')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        other.is_staff = True
+        other.save()
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+
+class SentEmailListTests(TestCase):
+    """
+    Callers list the sent emails of their own profiles (staff see every
+    profile's), paged by ``(sent_at, id)`` cursors.
+    """
+
+    def setUp(self):
+        self.user = make_user()
+        self.profile = make_profile(user=self.user)
+        sent_at = timezone.now()
+        # Ties on sent_at must still page without gaps or repeats
+        EmailSent.objects.bulk_create([
+            EmailSent(user_profile=self.profile, to_email=f'hr{number}@acme.com', subject='Hi', body='Hello',
+                      sent_at=sent_at - timedelta(minutes=number // 2))
+            for number in range(7)
+        ])
+        self.other = make_profile(name='John Roe', user=make_user(email='john@example.com', username='john'))
+        self.other_sent = EmailSent.objects.create(user_profile=self.other, to_email='hr@globex.com', subject='Hi', body='Hello')
+        self.client = APIClient()
+
+    def ids(self, **params):
+        response = self.client.get('/api/sent-emails/', params)
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['results']}
+
+    def test_lists_own_emails(self):
+        self.assertEqual(self.client.get('/api/sent-emails/').status_code, 401)
+        self.client.force_authenticate(self.user)
+        own = set(EmailSent.objects.filter(user_profile=self.profile).values_list('id', flat=True))
+        self.assertEqual(self.ids(), own)
+        self.assertEqual(self.ids(profile_id=self.other.pk), set())
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.ids(), own | {self.other_sent.pk})
+        self.assertEqual(self.ids(profile_id=self.other.pk), {self.other_sent.pk})
+
+    def test_create_profile_records_owner(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/create-profile/', {
+            'name': 'Ann Lee', 'location': 'Remote', 'phone_number': '+1-555-0101', 'primary_email': 'ann@example.com',
+            'education_degree': 'BTech', 'education_field': 'CS', 'university_name': 'University',
+            'graduation_year': 2021, 'programming_languages': 'Python', 'professional_experience': '', 'projects': '',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(UserProfile.objects.get(pk=response.data['profile_id']).user, self.user)
+
+    def test_cursor_round_trip(self):
+        self.client.force_authenticate(self.user)
+
+        seen = []
+        params = {'page_size': 3}
+        while True:
+            response = self.client.get('/api/sent-emails/', params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            if response.data['next_cursor'] is None:
+                break
+            params['cursor'] = response.data['next_cursor']
+        expected = list(EmailSent.objects.filter(user_profile=self.profile).order_by('-sent_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+        response = self.client.get('/api/sent-emails/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_encode_decode_cursor(self):
+        sent_at = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(sent_at, 42)), (sent_at, 42))
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('bm90IGEgY3Vyc29y')
+
+
+@override_settings(EMAIL_HOST_USER='jobs@example.com', EMAIL_HOST_PASSWORD='secret', MAIL_RATE_LIMIT_RATE=0)
+class DuplicateTests(TestCase):
+    """
+    A recipient counts as already emailed only by the same profile (or,
+    without one, the same account), about the same company and role when
+    both are known.
+    """
+
+    JOB = {'hr_email': 'HR@acme.com', 'company': 'Acme', 'role': 'Engineer'}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for patcher in (
+            mock.patch.object(cover_letter_cache, 'directory', directory.name),
+            mock.patch.object(renderer, 'max_workers', 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.profile = make_profile()
+        self.other = make_profile(name='John Roe')
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sent(self, user_profile, **fields):
+        fields = dict({'to_email': 'hr@acme.com', 'company': 'ACME ', 'role': 'engineer'}, **fields)
+        return EmailSent.objects.create(user_profile=user_profile, subject='Hi', body='Hello', **fields)
+
+    def send(self, **data):
+        data = dict(self.JOB, subject='Application', body='Hello', **data)
+        return self.client.post('/api/send-email/', data, format='json')
+
+    def test_scoped_to_profile(self):
+        self.sent(self.other)
+        self.assertEqual(find_duplicates([self.JOB], self.profile), [None])
+        email_sent = self.sent(self.profile)
+        duplicate = find_duplicates([self.JOB], self.profile)[0]
+        self.assertEqual(duplicate['sent_email_id'], email_sent.pk)
+        self.assertEqual(find_duplicates([self.JOB], None), [None])
+
+    def test_without_job_matches_recipient(self):
+        acme = self.sent(self.profile)
+        globex = self.sent(self.profile, to_email='jobs@globex.com', company='', role='')
+        duplicates = find_duplicates([
+            {'hr_email': 'hr@acme.com', 'company': 'Acme'},
+            {'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Designer'},
+            {'hr_email': 'jobs@globex.com', 'company': 'Globex', 'role': 'Engineer'},
+            {'hr_email': 'jobs@globex.com'},
+        ], self.profile)
+        self.assertEqual(
+            [duplicate and duplicate['sent_email_id'] for duplicate in duplicates],
+            [acme.pk, None, None, globex.pk],
+        )
+
+    def test_queued_and_failed(self):
+        enqueue_email('hr@acme.com', 'Hi', 'Hello', user_profile=self.profile, company='Acme', role='Engineer')
+        self.assertEqual(find_duplicates([self.JOB], self.profile)[0]['status'], OutboundEmail.Status.QUEUED)
+        OutboundEmail.objects.update(status=OutboundEmail.Status.FAILED)
+        self.sent(self.profile, status='failed')
+        self.assertEqual(find_duplicates([self.JOB], self.profile), [None])
+
+    def test_company_and_role_are_recorded(self):
+        email_request = EmailRequest.objects.create(
+            user_profile=self.profile, hr_email='hr@acme.com', company='Acme', role='Engineer', generated_email='Hi',
+        )
+        self.assertEqual(build_outbound('hr@acme.com', 'Hi', 'Hello', email_request=email_request).company, 'Acme')
+        outbound = build_outbound('hr@acme.com', 'Hi', 'Hello', cover_letter={'company': 'Globex', 'role': 'Analyst'})
+        self.assertEqual((outbound.company, outbound.role), ('Globex', 'Analyst'))
+
+        outbound.user_profile = self.profile
+        outbound.save()
+        process_queue()
+        outbound.refresh_from_db()
+        self.assertEqual((outbound.email_sent.company, outbound.email_sent.role), ('Globex', 'Analyst'))
+
+    def test_send_email(self):
+        # Without a profile, the account's own profile-less emails are checked
+        self.assertEqual(self.send().status_code, 202)
+        self.assertEqual(self.send().status_code, 409)
+        self.client.force_authenticate(make_user(email='john@example.com', username='john'))
+        self.assertEqual(self.send().status_code, 202)
+        self.client.force_authenticate(self.user)
+
+        response = self.send(profile_id=self.profile.pk)
+        self.assertEqual(response.status_code, 202)
+        outbound = OutboundEmail.objects.get(pk=response.data['job_id'])
+        self.assertEqual((outbound.user_profile, outbound.company, outbound.role), (self.profile, 'Acme', 'Engineer'))
+
+        response = self.send(profile_id=self.profile.pk)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['duplicate_of']['job_id'], outbound.pk)
+        self.assertEqual(self.send(profile_id=self.other.pk).status_code, 202)
+        self.assertEqual(self.send(profile_id=self.profile.pk, allow_duplicate=True).status_code, 202)
+        self.assertEqual(self.send(profile_id=999999).status_code, 404)
+
+        # Without job details any earlier email to the address counts
+        self.assertEqual(self.send(profile_id=self.profile.pk, company='', role='').status_code, 409)
+        self.assertEqual(self.send(profile_id=self.profile.pk, hr_email='jobs@globex.com', company='').status_code, 202)
+
+    def test_admin_send_skips_duplicates(self):
+        self.sent(self.profile)
+        selected = [
+            EmailRequest.objects.create(user_profile=self.profile, generated_email='Hi', **fields).pk
+            for fields in (
+                {'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Engineer'},
+                {'hr_email': 'jobs@globex.com', 'company': 'Globex', 'role': 'Engineer'},
+                {'hr_email': 'Jobs@Globex.com', 'company': 'globex', 'role': 'Engineer'},
+                {'hr_email': 'hr@acme.com', 'company': 'Acme', 'role': 'Designer'},
+            )
+        ]
+        admin_user = User.objects.create_superuser(email='admin@example.com', username='admin', password='secret-pass-123')
+        self.client = Client()
+        self.client.force_login(admin_user)
+
+        response = self.client.post('/admin/mailer/emailrequest/', {
+            'action': 'send_emails_action', '_selected_action': selected,
+        }, follow=True)
+        self.assertContains(response, 'Skipped 2 email(s)')
+        self.assertEqual(sorted(email.to[0].lower() for email in mail.outbox), ['hr@acme.com', 'jobs@globex.com'])
+
+    def test_check_duplicates_endpoint(self):
+        self.sent(self.other)
+        response = self.client.post('/api/check-duplicates/', {'recipients': [self.JOB]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/check-duplicates/', {
+            'profile_id': self.profile.pk, 'recipients': [self.JOB],
+        }, format='json')
+        self.assertEqual(response.data['duplicates'], 0)
+        self.sent(self.profile)
+        response = self.client.post('/api/check-duplicates/', {
+            'profile_id': self.profile.pk, 'recipients': [self.JOB],
+        }, format='json')
+        self.assertEqual(response.data['duplicates'], 1)
+        self.assertEqual(response.data['results'][0]['duplicate_of']['company'], 'ACME ')
+
+    def test_campaign_skips_profile_sends(self):
+        self.sent(self.profile)
+        self.sent(self.other, to_email='jobs@globex.com', company='Globex')
+        campaign = Campaign.objects.create(user_profile=self.profile, subject_template='{role} at {company}', body_template='Hi')
+        errors = run_campaign(campaign, [self.JOB, {'hr_email': 'jobs@globex.com', 'company': 'Globex', 'role': 'Engineer'}])
+        self.assertEqual((campaign.enqueued_count, campaign.skipped_count), (1, 1))
+        self.assertIn('already emailed HR@acme.com', errors[0])
+        self.assertEqual(OutboundEmail.objects.get().company, 'Globex')
+
+
+class ProfileSnapshotTests(TestCase):
+    """
+    Profile snapshots are served from memory within ``max_age``, re-checked
+    against ``updated_at`` after it, and evicted when the profile changes.
+    """
+
+    def setUp(self):
+        profile_snapshots.clear()
+        self.addCleanup(profile_snapshots.clear)
+        self.profile = make_profile(professional_experience='Built things. ' * 50, projects='Shipped apps. ' * 50)
+
+    def test_serves_from_memory_within_max_age(self):
+        snapshot = profile_snapshots.get(self.profile.pk)
+        with self.assertNumQueries(0):
+            self.assertIs(profile_snapshots.get(str(self.profile.pk)), snapshot)
+        self.assertEqual(snapshot.name, 'Jane Doe')
+        self.assertEqual(len(snapshot.professional_experience), TEXT_EXCERPT_LENGTH)
+        with self.assertRaises(AttributeError):
+            snapshot.name = 'John Roe'
+
+    def test_rechecks_updated_at_after_max_age(self):
+        cache = ProfileSnapshotCache(max_age=0)
+        snapshot = cache.get(self.profile.pk)
+        with self.assertNumQueries(1):
+            self.assertIs(cache.get(self.profile.pk), snapshot)
+
+        # Edits that send no signal, e.g. from another process, are seen through updated_at
+        UserProfile.objects.filter(pk=self.profile.pk).update(name='John Roe', updated_at=timezone.now())
+        with self.assertNumQueries(2):
+            self.assertEqual(cache.get(self.profile.pk).name, 'John Roe')
+
+        UserProfile.objects.filter(pk=self.profile.pk).delete()
+        with self.assertRaises(UserProfile.DoesNotExist):
+            cache.get(self.profile.pk)
+
+    def test_evicted_on_save_and_delete(self):
+        profile_snapshots.get(self.profile.pk)
+        self.profile.name = 'John Roe'
+        self.profile.save()
+        self.assertEqual(profile_snapshots.get(self.profile.pk).name, 'John Roe')
+
+        profile_id = self.profile.pk
+        self.profile.delete()
+        with self.assertRaises(UserProfile.DoesNotExist):
+            profile_snapshots.get(profile_id)
+
+    def test_builders_match_full_profile(self):
+        snapshot = profile_snapshots.get(self.profile.pk)
+        job = {'company': 'Acme', 'role': 'Engineer'}
+        self.assertEqual(
+            enhanced_prompt_inputs(snapshot, 'Acme', 'Engineer', ''),
+            enhanced_prompt_inputs(self.profile, 'Acme', 'Engineer', ''),
+        )
+        self.assertEqual(
+            enhanced_fallback_email(snapshot, 'Acme', 'Engineer'),
+            enhanced_fallback_email(self.profile, 'Acme', 'Engineer'),
+        )
+
+        def letter(profile):
+            return [flowable.text for flowable in _build_story(profile, job, get_styles(), letter_date()) if hasattr(flowable, 'text')]
+        self.assertEqual(letter(snapshot), letter(self.profile))
+
+
+@override_settings(EMAIL_HOST_USER='jobs@example.com', EMAIL_HOST_PASSWORD='secret')
+class OutboundStatusTests(TestCase):
+    """
+    A queued email's status is only readable by the account that queued
+    it, the owner of its profile and staff.
+    """
+
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+
+    def status_code(self, outbound, user=None):
+        self.client.force_authenticate(user)
+        return self.client.get(f'/api/outbound-emails/{outbound.pk}/').status_code
+
+    def test_visible_to_creator_profile_owner_and_staff(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/send-email/', {'hr_email': 'hr@acme.com', 'subject': 'Hi', 'body': 'Hello'}, format='json')
+        queued = OutboundEmail.objects.get(pk=response.data['job_id'])
+        self.assertEqual(queued.created_by, self.user)
+        for_profile = enqueue_email('hr@acme.com', 'Hi', 'Hello', user_profile=make_profile(user=self.user))
+
+        other = make_user(email='john@example.com', username='john')
+        self.assertEqual(self.status_code(queued), 401)
+        self.assertEqual(self.status_code(queued, other), 404)
+        self.assertEqual(self.status_code(queued, self.user), 200)
+        self.assertEqual(self.status_code(for_profile, self.user), 200)
+        self.assertEqual(self.status_code(for_profile, other), 404)
+
+        other.is_staff = True
+        other.save()
+        self.assertEqual(self.status_code(queued, other), 200)
+
+
+class SQLitePragmaTests(TestCase):
+    """
+    SQLite keeps its rollback journal unless WAL or the tuning is opted into.
+    """
+
+    @override_settings(SQLITE_JOURNAL_MODE='', SQLITE_TUNING=False)
+    def test_default_keeps_rollback_journal(self):
+        self.assertEqual(sqlite_pragmas(), {})
+
+    @override_settings(SQLITE_JOURNAL_MODE='wal', SQLITE_TUNING=False)
+    def test_journal_mode_opt_in(self):
+        self.assertEqual(sqlite_pragmas(), {'journal_mode': 'wal'})
+
+    @override_settings(SQLITE_JOURNAL_MODE='', SQLITE_TUNING=True, SQLITE_SYNCHRONOUS='normal')
+    def test_tuning_implies_wal(self):
+        pragmas = sqlite_pragmas()
+        self.assertEqual((pragmas['journal_mode'], pragmas['synchronous']), ('wal', 'normal'))
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Legacy endpoints (for backward compatibility)
@@ -9,6 +9,8 @@ urlpatterns = [
     # Enhanced endpoints
     path('api/create-profile/', views.create_user_profile, name='create_user_profile'),
     path('api/generate-email-enhanced/', views.generate_email_enhanced, name='generate_email_enhanced'),
+    path('api/generate-email-enhanced/batch/', views.generate_email_enhanced_batch, name='generate_email_enhanced_batch'),
+    path('api/generate-email-enhanced/stream/', views.generate_email_enhanced_stream, name='generate_email_enhanced_stream'),
     path('api/send-email-with-resume/', views.send_email_with_resume, name='send_email_with_resume'),
     path('api/get-profile/<int:profile_id>/', views.get_user_profile, name='get_user_profile'),
     
@@ -16,6 +18,23 @@ urlpatterns = [
     path('api/generate-cover-letter-pdf/', views.generate_cover_letter_pdf, name='generate_cover_letter_pdf'),
     path('api/send-email-with-resume-and-cover-letter/', views.send_email_with_resume_and_cover_letter, name='send_email_with_resume_and_cover_letter'),
     
+    # Async (ASGI) versions of the generation and cover letter endpoints
+    path('api/async/generate-email/', async_views.generate_email_async, name='generate_email_async'),
+    path('api/async/generate-email-enhanced/', async_views.generate_email_enhanced_async, name='generate_email_enhanced_async'),
+    path('api/async/generate-cover-letter-pdf/', async_views.generate_cover_letter_pdf_async, name='generate_cover_letter_pdf_async'),
+    path('api/async/send-email-with-resume-and-cover-letter/', async_views.send_email_with_resume_and_cover_letter_async, name='send_email_with_resume_and_cover_letter_async'),
+    
+    # Mail-merge campaigns
+    path('api/campaigns/', views.create_campaign, name='create_campaign'),
+    path('api/campaigns/<int:campaign_id>/', views.get_campaign, name='get_campaign'),
+    
+    # Outbound email queue
+    path('api/outbound-emails/<int:job_id>/', views.get_outbound_email, name='get_outbound_email'),
+    
+    # Sent email history
+    path('api/sent-emails/', views.list_sent_emails, name='list_sent_emails'),
+    path('api/check-duplicates/', views.check_duplicates, name='check_duplicates'),
+    
     # Health check
     path('api/health/', views.health_check, name='health_check'),
 ]
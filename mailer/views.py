@@ -1,30 +1,35 @@
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.mail import send_mail, EmailMultiAlternatives
 from django.conf import settings
 from django.core.files.storage import default_storage
-from django.http import HttpResponse, Http404
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.http import HttpResponse, HttpResponseNotModified, Http404, StreamingHttpResponse
 from django.utils import timezone
-import google.generativeai as genai
-import json
+from django.utils.dateparse import parse_date, parse_datetime
 import logging
 import os
 from datetime import datetime
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from io import BytesIO
-from .models import UserProfile, EmailRequest, EmailSent
+from .models import UserProfile, EmailRequest, EmailSent, OutboundEmail, Campaign
+from .campaigns import campaign_progress, iter_csv_recipients, run_campaign, template_fields
+from .cover_letter import cover_letter_details, letter_date
+from .duplicates import allows_duplicates, duplicate_error, find_duplicates, window_days
+from .generation import (
+    email_prompt_inputs, build_email_prompt, enhanced_prompt_inputs, build_enhanced_prompt,
+    email_fallback, enhanced_fallback_email, generate_text, generate_many, stream_text
+)
+from .outbound import enqueue_email, get_sender_info
+from .pagination import InvalidCursor, keyset_page
+from .pdf_cache import cover_letter_etag, etag_matches, get_cover_letter
+from .profiles import profile_snapshots
+from .renderers import EventStreamRenderer, sse_event
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Configure Gemini AI
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
 
 @api_view(['POST'])
 def generate_email(request):
@@ -57,32 +62,12 @@ def generate_email(request):
             skills=skills
         )
 
-        # Generate email using Gemini AI
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        prompt = f"""
-        Write a professional job application email for the following details:
-        
-        Applicant Name: {name}
-        Company: {company}
-        Position: {role}
-        HR Email: {hr_email}
-        Skills: {skills}
-        
-        Please write a compelling, professional email that:
-        1. Introduces the candidate professionally
-        2. Highlights relevant skills and experience
-        3. Expresses genuine interest in the company and role
-        4. Includes a clear call to action
-        5. Is concise but comprehensive (around 200-300 words)
-        6. Uses a professional but engaging tone
-        
-        Format the email with proper subject line and body. Make it personalized and specific to the role and company.
-        """
+        # Generate email using Gemini AI (repeats are served from the generation cache)
+        prompt_inputs = email_prompt_inputs(name, company, role, hr_email, skills)
+        prompt = build_email_prompt(prompt_inputs)
 
         try:
-            response = model.generate_content(prompt)
-            generated_email = response.text
+            generated_email, cache_hit = generate_text(prompt, prompt_inputs)
             
             # Update the email request with generated content
             email_request.generated_email = generated_email
@@ -91,25 +76,15 @@ def generate_email(request):
             return Response({
                 'status': 'success',
                 'email_text': generated_email,
-                'request_id': email_request.id
+                'request_id': email_request.id,
+                'cache_hit': cache_hit
             }, status=status.HTTP_200_OK)
             
         except Exception as ai_error:
             logger.error(f"Gemini AI error: {str(ai_error)}")
             
             # Fallback to template email if AI fails
-            fallback_email = f"""Subject: Application for {role} Position at {company}
-
-Dear Hiring Manager,
-
-I am writing to express my strong interest in the {role} position at {company}. With my expertise in {skills}, I am confident that I would be a valuable addition to your team.
-
-I am particularly excited about the opportunity to contribute to innovative projects and work alongside talented professionals at {company}. I would welcome the opportunity to discuss how my skills and passion for technology can contribute to your team's success.
-
-Thank you for considering my application. I look forward to hearing from you soon.
-
-Best regards,
-{name}"""
+            fallback_email = email_fallback(name, company, role, skills)
             
             # Update the email request with fallback content
             email_request.generated_email = fallback_email
@@ -119,6 +94,7 @@ Best regards,
                 'status': 'success',
                 'email_text': fallback_email,
                 'request_id': email_request.id,
+                'cache_hit': False,
                 'warning': 'AI generation failed, using template email'
             }, status=status.HTTP_200_OK)
 
@@ -150,51 +126,52 @@ def send_email(request):
         subject = request.data['subject']
         body = request.data['body']
 
+        # Optional profile the email is sent for; without one, duplicates are
+        # checked against the caller's own profile-less emails
+        user_profile = None
+        profile_id = request.data.get('profile_id')
+        if profile_id:
+            try:
+                user_profile = UserProfile.objects.get(id=profile_id)
+            except (UserProfile.DoesNotExist, ValueError):
+                return Response(
+                    {'error': 'User profile not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+        # Refuse to email the same recipient about the same job twice
+        if not allows_duplicates(request.data):
+            duplicate = find_duplicates([request.data], user_profile, user=request.user)[0]
+            if duplicate:
+                return Response(duplicate_error(duplicate), status=status.HTTP_409_CONFLICT)
+
+        # Prefer the caller's own mailbox; fall back to the default account
+        sender_info = get_sender_info(request.user)
+
         # Validate email configuration
-        if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+        if not sender_info and (not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD):
             return Response(
                 {'error': 'Email configuration not set. Please configure EMAIL_HOST_USER and EMAIL_HOST_PASSWORD.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        try:
-            # Send email
-            send_mail(
-                subject=subject,
-                message=body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[hr_email],
-                fail_silently=False,
-            )
-            
-            # Record the sent email
-            EmailSent.objects.create(
-                to_email=hr_email,
-                subject=subject,
-                body=body,
-                status='sent'
-            )
-            
-            return Response({
-                'status': 'sent',
-                'message': 'Email sent successfully'
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as email_error:
-            logger.error(f"Email sending error: {str(email_error)}")
-            
-            # Record failed email attempt
-            EmailSent.objects.create(
-                to_email=hr_email,
-                subject=subject,
-                body=body,
-                status='failed'
-            )
-            
-            return Response(
-                {'error': f'Failed to send email: {str(email_error)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        # Queue the email for the mail worker
+        outbound = enqueue_email(
+            to_email=hr_email,
+            subject=subject,
+            body=body,
+            user_profile=user_profile,
+            sender_info=sender_info,
+            created_by=request.user,
+            company=request.data.get('company'),
+            role=request.data.get('role'),
+        )
+
+        return Response({
+            'status': 'queued',
+            'message': 'Email queued for delivery',
+            'job_id': outbound.id
+        }, status=status.HTTP_202_ACCEPTED)
 
     except Exception as e:
         logger.error(f"Unexpected error in send_email: {str(e)}")
@@ -236,6 +213,7 @@ def create_user_profile(request):
         profile, created = UserProfile.objects.get_or_create(
             primary_email=primary_email,
             defaults={
+                'user': request.user,
                 'name': name,
                 'location': location,
                 'phone_number': phone_number,
@@ -289,6 +267,9 @@ def create_user_profile(request):
             profile.development_practices = data.get('development_practices')
             profile.professional_experience = data.get('professional_experience')
             profile.projects = data.get('projects')
+            # Profiles created before owners were recorded go to the first account that updates them
+            if profile.user_id is None:
+                profile.user = request.user
             profile.save()
         
         # Handle resume file upload
@@ -324,7 +305,8 @@ def generate_email_enhanced(request):
         
         if profile_id:
             try:
-                user_profile = UserProfile.objects.get(id=profile_id)
+                # The prompt only needs a cached snapshot of the profile
+                user_profile = profile_snapshots.get(profile_id)
             except UserProfile.DoesNotExist:
                 return Response(
                     {'error': 'User profile not found'},
@@ -351,49 +333,19 @@ def generate_email_enhanced(request):
         
         # Create email request
         email_request = EmailRequest.objects.create(
-            user_profile=user_profile,
+            user_profile_id=user_profile.id,
             hr_email=hr_email,
             company=company,
             role=role,
             job_description=job_description
         )
         
-        # Generate comprehensive email using Gemini AI
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        # Build comprehensive prompt with all user data
-        prompt = f"""
-        Write a SHORT and SWEET professional job application email (maximum 150 words) for the following candidate:
-        
-        CANDIDATE:
-        Name: {user_profile.name}
-        Education: {user_profile.education_degree} in {user_profile.education_field} from {user_profile.university_name} ({user_profile.graduation_year})
-        Key Skills: {user_profile.programming_languages}
-        Experience: {user_profile.professional_experience[:200]}...
-        Projects: {user_profile.projects[:150]}...
-        Portfolio: {user_profile.portfolio_url or 'N/A'}
-        LinkedIn: {user_profile.linkedin_url or 'N/A'}
-        GitHub: {user_profile.github_url or 'N/A'}
-        
-        JOB DETAILS:
-        Company: {company}
-        Position: {role}
-        Job Description: {job_description}
-        
-        Write a BRIEF email that:
-        1. Introduces candidate in 1-2 sentences
-        2. Highlights 2-3 most relevant skills/achievements
-        3. Shows interest in the role
-        4. Includes professional signature with contact info
-        5. Keep it under 150 words - be concise and impactful
-        6. Include subject line
-        
-        Make it professional but brief - hiring managers are busy!
-        """
+        # Generate comprehensive email using Gemini AI (repeats are served from the generation cache)
+        prompt_inputs = enhanced_prompt_inputs(user_profile, company, role, job_description)
+        prompt = build_enhanced_prompt(prompt_inputs)
         
         try:
-            response = model.generate_content(prompt)
-            generated_email = response.text
+            generated_email, cache_hit = generate_text(prompt, prompt_inputs)
             
             # Update the email request with generated content
             email_request.generated_email = generated_email
@@ -403,29 +355,15 @@ def generate_email_enhanced(request):
                 'status': 'success',
                 'email_text': generated_email,
                 'request_id': email_request.id,
-                'profile_id': user_profile.id
+                'profile_id': user_profile.id,
+                'cache_hit': cache_hit
             }, status=status.HTTP_200_OK)
             
         except Exception as ai_error:
             logger.error(f"Gemini AI error: {str(ai_error)}")
             
             # Short and sweet fallback email
-            fallback_email = f"""Subject: Application for {role} Position at {company}
-
-Dear Hiring Manager,
-
-I am {user_profile.name}, a {user_profile.education_degree} graduate in {user_profile.education_field} from {user_profile.university_name}. I am excited to apply for the {role} position at {company}.
-
-My key qualifications include:
-• Strong skills in {user_profile.programming_languages}
-• {user_profile.professional_experience[:100]}{'...' if len(user_profile.professional_experience) > 100 else ''}
-
-I am passionate about contributing to {company}'s innovative projects and would love to discuss how my skills can benefit your team.
-
-Best regards,
-{user_profile.name}
-{user_profile.phone_number}
-{user_profile.primary_email}"""
+            fallback_email = enhanced_fallback_email(user_profile, company, role)
             
             # Update the email request with fallback content
             email_request.generated_email = fallback_email
@@ -436,6 +374,7 @@ Best regards,
                 'email_text': fallback_email,
                 'request_id': email_request.id,
                 'profile_id': user_profile.id,
+                'cache_hit': False,
                 'warning': 'AI generation failed, using enhanced template email'
             }, status=status.HTTP_200_OK)
 
@@ -447,6 +386,204 @@ Best regards,
         )
 
 
+@api_view(['POST'])
+def generate_email_enhanced_batch(request):
+    """
+    Generate job application emails for many job postings with one profile.
+
+    The profile is loaded once, Gemini calls run concurrently on a bounded
+    pool and all email requests are saved with a single bulk insert.
+    """
+    try:
+        profile_id = request.data.get('profile_id')
+        jobs = request.data.get('jobs')
+        
+        if not profile_id:
+            return Response(
+                {'error': 'profile_id is required. Please create a user profile first using /api/create-profile/'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        max_items = getattr(settings, 'GENERATION_BATCH_MAX_ITEMS', 100)
+        if not isinstance(jobs, list) or not jobs:
+            return Response(
+                {'error': 'jobs must be a non-empty list of {hr_email, company, role, job_description}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(jobs) > max_items:
+            return Response(
+                {'error': f'Too many jobs: at most {max_items} per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            user_profile = UserProfile.objects.get(id=profile_id)
+        except UserProfile.DoesNotExist:
+            return Response(
+                {'error': 'User profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # Validate each job; invalid ones are reported without failing the batch
+        results = [None] * len(jobs)
+        valid = []
+        for index, job in enumerate(jobs):
+            job = job if isinstance(job, dict) else {}
+            hr_email = job.get('hr_email')
+            company = job.get('company')
+            role = job.get('role')
+            job_description = job.get('job_description', '')
+            if not all([hr_email, company, role]):
+                results[index] = {
+                    'index': index,
+                    'status': 'error',
+                    'error': 'Missing required fields: hr_email, company, role'
+                }
+                continue
+            prompt_inputs = enhanced_prompt_inputs(user_profile, company, role, job_description)
+            valid.append((index, hr_email, company, role, job_description, build_enhanced_prompt(prompt_inputs), prompt_inputs))
+        
+        generations = generate_many([(prompt, prompt_inputs) for *_, prompt, prompt_inputs in valid])
+        
+        email_requests = []
+        for (index, hr_email, company, role, job_description, _, _), (generated_email, cache_hit, ai_error) in zip(valid, generations):
+            warning = None
+            if ai_error is not None:
+                logger.error(f"Gemini AI error: {str(ai_error)}")
+                generated_email = enhanced_fallback_email(user_profile, company, role)
+                warning = 'AI generation failed, using enhanced template email'
+            email_requests.append(EmailRequest(
+                user_profile=user_profile,
+                hr_email=hr_email,
+                company=company,
+                role=role,
+                job_description=job_description,
+                generated_email=generated_email
+            ))
+            results[index] = {
+                'index': index,
+                'status': 'success',
+                'email_text': generated_email,
+                'cache_hit': cache_hit
+            }
+            if warning:
+                results[index]['warning'] = warning
+        
+        EmailRequest.objects.bulk_create(email_requests)
+        for (index, *_), email_request in zip(valid, email_requests):
+            results[index]['request_id'] = email_request.id
+        
+        return Response({
+            'status': 'success',
+            'profile_id': user_profile.id,
+            'generated': len(email_requests),
+            'failed': len(jobs) - len(email_requests),
+            'results': results
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in generate_email_enhanced_batch: {str(e)}")
+        return Response(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def generate_email_enhanced_stream(request):
+    """
+    Stream a job application email generated from the user profile as
+    server-sent events.
+
+    Emits ``chunk`` events with text deltas, a ``replace`` event with the full
+    template email if Gemini fails, and a final ``done`` event once the text
+    has been saved to the email request.
+    """
+    try:
+        profile_id = request.data.get('profile_id')
+        
+        if not profile_id:
+            return Response(
+                {'error': 'profile_id is required. Please create a user profile first using /api/create-profile/'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            user_profile = UserProfile.objects.get(id=profile_id)
+        except UserProfile.DoesNotExist:
+            return Response(
+                {'error': 'User profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # Extract job details
+        hr_email = request.data.get('hr_email')
+        company = request.data.get('company')
+        role = request.data.get('role')
+        job_description = request.data.get('job_description', '')
+        
+        if not all([hr_email, company, role]):
+            return Response(
+                {'error': 'Missing required fields: hr_email, company, role'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Create email request
+        email_request = EmailRequest.objects.create(
+            user_profile=user_profile,
+            hr_email=hr_email,
+            company=company,
+            role=role,
+            job_description=job_description
+        )
+        
+        prompt_inputs = enhanced_prompt_inputs(user_profile, company, role, job_description)
+        prompt = build_enhanced_prompt(prompt_inputs)
+        
+        def event_stream():
+            parts = []
+            cache_hit = False
+            warning = None
+            try:
+                for text, cache_hit in stream_text(prompt, prompt_inputs):
+                    parts.append(text)
+                    yield sse_event('chunk', {'text': text})
+            except Exception as ai_error:
+                logger.error(f"Gemini AI error: {str(ai_error)}")
+                fallback_email = enhanced_fallback_email(user_profile, company, role)
+                parts = [fallback_email]
+                cache_hit = False
+                warning = 'AI generation failed, using enhanced template email'
+                yield sse_event('replace', {'text': fallback_email})
+            
+            # Persist the complete email once the stream has finished
+            email_request.generated_email = ''.join(parts)
+            email_request.save(update_fields=['generated_email', 'updated_at'])
+            
+            done = {
+                'status': 'success',
+                'request_id': email_request.id,
+                'profile_id': user_profile.id,
+                'cache_hit': cache_hit
+            }
+            if warning:
+                done['warning'] = warning
+            yield sse_event('done', done)
+        
+        response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # disable proxy buffering (nginx)
+        return response
+
+    except Exception as e:
+        logger.error(f"Unexpected error in generate_email_enhanced_stream: {str(e)}")
+        return Response(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['POST'])
 def send_email_with_resume(request):
     """
@@ -476,64 +613,41 @@ def send_email_with_resume(request):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        # Refuse to email the same recipient about the same job twice
+        if not allows_duplicates(request.data):
+            duplicate = find_duplicates([request.data], user_profile)[0]
+            if duplicate:
+                return Response(duplicate_error(duplicate), status=status.HTTP_409_CONFLICT)
+
+        # Prefer the caller's own mailbox; fall back to the default account
+        sender_info = get_sender_info(request.user)
+
         # Validate email configuration
-        if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+        if not sender_info and (not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD):
             return Response(
                 {'error': 'Email configuration not set. Please configure EMAIL_HOST_USER and EMAIL_HOST_PASSWORD.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        try:
-            # Create email with attachment support
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[hr_email],
-            )
-            
-            # Attach resume if available
-            resume_attached = False
-            if user_profile.resume_file:
-                try:
-                    email.attach_file(user_profile.resume_file.path)
-                    resume_attached = True
-                except Exception as attach_error:
-                    logger.warning(f"Failed to attach resume: {str(attach_error)}")
-            
-            email.send()
-            
-            # Record the sent email
-            EmailSent.objects.create(
-                to_email=hr_email,
-                subject=subject,
-                body=body,
-                status='sent',
-                resume_attached=resume_attached
-            )
-            
-            return Response({
-                'status': 'sent',
-                'message': 'Email sent successfully',
-                'resume_attached': resume_attached
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as email_error:
-            logger.error(f"Email sending error: {str(email_error)}")
-            
-            # Record failed email attempt
-            EmailSent.objects.create(
-                to_email=hr_email,
-                subject=subject,
-                body=body,
-                status='failed',
-                resume_attached=False
-            )
-            
-            return Response(
-                {'error': f'Failed to send email: {str(email_error)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        # Queue the email for the mail worker
+        outbound = enqueue_email(
+            to_email=hr_email,
+            subject=subject,
+            body=body,
+            user_profile=user_profile,
+            attach_resume=True,
+            sender_info=sender_info,
+            created_by=request.user,
+            company=request.data.get('company'),
+            role=request.data.get('role'),
+        )
+
+        return Response({
+            'status': 'queued',
+            'message': 'Email queued for delivery',
+            'job_id': outbound.id,
+            'resume_attached': bool(user_profile.resume_file)
+        }, status=status.HTTP_202_ACCEPTED)
 
     except Exception as e:
         logger.error(f"Unexpected error in send_email_with_resume: {str(e)}")
@@ -621,148 +735,30 @@ def generate_cover_letter_pdf(request):
         job_description = request.data.get('job_description', '')
         
         # Optional detailed company information
-        recipient_name = request.data.get('recipient_name', 'Hiring Manager')
-        company_address = request.data.get('company_address', '')
-        company_city_state_zip = request.data.get('company_city_state_zip', '')
-        previous_company = request.data.get('previous_company', '')
-        key_skills = request.data.get('key_skills', '')
-        specific_achievements = request.data.get('specific_achievements', '')
-        company_interest = request.data.get('company_interest', '')
-        personal_qualities = request.data.get('personal_qualities', '')
+        details = cover_letter_details(request.data)
         
         try:
-            user_profile = UserProfile.objects.get(id=profile_id)
+            user_profile = profile_snapshots.get(profile_id)
         except UserProfile.DoesNotExist:
             return Response(
                 {'error': 'User profile not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Create PDF buffer
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        
-        # Create custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=colors.darkblue
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=8,
-            leading=12
-        )
-        
-        # Build PDF content
-        story = []
-        
-        # Header with compact format - no extra spacing
-        story.append(Paragraph(f"{user_profile.name}", title_style))
-        
-        # Create compact contact info without extra spacing
-        contact_info = f"{user_profile.location}<br/>{user_profile.primary_email}<br/>{user_profile.phone_number}"
-        if user_profile.linkedin_url:
-            contact_info += f"<br/>LinkedIn: {user_profile.linkedin_url}"
-        if user_profile.github_url:
-            contact_info += f"<br/>GitHub: {user_profile.github_url}"
-        if user_profile.portfolio_url:
-            contact_info += f"<br/>Portfolio: {user_profile.portfolio_url}"
-        
-        story.append(Paragraph(contact_info, normal_style))
-        story.append(Spacer(1, 15))
-        
-        # Date
-        story.append(Paragraph(f"{timezone.now().strftime('%B %d, %Y')}", normal_style))
-        story.append(Spacer(1, 10))
-        
-        # Company info with full address if provided
-        if company_address or company_city_state_zip:
-            company_info = f"{recipient_name}<br/>{company}"
-            if company_address:
-                company_info += f"<br/>{company_address}"
-            if company_city_state_zip:
-                company_info += f"<br/>{company_city_state_zip}"
-            story.append(Paragraph(company_info, normal_style))
-        else:
-            story.append(Paragraph(f"{recipient_name}<br/>{company}", normal_style))
-        
-        story.append(Spacer(1, 10))
-        
-        # Subject
-        story.append(Paragraph(f"Subject: Application for the Position of {role}", heading_style))
-        story.append(Spacer(1, 8))
-        
-        # Cover letter body using the detailed format - compact version
-        greeting = f"Dear {recipient_name},"
-        story.append(Paragraph(greeting, normal_style))
-        story.append(Spacer(1, 6))
-        
-        # Introduction paragraph - more concise
-        intro = f"I am writing to express my interest in the {role} position at {company}. With my background in {user_profile.education_field or 'software development'}, I am confident in my ability to contribute effectively to your team."
-        story.append(Paragraph(intro, normal_style))
-        story.append(Spacer(1, 6))
-        
-        # Experience and skills paragraph - more concise
-        if previous_company or key_skills or specific_achievements:
-            # Use provided details or fallback to profile data
-            prev_company = previous_company or "my previous role"
-            skills = key_skills or user_profile.programming_languages or "software development"
-            achievements = specific_achievements[:150] + "..." if len(specific_achievements) > 150 else specific_achievements
-            
-            exp_text = f"In my previous role at {prev_company}, I developed strong skills in {skills}. {achievements} I am enthusiastic about bringing my expertise to support {company}'s goals."
-        else:
-            # Fallback to profile data - more concise
-            exp_text = f"In my professional experience, I developed strong skills in {user_profile.programming_languages}. {user_profile.professional_experience[:120]}{'...' if len(user_profile.professional_experience) > 120 else ''} I am enthusiastic about contributing to {company}'s success."
-        
-        story.append(Paragraph(exp_text, normal_style))
-        story.append(Spacer(1, 6))
-        
-        # Company interest paragraph - more concise
-        if company_interest:
-            interest_text = f"What excites me most about this opportunity is {company_interest}. I am eager to bring my {personal_qualities or 'technical skills and passion'} to your organization."
-        else:
-            interest_text = f"What excites me most about this opportunity is the chance to contribute to {company}'s innovative projects. I am eager to bring my {personal_qualities or 'technical skills and passion'} to your organization."
-        
-        story.append(Paragraph(interest_text, normal_style))
-        story.append(Spacer(1, 6))
-        
-        # Closing paragraph - more concise
-        closing = f"Please find my resume attached for your review. I would welcome the opportunity to discuss how my background fits your needs. Thank you for considering my application."
-        story.append(Paragraph(closing, normal_style))
-        story.append(Spacer(1, 12))
+        # Identical letters are served from the PDF cache; the browser can revalidate with the ETag
+        date = letter_date()
+        etag = cover_letter_etag(user_profile, details, date)
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
         
-        # Signature
-        signature = f"Sincerely,<br/><br/>{user_profile.name}"
-        story.append(Paragraph(signature, normal_style))
-        
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
-        
-        # Create filename
-        filename = f"cover_letter_{user_profile.name.replace(' ', '_')}_{company.replace(' ', '_')}_{role.replace(' ', '_')}.pdf"
-        filename = filename.replace(' ', '_').replace(',', '').replace('.', '')
+        filename, pdf_bytes, _ = get_cover_letter(user_profile, details, date)
         
         # Return PDF as response
-        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+        response = HttpResponse(pdf_bytes, content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['ETag'] = etag
         
         return response
         
@@ -799,190 +795,390 @@ def send_email_with_resume_and_cover_letter(request):
         job_description = request.data.get('job_description', '')
         
         # Optional detailed company information for cover letter
-        recipient_name = request.data.get('recipient_name', 'Hiring Manager')
-        company_address = request.data.get('company_address', '')
-        company_city_state_zip = request.data.get('company_city_state_zip', '')
-        previous_company = request.data.get('previous_company', '')
-        key_skills = request.data.get('key_skills', '')
-        specific_achievements = request.data.get('specific_achievements', '')
-        company_interest = request.data.get('company_interest', '')
-        personal_qualities = request.data.get('personal_qualities', '')
+        details = cover_letter_details(request.data)
         
         try:
-            user_profile = UserProfile.objects.get(id=profile_id)
+            user_profile = profile_snapshots.get(profile_id)
         except UserProfile.DoesNotExist:
             return Response(
                 {'error': 'User profile not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        # Refuse to email the same recipient about the same job twice
+        if not allows_duplicates(request.data):
+            duplicate = find_duplicates([request.data], user_profile.id)[0]
+            if duplicate:
+                return Response(duplicate_error(duplicate), status=status.HTTP_409_CONFLICT)
+
+        # Prefer the caller's own mailbox; fall back to the default account
+        sender_info = get_sender_info(request.user)
+
         # Validate email configuration
-        if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+        if not sender_info and (not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD):
             return Response(
                 {'error': 'Email configuration not set. Please configure EMAIL_HOST_USER and EMAIL_HOST_PASSWORD.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+        attachments_added = ['Resume', 'Cover Letter'] if user_profile.has_resume else ['Cover Letter']
+
+        # Queue the email for the mail worker; the cover letter is rendered at send time
+        outbound = enqueue_email(
+            to_email=hr_email,
+            subject=subject,
+            body=body,
+            user_profile=user_profile,
+            attach_resume=True,
+            sender_info=sender_info,
+            created_by=request.user,
+            cover_letter=details,
+        )
+
+        return Response({
+            'status': 'queued',
+            'message': 'Email queued for delivery',
+            'job_id': outbound.id,
+            'resume_attached': 'Resume' in attachments_added,
+            'cover_letter_attached': True,
+            'attachments': attachments_added
+        }, status=status.HTTP_202_ACCEPTED)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in send_email_with_resume_and_cover_letter: {str(e)}")
+        return Response(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+def _owned(queryset, user, *paths):
+    """
+    Rows of ``queryset`` ``user`` may read: every row for staff, otherwise
+    the rows whose owning account, reached through any of ``paths``, is
+    ``user``
+    """
+    if user.is_staff:
+        return queryset
+    owned = Q()
+    for path in paths:
+        owned |= Q(**{path: user})
+    return queryset.filter(owned)
+
+
+@api_view(['POST'])
+def create_campaign(request):
+    """
+    Send one subject/body template to many recipients (mail merge).
+
+    Recipients come from a JSON ``recipients`` list or an uploaded
+    ``recipients_file`` CSV; each gets a personalized email queued for the
+    mail worker.
+    """
+    try:
+        profile_id = request.data.get('profile_id')
+        subject_template = request.data.get('subject_template')
+        body_template = request.data.get('body_template')
+        
+        if not all([profile_id, subject_template, body_template]):
+            return Response(
+                {'error': 'Missing required fields: profile_id, subject_template, body_template'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         try:
-            # Create email with attachment support
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[hr_email],
+            template_fields(subject_template)
+            template_fields(body_template)
+        except ValueError as template_error:
+            return Response(
+                {'error': f'Invalid template: {str(template_error)}'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            attachments_added = []
-            
-            # Attach resume if available
-            resume_attached = False
-            if user_profile.resume_file:
-                try:
-                    email.attach_file(user_profile.resume_file.path)
-                    resume_attached = True
-                    attachments_added.append('Resume')
-                except Exception as attach_error:
-                    logger.warning(f"Failed to attach resume: {str(attach_error)}")
-            
-            # Generate and attach cover letter PDF
-            try:
-                # Create cover letter PDF
-                buffer = BytesIO()
-                doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-                
-                styles = getSampleStyleSheet()
-                
-                title_style = ParagraphStyle(
-                    'CustomTitle',
-                    parent=styles['Heading1'],
-                    fontSize=16,
-                    spaceAfter=30,
-                    alignment=1
+        
+        # CSV uploads are read row by row while rendering, never loaded whole
+        if 'recipients_file' in request.FILES:
+            recipients = iter_csv_recipients(request.FILES['recipients_file'])
+        else:
+            recipients = request.data.get('recipients')
+            if not isinstance(recipients, list) or not recipients:
+                return Response(
+                    {'error': 'Provide a non-empty recipients list or a recipients_file CSV'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                
-                normal_style = ParagraphStyle(
-                    'CustomNormal',
-                    parent=styles['Normal'],
-                    fontSize=10,
-                    spaceAfter=8,
-                    leading=12
+        
+        try:
+            user_profile = UserProfile.objects.get(id=profile_id)
+        except UserProfile.DoesNotExist:
+            return Response(
+                {'error': 'User profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # Prefer the caller's own mailbox; fall back to the default account
+        sender_info = get_sender_info(request.user)
+        
+        # Validate email configuration
+        if not sender_info and (not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD):
+            return Response(
+                {'error': 'Email configuration not set. Please configure EMAIL_HOST_USER and EMAIL_HOST_PASSWORD.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        attach_resume = str(request.data.get('attach_resume', True)).lower() not in ('false', '0', 'no')
+        
+        campaign = Campaign.objects.create(
+            user_profile=user_profile,
+            sender_info=sender_info,
+            created_by=request.user,
+            subject_template=subject_template,
+            body_template=body_template,
+            attach_resume=attach_resume and bool(user_profile.resume_file),
+        )
+        errors = run_campaign(campaign, recipients, skip_duplicates=not allows_duplicates(request.data))
+        
+        response_data = {
+            'status': campaign.status,
+            'campaign_id': campaign.id,
+            'enqueued': campaign.enqueued_count,
+            'skipped': campaign.skipped_count,
+            'errors': errors
+        }
+        if campaign.status == Campaign.Status.FAILED and not campaign.enqueued_count:
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+        return Response(response_data, status=status.HTTP_202_ACCEPTED)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in create_campaign: {str(e)}")
+        return Response(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_campaign(request, campaign_id):
+    """
+    Get a campaign the caller created, or one for a profile they own, with
+    its delivery progress
+    """
+    try:
+        try:
+            campaign = _owned(Campaign.objects, request.user, 'created_by', 'user_profile__user').get(id=campaign_id)
+        except Campaign.DoesNotExist:
+            return Response(
+                {'error': 'Campaign not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return Response({
+            'campaign_id': campaign.id,
+            'profile_id': campaign.user_profile_id,
+            'status': campaign.status,
+            'subject_template': campaign.subject_template,
+            'attach_resume': campaign.attach_resume,
+            'enqueued': campaign.enqueued_count,
+            'skipped': campaign.skipped_count,
+            'errors': campaign.error.splitlines(),
+            'progress': campaign_progress(campaign),
+            'created_at': campaign.created_at,
+            'updated_at': campaign.updated_at
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in get_campaign: {str(e)}")
+        return Response(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+def _parse_datetime_param(value, end_of_day=False):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, datetime.max.time() if end_of_day else datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def list_sent_emails(request):
+    """
+    List the caller's sent emails (every profile's for staff), newest
+    first, with cursor (keyset) pagination
+    """
+    try:
+        params = request.query_params
+        queryset = _owned(EmailSent.objects, request.user, 'user_profile__user').only(
+            'id', 'user_profile_id', 'email_request_id', 'to_email', 'subject', 'status',
+            'resume_attached', 'sent_at', 'attempt_count', 'next_attempt_at'
+        )
+        
+        # Filters
+        try:
+            if params.get('profile_id'):
+                queryset = queryset.filter(user_profile_id=int(params['profile_id']))
+            if params.get('status'):
+                queryset = queryset.filter(status=params['status'])
+            if params.get('to_email'):
+                queryset = queryset.alias(to_email_lower=Lower('to_email')).filter(to_email_lower=params['to_email'].lower())
+            if params.get('sent_after'):
+                queryset = queryset.filter(sent_at__gte=_parse_datetime_param(params['sent_after']))
+            if params.get('sent_before'):
+                queryset = queryset.filter(sent_at__lte=_parse_datetime_param(params['sent_before'], end_of_day=True))
+            if params.get('resume_attached'):
+                resume_attached = params['resume_attached'].lower()
+                if resume_attached not in ('true', 'false'):
+                    raise ValueError(resume_attached)
+                queryset = queryset.filter(resume_attached=resume_attached == 'true')
+            page_size = min(max(int(params.get('page_size', 50)), 1), 200)
+        except ValueError as param_error:
+            return Response(
+                {'error': f'Invalid filter value: {str(param_error)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            rows, next_cursor = keyset_page(queryset, cursor=params.get('cursor'), page_size=page_size)
+        except InvalidCursor as cursor_error:
+            return Response(
+                {'error': str(cursor_error)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'results': [{
+                'id': email_sent.id,
+                'profile_id': email_sent.user_profile_id,
+                'request_id': email_sent.email_request_id,
+                'to_email': email_sent.to_email,
+                'subject': email_sent.subject,
+                'status': email_sent.status,
+                'resume_attached': email_sent.resume_attached,
+                'sent_at': email_sent.sent_at,
+                'attempt_count': email_sent.attempt_count,
+                'next_attempt_at': email_sent.next_attempt_at
+            } for email_sent in rows],
+            'next_cursor': next_cursor,
+            'page_size': page_size
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in list_sent_emails: {str(e)}")
+        return Response(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+def check_duplicates(request):
+    """
+    Report which recipients were already emailed (or have an email queued)
+    for the same company and role, answering the whole list in one query
+    """
+    try:
+        recipients = request.data.get('recipients')
+        if not isinstance(recipients, list) or not recipients:
+            return Response(
+                {'error': 'recipients must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        max_items = getattr(settings, 'DUPLICATE_CHECK_MAX_ITEMS', 1000)
+        if len(recipients) > max_items:
+            return Response(
+                {'error': f'At most {max_items} recipients per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        for index, recipient in enumerate(recipients):
+            if not isinstance(recipient, dict) or not recipient.get('hr_email'):
+                return Response(
+                    {'error': f'Recipient {index}: missing hr_email'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                
-                story = []
-                
-                # Header with compact format - no extra spacing
-                story.append(Paragraph(f"{user_profile.name}", title_style))
-                
-                # Create compact contact info without extra spacing
-                contact_info = f"{user_profile.location}<br/>{user_profile.primary_email}<br/>{user_profile.phone_number}"
-                story.append(Paragraph(contact_info, normal_style))
-                story.append(Spacer(1, 15))
-                story.append(Paragraph(f"{timezone.now().strftime('%B %d, %Y')}", normal_style))
-                story.append(Spacer(1, 10))
-                
-                # Company info with full address if provided
-                if company_address or company_city_state_zip:
-                    company_info = f"{recipient_name}<br/>{company}"
-                    if company_address:
-                        company_info += f"<br/>{company_address}"
-                    if company_city_state_zip:
-                        company_info += f"<br/>{company_city_state_zip}"
-                    story.append(Paragraph(company_info, normal_style))
-                else:
-                    story.append(Paragraph(f"{recipient_name}<br/>{company}", normal_style))
-                
-                story.append(Spacer(1, 10))
-                story.append(Paragraph(f"Subject: Application for the Position of {role}", normal_style))
-                story.append(Spacer(1, 8))
-                
-                # Cover letter content using detailed format - compact version
-                greeting = f"Dear {recipient_name},"
-                story.append(Paragraph(greeting, normal_style))
-                story.append(Spacer(1, 6))
-                
-                intro = f"I am writing to express my interest in the {role} position at {company}. With my background in {user_profile.education_field or 'software development'}, I am confident in my ability to contribute effectively to your team."
-                story.append(Paragraph(intro, normal_style))
-                story.append(Spacer(1, 6))
-                
-                # Experience and skills paragraph - more concise
-                if previous_company or key_skills or specific_achievements:
-                    prev_company = previous_company or "my previous role"
-                    skills = key_skills or user_profile.programming_languages or "software development"
-                    achievements = specific_achievements[:150] + "..." if len(specific_achievements) > 150 else specific_achievements
-                    exp_text = f"In my previous role at {prev_company}, I developed strong skills in {skills}. {achievements} I am enthusiastic about bringing my expertise to support {company}'s goals."
-                else:
-                    exp_text = f"In my professional experience, I developed strong skills in {user_profile.programming_languages}. {user_profile.professional_experience[:120]}{'...' if len(user_profile.professional_experience) > 120 else ''} I am enthusiastic about contributing to {company}'s success."
-                
-                story.append(Paragraph(exp_text, normal_style))
-                story.append(Spacer(1, 6))
-                
-                # Company interest paragraph - more concise
-                if company_interest:
-                    interest_text = f"What excites me most about this opportunity is {company_interest}. I am eager to bring my {personal_qualities or 'technical skills and passion'} to your organization."
-                else:
-                    interest_text = f"What excites me most about this opportunity is the chance to contribute to {company}'s innovative projects. I am eager to bring my {personal_qualities or 'technical skills and passion'} to your organization."
-                
-                story.append(Paragraph(interest_text, normal_style))
-                story.append(Spacer(1, 6))
-                
-                closing = f"Please find my resume attached for your review. I would welcome the opportunity to discuss how my background fits your needs. Thank you for considering my application."
-                story.append(Paragraph(closing, normal_style))
-                story.append(Spacer(1, 12))
-                
-                signature = f"Sincerely,<br/><br/>{user_profile.name}"
-                story.append(Paragraph(signature, normal_style))
-                
-                doc.build(story)
-                buffer.seek(0)
-                
-                # Attach cover letter
-                cover_letter_filename = f"cover_letter_{user_profile.name.replace(' ', '_')}_{company.replace(' ', '_')}.pdf"
-                cover_letter_filename = cover_letter_filename.replace(' ', '_').replace(',', '').replace('.', '')
-                
-                email.attach(cover_letter_filename, buffer.getvalue(), 'application/pdf')
-                attachments_added.append('Cover Letter')
-                
-            except Exception as cover_letter_error:
-                logger.warning(f"Failed to generate cover letter: {str(cover_letter_error)}")
-            
-            email.send()
-            
-            # Record the sent email
-            EmailSent.objects.create(
-                to_email=hr_email,
-                subject=subject,
-                body=body,
-                status='sent',
-                resume_attached=resume_attached
+        
+        profile_id = request.data.get('profile_id')
+        if not profile_id:
+            return Response(
+                {'error': 'Missing required field: profile_id'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            return Response({
-                'status': 'sent',
-                'message': 'Email sent successfully',
-                'resume_attached': resume_attached,
-                'cover_letter_attached': 'Cover Letter' in attachments_added,
-                'attachments': attachments_added
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as email_error:
-            logger.error(f"Email sending error: {str(email_error)}")
-            
-            # Record failed email attempt
-            EmailSent.objects.create(
-                to_email=hr_email,
-                subject=subject,
-                body=body,
-                status='failed',
-                resume_attached=False
+        try:
+            user_profile = UserProfile.objects.get(id=profile_id)
+        except (UserProfile.DoesNotExist, ValueError):
+            return Response(
+                {'error': 'User profile not found'},
+                status=status.HTTP_404_NOT_FOUND
             )
-            
+        
+        days = request.data.get('window_days')
+        try:
+            days = window_days() if days is None else int(days)
+        except (TypeError, ValueError):
             return Response(
-                {'error': f'Failed to send email: {str(email_error)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': 'window_days must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        
+        duplicates = find_duplicates(recipients, user_profile, days=days)
+        
+        return Response({
+            'window_days': days,
+            'duplicates': sum(1 for duplicate in duplicates if duplicate),
+            'results': [{
+                'hr_email': recipient['hr_email'],
+                'company': recipient.get('company'),
+                'role': recipient.get('role'),
+                'duplicate': duplicate is not None,
+                'duplicate_of': duplicate,
+            } for recipient, duplicate in zip(recipients, duplicates)]
+        }, status=status.HTTP_200_OK)
 
     except Exception as e:
-        logger.error(f"Unexpected error in send_email_with_resume_and_cover_letter: {str(e)}")
+        logger.error(f"Unexpected error in check_duplicates: {str(e)}")
+        return Response(
+            {'error': 'An unexpected error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_outbound_email(request, job_id):
+    """
+    Get delivery status of an email the caller queued, or one sent for a
+    profile they own
+    """
+    try:
+        outbound = _owned(OutboundEmail.objects, request.user, 'created_by', 'user_profile__user').get(id=job_id)
+
+        return Response({
+            'status': 'success',
+            'job': {
+                'id': outbound.id,
+                'to_email': outbound.to_email,
+                'subject': outbound.subject,
+                'status': outbound.status,
+                'error': outbound.error,
+                'created_at': outbound.created_at,
+                'sent_at': outbound.sent_at
+            }
+        }, status=status.HTTP_200_OK)
+
+    except OutboundEmail.DoesNotExist:
+        return Response(
+            {'error': 'Email job not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in get_outbound_email: {str(e)}")
         return Response(
             {'error': 'An unexpected error occurred'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR